@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: legacy-to-Unicode conversion throughput in MB/s.
+
+    baseline: open-tamil's <encoding>2unicode (one str.replace per table entry)
+    compiled: LegacyConverter (one longest-match scan per text)
+
+Usage: python benchmarks/bench_converter.py [--mb 4] [--repeat 3] [--skip-baseline]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import tamil.txt2unicode as txt2unicode
+from app.core.converter import ENCODINGS, LegacyConverter
+
+# One line of each encoding, same Tamil text (see tests/core/test_converter.py)
+SAMPLES = {
+    "bamini": "jkpo; nfhOk;G tzf;fk; aho;g;ghzk; ngsj;jk; nrhy;Nyhtpak; Nju;jy; G+kp N\\hgh iffs;",
+    "tscii": "¾Á¢ú ¦¸¡ØõÒ Å½ì¸õ Â¡úôÀ¡½õ ¦Àªò¾õ ¦º¡ø§Ä¡Å¢Âõ §¾÷¾ø âÁ¢ §„¡À¡ ¨¸¸û",
+    "tab": "îñ¤ö¢ ªè£¿ñ¢¹ õíè¢èñ¢ ò£ö¢ð¢ð£íñ¢ ªð÷î¢îñ¢ ªê£ô¢«ô£õ¤òñ¢ «îó¢îô¢ Ìñ¤ «û£ð£ ¬èè÷¢",
+    "tam": "îI› ªè£¿‹¹ õí‚è‹ ò£›Šð£í‹ ªð÷ˆî‹ ªê£™«ô£Mò‹ «î˜î™ ÌI «û£ð£ ¬èèœ",
+    "vanavil": "jäœ bfhG«ò tz¡f« ahœ¥ghz« bgs¤j« brhšnyhéa« nj®jš óä nõhgh iffŸ",
+}
+
+
+def make_text(line: str, megabytes: float) -> str:
+    line += "\n"
+    return line * max(1, int(megabytes * 1024 * 1024 / len(line.encode("utf-8"))))
+
+
+def throughput(fn, text: str, repeat: int) -> float:
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    best = min(_time(fn, text) for _ in range(repeat))
+    return size_mb / best
+
+
+def _time(fn, text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=4.0, help="input size per encoding")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    converter = LegacyConverter()
+    for encoding in ENCODINGS:
+        text = make_text(SAMPLES[encoding], args.mb)
+        compiled = throughput(lambda t: converter.convert(t, encoding), text, args.repeat)
+        line = f"{encoding:>8}: compiled {compiled:8.1f} MB/s"
+        if not args.skip_baseline:
+            baseline = throughput(getattr(txt2unicode, f"{encoding}2unicode"), text, 1)
+            line += f"   baseline {baseline:8.1f} MB/s   ({compiled / baseline:.1f}x)"
+        print(f"{line}   ({args.mb:g} MB)")
+
+
+if __name__ == "__main__":
+    main()
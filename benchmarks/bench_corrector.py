@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: OCR post-correction throughput in pages/s, cold and warm.
+
+    cold: first pass of a new PostCorrector (empty memo caches, lexicon compiled)
+    warm: the same pages again, as on the later pages of a book
+
+Synthetic OCR pages are used: a share (--error-rate) of the words get a letter swapped
+for one Tesseract confuses it with. Compare pages/s with the OCR rate of
+bench_pipeline.py; correction should be a small fraction of it.
+
+Usage: python benchmarks/bench_corrector.py [--pages 500] [--error-rate 0.05] [--lexicon FILE ...]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from app.core.corrector import PostCorrector, _CONSONANT_ALTERNATIVES
+from app.core.lexicon import load_lexicon
+from synthetic import LINES_PER_PAGE, TAMIL_LINES
+
+
+def noisy_pages(count: int, error_rate: float, seed: int = 1):
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        words = " ".join(TAMIL_LINES[(i + j) % len(TAMIL_LINES)] for j in range(LINES_PER_PAGE)).split(" ")
+        for w, word in enumerate(words):
+            if rng.random() < error_rate:
+                swaps = [(k, ch) for k, ch in enumerate(word) if ch in _CONSONANT_ALTERNATIVES]
+                if swaps:
+                    k, ch = rng.choice(swaps)
+                    words[w] = word[:k] + rng.choice(_CONSONANT_ALTERNATIVES[ch]) + word[k + 1:]
+        pages.append(" ".join(words))
+    return pages
+
+
+def run(corrector, pages):
+    start = time.perf_counter()
+    corrections = sum(corrector.correct(page)[1] for page in pages)
+    return len(pages) / (time.perf_counter() - start), corrections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of words misread")
+    parser.add_argument("--lexicon", action="append", help="word list (default: open-tamil's)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    lexicon = load_lexicon(args.lexicon)
+    if lexicon is None:
+        sys.exit("No word lists found (install open-tamil or pass --lexicon)")
+    print(f"lexicon: {len(lexicon)} words, opened in {time.perf_counter() - start:.2f}s")
+
+    pages = noisy_pages(args.pages, args.error_rate)
+    corrector = PostCorrector(lexicon)
+    for name in ("cold", "warm"):
+        rate, corrections = run(corrector, pages)
+        print(f"{name:>5}: {rate:9.0f} pages/s   {corrections / len(pages):.1f} corrections/page")
+
+
+if __name__ == "__main__":
+    main()
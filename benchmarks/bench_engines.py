@@ -0,0 +1,96 @@
+"""
+Throughput benchmark: pages/sec of each OCR engine through the worker pool.
+
+    stub          no Tesseract; the cost of rendering, framing and the pool
+    pytesseract   tesseract CLI per page (temp files, process start, model load)
+    libtesseract  in-process TessBaseAPI, models loaded once per worker
+
+Pages are rendered once from a synthetic scanned PDF (synthetic.py) and sent
+to OCRWorkerPool the way PDFExtractor does. "first ms" is the first page,
+which includes starting the worker and the engine. By default pytesseract
+calls fake_tesseract.py (fixed latency per page); --real uses the installed
+Tesseract. Engines that cannot start here (no libtesseract) are reported.
+
+Usage: python benchmarks/bench_engines.py [--pages 50] [--workers 2] [--dpi 150]
+    [--engines stub pytesseract libtesseract] [--real] [--latency-ms 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import fitz  # PyMuPDF
+from app.core.extractor import render_for_ocr
+from app.core.ocr_engine import ENGINES
+from app.core.ocr_pool import OCRWorkerPool
+from app.core.ocr_worker import FORMAT_RAW_GRAY, OCRError
+import fake_tesseract
+import synthetic
+
+
+def render_pages(path: str, pages: int, dpi: int):
+    synthetic.make_pdf(path, pages, "image")
+    with fitz.open(path) as doc:
+        return [render_for_ocr(page, dpi) for page in doc]
+
+
+def run_engine(engine: str, pixmaps, workers: int, tesseract: str, lang: str):
+    pool = OCRWorkerPool(size=workers, tesseract_path=tesseract)
+
+    def ocr(pix):
+        return pool.run(pix.samples_mv, FORMAT_RAW_GRAY, pix.width, pix.height, lang=lang, dpi=pix.xres,
+                        engine=engine)
+
+    try:
+        start = time.perf_counter()
+        ocr(pixmaps[0])
+        first_ms = (time.perf_counter() - start) * 1000
+        # Start the other workers (and their engines) before timing
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(ocr, pixmaps[:workers]))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(ocr, pixmaps))
+        return len(pixmaps) / (time.perf_counter() - start), first_ms
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--lang", default="tam+eng")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--real", action="store_true", help="use the installed tesseract, not the fake one")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake tesseract time per page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="unitamil-bench-") as tmp:
+        tesseract = None
+        if not args.real:
+            tesseract = str(fake_tesseract.install(Path(tmp) / "bin"))
+            os.environ["FAKE_TESSERACT_LATENCY_MS"] = str(args.latency_ms)
+        pixmaps = render_pages(str(Path(tmp) / "scans.pdf"), args.pages, args.dpi)
+        print(f"{len(pixmaps)} pages at {args.dpi} DPI, {args.workers} workers"
+              f"{'' if args.real else f', fake tesseract {args.latency_ms:g} ms/page'}")
+        print(f"{'engine':<14}{'pages/s':>9}{'first ms':>10}")
+        for engine in args.engines:
+            try:
+                rate, first_ms = run_engine(engine, pixmaps, args.workers, tesseract, args.lang)
+            except OCRError as e:
+                print(f"{engine:<14}  unavailable: {e}")
+                continue
+            print(f"{engine:<14}{rate:>9.1f}{first_ms:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
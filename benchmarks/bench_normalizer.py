@@ -0,0 +1,91 @@
+"""
+Micro-benchmark: Normalizer throughput in MB/s and pages/s.
+
+    baseline: unicodedata.normalize('NFC') on every page (the old normalizer)
+    tamil:    Normalizer.normalize (repair scan and NFC only when needed)
+
+Real page dumps are the interesting input: pass files or folders of pipeline
+output (pages/page_N.md, extracted.md) or any UTF-8 .txt/.md files. Without
+paths, synthetic pages are used: clean Unicode, and OCR-like pages where one
+line in ten has a zero-width joiner, a doubled pulli or a split vowel sign.
+
+Usage: python benchmarks/bench_normalizer.py [DUMP ...] [--pages 2000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from app.core.normalizer import Normalizer
+from synthetic import LINES_PER_PAGE, TAMIL_LINES
+
+NOISE = ("‍", "்்", "ொ")
+
+
+def load_pages(paths):
+    pages = []
+    for path in map(Path, paths):
+        files = sorted(p for p in path.rglob("*") if p.suffix in (".md", ".txt")) if path.is_dir() else [path]
+        for f in files:
+            text = f.read_text(encoding="utf-8", errors="replace")
+            # extracted.md holds many pages; split it back so per-page costs are realistic
+            pages.extend(t for t in text.split("\n---\n") if t.strip())
+    return pages
+
+
+def synthetic_pages(count: int, noisy: bool):
+    pages = []
+    for i in range(count):
+        lines = [TAMIL_LINES[(i + j) % len(TAMIL_LINES)] for j in range(LINES_PER_PAGE)]
+        if noisy:
+            for j in range(0, LINES_PER_PAGE, 10):
+                words = lines[j].split(" ")
+                words[1] = words[1][:2] + NOISE[(i + j) % len(NOISE)] + words[1][2:]
+                lines[j] = " ".join(words)
+        pages.append("\n".join(lines))
+    return pages
+
+
+def throughput(fn, pages, repeat: int):
+    size_mb = sum(len(p.encode("utf-8")) for p in pages) / (1024 * 1024)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            fn(page)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best, len(pages) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dumps", nargs="*", help="page dump files or folders")
+    parser.add_argument("--pages", type=int, default=2000, help="synthetic pages per corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.dumps:
+        corpora = {"dump": load_pages(args.dumps)}
+    else:
+        corpora = {"clean": synthetic_pages(args.pages, False), "ocr-noise": synthetic_pages(args.pages, True)}
+
+    normalizer = Normalizer()
+    baseline = lambda text: unicodedata.normalize('NFC', text)
+    for name, pages in corpora.items():
+        if not pages:
+            print(f"{name}: no pages")
+            continue
+        base_mb, base_pages = throughput(baseline, pages, args.repeat)
+        new_mb, new_pages = throughput(normalizer.normalize, pages, args.repeat)
+        print(f"{name:>10}: tamil {new_mb:7.1f} MB/s {new_pages:9.0f} pages/s   "
+              f"baseline {base_mb:7.1f} MB/s {base_pages:9.0f} pages/s   ({new_mb / base_mb:.1f}x, {len(pages)} pages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Throughput benchmark: pages/sec, p50/p99 page latency and peak RSS.
+
+Targets:
+    extractor   PDFExtractor.process_pdf (ShardedExtractor when workers > 1)
+    pipeline    ProcessingPipeline.process_file (page_workers = workers)
+    converter   LegacyConverter.convert on each page's extracted text
+    normalizer  Normalizer.normalize on each page's converted text
+
+The PDFs come from synthetic.py. OCR goes through the real worker pool, but
+the tesseract it calls is fake_tesseract.py, with a fixed latency per page.
+Page latency is the time between consecutive pages coming out of the target.
+Each run happens in a fresh process, so peak RSS is per run. "children" is
+the largest peak among the OCR/shard processes.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--pages 1 10 100 2000] [--kinds mixed image]
+        [--workers 1 2 4] [--targets extractor pipeline converter normalizer]
+        [--latency-ms 50] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TARGETS = ("extractor", "pipeline", "converter", "normalizer")
+# Text-only targets run once, not per worker count
+SINGLE_THREADED = ("converter", "normalizer")
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None, None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+
+def _extractor(tesseract: str, workers: int):
+    from app.core.extractor import PDFExtractor
+    from app.core.ocr_pool import OCRWorkerPool
+    return PDFExtractor(tesseract, ocr_pool=OCRWorkerPool(size=workers, tesseract_path=tesseract), use_ocr_cache=False)
+
+
+def _timed(iterable):
+    """Yield items and record the time each one took to arrive."""
+    latencies = []
+    last = time.perf_counter()
+    def gen():
+        nonlocal last
+        for item in iterable:
+            now = time.perf_counter()
+            latencies.append(now - last)
+            last = now
+            yield item
+    return gen(), latencies
+
+
+def run_one(target: str, pdf: str, workers: int, tesseract: str) -> dict:
+    """Runs in the child process."""
+    from app.core.converter import LegacyConverter
+    from app.core.normalizer import Normalizer
+    from app.core.sharding import ShardedExtractor
+
+    pages = 0
+    start = time.perf_counter()
+    if target == "extractor":
+        extractor = _extractor(tesseract, workers)
+        source = ShardedExtractor(extractor, workers) if workers > 1 else extractor
+        stream, latencies = _timed(source.process_pdf(pdf))
+        pages = sum(1 for _ in stream)
+        extractor.ocr_pool.close()
+
+    elif target == "pipeline":
+        from app.core.pipeline import DocumentWriter, ProcessingPipeline
+        pipeline = ProcessingPipeline(tesseract, page_workers=workers)
+        pipeline.resume = False
+        pipeline.extractor.ocr_cache = None
+        pipeline.extractor._ocr_pool = _extractor(tesseract, workers).ocr_pool
+        latencies, last = [], [time.perf_counter()]
+        add_page = DocumentWriter.add_page
+        def timed_add_page(writer, page_data):
+            add_page(writer, page_data)
+            now = time.perf_counter()
+            latencies.append(now - last[0])
+            last[0] = now
+        DocumentWriter.add_page = timed_add_page
+        with tempfile.TemporaryDirectory() as out:
+            start = last[0] = time.perf_counter()
+            if not pipeline.process_file(pdf, out):
+                raise RuntimeError("process_file failed")
+        pages = len(latencies)
+        pipeline.extractor.ocr_pool.close()
+
+    else:
+        # Text of every page, extracted up front (not timed); image pages are left out
+        import fitz
+        with fitz.open(pdf) as doc:
+            texts = [page.get_text() for page in doc]
+        texts = [t for t in texts if t.strip()]
+        converter, normalizer = LegacyConverter(), Normalizer()
+        if target == "normalizer":
+            texts = [converter.convert(t) for t in texts]
+        fn = converter.convert if target == "converter" else normalizer.normalize
+        latencies = []
+        start = time.perf_counter()
+        for text in texts:
+            t0 = time.perf_counter()
+            fn(text)
+            latencies.append(time.perf_counter() - t0)
+        pages = len(texts)
+
+    elapsed = time.perf_counter() - start
+    rss, children = peak_rss_mb()
+    return {
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "peak_rss_mb": rss,
+        "children_peak_rss_mb": children,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--kinds", nargs="+", default=["mixed"], help="unicode legacy image mixed")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake tesseract time per page")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        spec = json.loads(args.run_one)
+        print(json.dumps(run_one(spec["target"], spec["pdf"], spec["workers"], spec["tesseract"])))
+        return
+
+    import fake_tesseract
+    import synthetic
+
+    with tempfile.TemporaryDirectory(prefix="unitamil-bench-") as tmp:
+        tesseract = str(fake_tesseract.install(Path(tmp) / "bin"))
+        env = dict(os.environ, FAKE_TESSERACT_LATENCY_MS=str(args.latency_ms), UNITAMIL_TESSERACT_CMD=tesseract)
+        if not args.json:
+            print(f"{'target':<11}{'kind':<8}{'pages':>6}{'workers':>8}{'pages/s':>10}{'p50 ms':>9}"
+                  f"{'p99 ms':>9}{'RSS MB':>8}{'child MB':>9}")
+        for kind in args.kinds:
+            for pages in args.pages:
+                pdf = synthetic.make_pdf(str(Path(tmp) / f"{kind}-{pages}.pdf"), pages, kind)
+                for target in args.targets:
+                    for workers in (args.workers[:1] if target in SINGLE_THREADED else args.workers):
+                        spec = {"target": target, "pdf": pdf, "workers": workers, "tesseract": tesseract}
+                        proc = subprocess.run(
+                            [sys.executable, os.path.abspath(__file__), "--run-one", json.dumps(spec)],
+                            env=env, capture_output=True, text=True
+                        )
+                        if proc.returncode != 0:
+                            print(f"{target} {kind} {pages}p {workers}w failed:\n{proc.stderr[-2000:]}", file=sys.stderr)
+                            continue
+                        result = json.loads(proc.stdout.strip().splitlines()[-1])
+                        result.update(target=target, kind=kind, workers=workers, size=pages)
+                        if args.json:
+                            print(json.dumps(result))
+                        else:
+                            print(f"{target:<11}{kind:<8}{pages:>6}{workers:>8}{result['pages_per_sec']:>10}"
+                                  f"{result['p50_ms']:>9}{result['p99_ms']:>9}"
+                                  f"{result['peak_rss_mb'] or '-':>8}{result['children_peak_rss_mb'] or '-':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: what each preprocessing profile (src/app/core/preprocess.py)
+does to OCR time and accuracy on degraded scans.
+
+Pages of known text are rendered, rotated by up to --max-skew degrees and
+given a dark scanner border, uneven lighting and noise. Every profile
+cleans each page the way PDFExtractor does, then the page goes through
+OCRWorkerPool to each engine:
+
+    prep ms    preprocessing per page
+    ocr ms     engine time per page (reported by the worker)
+    kpx        pixels sent per page, thousands
+    accuracy   characters of the known text recognized, in order (difflib
+               matching blocks). Only meaningful for real engines: the stub
+               and fake tesseract return fixed text, so it is shown as "-".
+
+By default pytesseract calls fake_tesseract.py; --real uses the installed
+Tesseract. The text is English (no Tamil font is needed to draw it), so the
+default language is eng.
+
+Usage: python benchmarks/bench_preprocess.py [--pages 10] [--dpi 150]
+    [--engines stub pytesseract] [--profiles off crop scan noisy] [--real]
+"""
+import argparse
+import difflib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import fitz  # PyMuPDF
+import numpy as np
+from app.core.extractor import PDFExtractor
+from app.core.ocr_engine import ENGINES
+from app.core.ocr_pool import OCRWorkerPool
+from app.core.ocr_worker import FORMAT_RAW_GRAY, OCRError
+from app.core.preprocess import PROFILES, pixmap_gray
+import fake_tesseract
+
+LINES = [
+    "The quick brown fox jumps over the lazy dog",
+    "Pack my box with five dozen liquor jugs 0123456789",
+    "Sphinx of black quartz, judge my vow",
+    "How vexingly quick daft zebras jump",
+]
+
+
+def degraded_page(index: int, dpi: int, max_skew: float, rng: np.random.Generator):
+    """(gray pixmap of a skewed, bordered, unevenly lit and noisy scan, its text)."""
+    lines = [LINES[(index + i) % len(LINES)] for i in range(24)]
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    for i, line in enumerate(lines):
+        page.insert_text((60, 90 + i * 28), line, fontsize=12)
+    angle = float(rng.uniform(-max_skew, max_skew))
+    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72).prerotate(angle), colorspace=fitz.csGRAY)
+    gray = pixmap_gray(pix.samples_mv, pix.width, pix.height, pix.n, pix.stride).astype(np.float64)
+    height, width = gray.shape
+    # Light falling off towards one corner, sensor noise, a dark border
+    lighting = 1.0 - 0.35 * (np.linspace(0, 1, height)[:, None] * np.linspace(0, 1, width)[None, :])
+    gray = gray * lighting + rng.normal(0, 12, gray.shape)
+    border = max(4, dpi // 12)
+    gray[:border], gray[-border:], gray[:, :border], gray[:, -border:] = 30, 30, 30, 30
+    samples = np.clip(gray, 0, 255).astype(np.uint8)
+    scan = fitz.Pixmap(fitz.csGRAY, width, height, samples.tobytes(), False)
+    scan.set_dpi(dpi, dpi)
+    return scan, "\n".join(lines)
+
+
+def accuracy(reference: str, text: str) -> float:
+    reference, text = " ".join(reference.split()), " ".join(text.split())
+    matcher = difflib.SequenceMatcher(None, reference, text, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(reference)
+
+
+def run(pool: OCRWorkerPool, extractor: PDFExtractor, pages, engine: str, lang: str, score: bool):
+    prep_ms = ocr_ms = pixels = 0.0
+    scores = []
+    for pix, reference in pages:
+        start = time.perf_counter()
+        payload, width, height = extractor.prepare_image(pix)
+        prep_ms += (time.perf_counter() - start) * 1000
+        response = pool.run(payload, FORMAT_RAW_GRAY, width, height, lang=lang, dpi=pix.xres, engine=engine)
+        ocr_ms += response.ocr_ms
+        pixels += width * height
+        if score:
+            scores.append(accuracy(reference, response.text))
+    count = len(pages)
+    return prep_ms / count, ocr_ms / count, pixels / count / 1000, (sum(scores) / count if scores else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--max-skew", type=float, default=3.0, help="pages are rotated up to this many degrees")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["stub", "pytesseract"])
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--real", action="store_true", help="use the installed tesseract, not the fake one")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake tesseract time per page")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pages = [degraded_page(i, args.dpi, args.max_skew, rng) for i in range(args.pages)]
+    with tempfile.TemporaryDirectory(prefix="unitamil-bench-") as tmp:
+        tesseract = None
+        if not args.real:
+            tesseract = str(fake_tesseract.install(Path(tmp) / "bin"))
+            os.environ["FAKE_TESSERACT_LATENCY_MS"] = str(args.latency_ms)
+        pool = OCRWorkerPool(size=1, tesseract_path=tesseract)
+        extractor = PDFExtractor(tesseract, ocr_pool=pool, use_ocr_cache=False)
+        print(f"{len(pages)} degraded pages at {args.dpi} DPI (skew up to {args.max_skew:g} degrees)"
+              f"{'' if args.real else f', fake tesseract {args.latency_ms:g} ms/page'}")
+        print(f"{'engine':<14}{'profile':<8}{'prep ms':>9}{'ocr ms':>9}{'kpx':>8}{'accuracy':>10}")
+        try:
+            for engine in args.engines:
+                score = args.real and engine != "stub"
+                for profile in args.profiles:
+                    extractor.configure_ocr(preprocess=profile)
+                    try:
+                        prep_ms, ocr_ms, kpx, acc = run(pool, extractor, pages, engine, args.lang, score)
+                    except OCRError as e:
+                        print(f"{engine:<14}  unavailable: {e}")
+                        break
+                    acc_text = f"{acc:>10.1%}" if acc is not None else f"{'-':>10}"
+                    print(f"{engine:<14}{profile:<8}{prep_ms:>9.1f}{ocr_ms:>9.1f}{kpx:>8.0f}{acc_text}")
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
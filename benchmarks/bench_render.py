@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: time from rendering a page to having the OCR input image.
+
+    before: RGB pixmap -> PNG bytes -> Image.open() in the worker
+    after:  grayscale pixmap -> raw samples -> Image.frombuffer() in the worker
+
+Both paths go through the real framing code (in memory, no subprocess).
+Usage: python benchmarks/bench_render.py [--dpi 300] [--repeat 5]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import fitz  # PyMuPDF
+from app.core import ocr_worker
+from app.core.extractor import render_for_ocr
+
+
+def make_page() -> fitz.Document:
+    """A4 page with enough text and line art to look like a scan."""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    y = 60
+    while y < 800:
+        page.insert_text((50, y), "The quick brown fox jumps over the lazy dog 0123456789", fontsize=11)
+        y += 16
+    page.draw_rect(fitz.Rect(40, 40, 555, 802), color=(0, 0, 0), width=1)
+    return doc
+
+
+def through_protocol(payload, image_format, width=0, height=0):
+    buf = io.BytesIO()
+    ocr_worker.write_request(buf, ocr_worker.OCRRequest(1, image_format, width, height, 300, "tam+eng", payload))
+    buf.seek(0)
+    image = ocr_worker.decode_image(ocr_worker.read_request(buf))
+    image.load()
+    return image
+
+
+def before(page, dpi):
+    pix = page.get_pixmap(dpi=dpi)
+    return through_protocol(pix.tobytes("png"), ocr_worker.FORMAT_PNG)
+
+
+def after(page, dpi):
+    pix = render_for_ocr(page, dpi)
+    return through_protocol(pix.samples_mv, ocr_worker.FORMAT_RAW_GRAY, pix.width, pix.height)
+
+
+def timeit(fn, page, dpi, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page, dpi)
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    doc = make_page()
+    page = doc[0]
+    for name, fn in (("rgb+png", before), ("gray raw", after)):
+        best, mean = timeit(fn, page, args.dpi, args.repeat)
+        print(f"{name:>10}: best {best * 1000:8.1f} ms   mean {mean * 1000:8.1f} ms   ({args.dpi} DPI)")
+
+
+if __name__ == "__main__":
+    main()
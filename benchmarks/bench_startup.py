@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: OCR worker start-up, from spawn until it is ready to serve.
+
+    cold: first start with an empty bytecode cache (PYTHONPYCACHEPREFIX in a temp dir)
+    warm: later starts, bytecode cached
+
+Each start runs `python src/main.py --ocr-worker` with stdin closed, so the
+worker imports, finds no request and exits. The largest imports are listed
+from `python -X importtime`; tests/core/test_startup.py keeps the heavy ones
+(GUI, PDF stack, OCR engine) out of this path.
+
+Usage: python benchmarks/bench_startup.py [--repeat 10] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "main.py")
+WORKER = [sys.executable, MAIN, "--ocr-worker"]
+
+
+def start_ms(env, cmd=WORKER) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, stdin=subprocess.DEVNULL, env=env, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def top_imports(count: int):
+    result = subprocess.run([sys.executable, "-X", "importtime", *WORKER[1:]], stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "package" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.rstrip()))
+    return len(rows), sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="largest imports to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=cache)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)  # warm runs need the cache written
+        cold = start_ms(env)
+        warm = sorted(start_ms(env) for _ in range(args.repeat))
+    bare = min(start_ms(None, [sys.executable, "-c", "pass"]) for _ in range(args.repeat))
+
+    print(f"cold: {cold:7.1f} ms")
+    print(f"warm: {warm[len(warm) // 2]:7.1f} ms median, {warm[0]:.1f} ms best ({args.repeat} runs)")
+    print(f"bare: {bare:7.1f} ms (python -c pass)")
+    modules, top = top_imports(args.top)
+    print(f"{modules} modules imported; largest (cumulative):")
+    for us, name in top:
+        print(f"  {us / 1000:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
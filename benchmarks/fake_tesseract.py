@@ -0,0 +1,70 @@
+"""
+Stand-in for the tesseract executable, so the OCR path can be benchmarked
+without the real engine. It answers --version and --list-langs, and for a
+recognition call sleeps for a configurable time and writes a fixed TSV/TXT
+result with a fixed confidence.
+
+    FAKE_TESSERACT_LATENCY_MS   time per page (default 50)
+    FAKE_TESSERACT_JITTER_MS    extra random time, uniform 0..jitter (default 0)
+    FAKE_TESSERACT_CONFIDENCE   word confidence reported (default 90)
+
+install(directory) writes an executable "tesseract" wrapper that runs this
+script with the current interpreter (POSIX only).
+"""
+import os
+import random
+import stat
+import sys
+import time
+from pathlib import Path
+
+WORDS = ["தமிழ்", "மொழி", "வணக்கம்", "synthetic", "page", "text"]
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def install(directory: Path) -> Path:
+    """Create an executable 'tesseract' in directory and return its path."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    wrapper = directory / "tesseract"
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n', encoding="utf-8")
+    wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return wrapper
+
+
+def tsv(confidence: float) -> str:
+    rows = [TSV_HEADER]
+    for i, word in enumerate(WORDS, 1):
+        rows.append(f"5\t1\t1\t1\t1\t{i}\t{i * 60}\t40\t50\t20\t{confidence:g}\t{word}")
+    return "\n".join(rows) + "\n"
+
+
+def main(argv) -> int:
+    if "--version" in argv:
+        print("tesseract 5.3.0 (fake)")
+        return 0
+    if "--list-langs" in argv:
+        print('List of available languages in "/fake" (2):\neng\ntam')
+        return 0
+    if len(argv) < 2:
+        print("Usage: tesseract imagename outputbase [options...] [configfile...]", file=sys.stderr)
+        return 1
+
+    image, outbase = argv[0], argv[1]
+    if not os.path.exists(image):
+        print(f"Error, cannot read input file {image}", file=sys.stderr)
+        return 1
+    latency = float(os.environ.get("FAKE_TESSERACT_LATENCY_MS", "50"))
+    jitter = float(os.environ.get("FAKE_TESSERACT_JITTER_MS", "0"))
+    time.sleep((latency + random.uniform(0, jitter)) / 1000.0)
+
+    confidence = float(os.environ.get("FAKE_TESSERACT_CONFIDENCE", "90"))
+    if "tsv" in argv or any("tessedit_create_tsv=1" in a for a in argv):
+        Path(outbase + ".tsv").write_text(tsv(confidence), encoding="utf-8")
+    else:
+        Path(outbase + ".txt").write_text(" ".join(WORDS) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,135 @@
+"""
+Synthetic benchmark PDFs.
+
+    unicode  Tamil Unicode text layer
+    legacy   Bamini-encoded text in a font named "Bamini"
+    image    image-only pages (needs OCR)
+    clipping Unicode text with a scanned clipping between its paragraphs
+    mixed    unicode, legacy and image pages in turn
+
+No Tamil font is needed. Unicode pages are drawn with Courier, whose codes
+are mapped to Tamil code points by a ToUnicode CMap. The font is renamed so
+its name marks it as a Tamil Unicode font. Text extraction sees real Tamil;
+the rendered glyphs are Latin, which only matters for OCR, and OCR pages are
+images anyway.
+
+Usage: python benchmarks/synthetic.py OUT.pdf --pages 100 --kind mixed
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import fitz  # PyMuPDF
+
+KINDS = ("unicode", "legacy", "image", "clipping", "mixed")
+# Where a clipping page's image goes; its text lines stay above and below
+CLIPPING_RECT = fitz.Rect(50, 330, 545, 520)
+
+TAMIL_LINES = [
+    "தமிழ் மொழி உலகின் மிகப் பழமையான மொழிகளில் ஒன்றாகும்",
+    "யாழ்ப்பாணம் கொழும்பு சென்னை மதுரை நகரங்களில் பேசப்படுகிறது",
+    "சொல்லோவியம் பௌத்தம் தேர்தல் பூமி வணக்கம் கைகள்",
+]
+BAMINI_LINES = [
+    "jkpo; nfhOk;G tzf;fk; aho;g;ghzk; ngsj;jk;",
+    "nrhy;Nyhtpak; Nju;jy; G+kp N\\hgh iffs;",
+]
+LINES_PER_PAGE = 30
+
+# Tamil code points mapped to single-byte codes 0xA1.. of the synthetic font
+_TAMIL = [chr(cp) for cp in range(0x0B82, 0x0BD8) if chr(cp).isprintable()]
+_CODES = {ch: chr(0xA1 + i) for i, ch in enumerate(_TAMIL)}
+
+
+def _to_unicode_cmap() -> bytes:
+    pairs = "\n".join(f"<{0xA1 + i:02X}> <{ord(ch):04X}>" for i, ch in enumerate(_TAMIL))
+    return (
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+        "/CMapName /SyntheticTamil def\n"
+        "1 begincodespacerange <00> <FF> endcodespacerange\n"
+        f"{len(_TAMIL)} beginbfchar\n{pairs}\nendbfchar\n"
+        "endcmap CMapName currentdict /CMap defineresource pop end end"
+    ).encode("ascii")
+
+
+def _text_page(doc: fitz.Document, lines, fontname: str, gap: fitz.Rect = None):
+    page = doc.new_page(width=595, height=842)
+    y = 60
+    for i in range(LINES_PER_PAGE):
+        if gap is not None and gap.y0 - 12 <= y <= gap.y1 + 12:
+            y += 24
+            continue
+        page.insert_text((50, y), lines[i % len(lines)], fontname=fontname, fontsize=10)
+        y += 24
+    return page
+
+
+def _scan_image() -> fitz.Pixmap:
+    """A 150 DPI grayscale 'scan' of a text page."""
+    src = fitz.open()
+    _text_page(src, ["The quick brown fox jumps over the lazy dog 0123456789"], "helv")
+    return src[0].get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+
+
+def make_pdf(path: str, pages: int, kind: str = "mixed") -> str:
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+    doc = fitz.open()
+    image_xref = 0
+    pix = None
+    for i in range(pages):
+        page_kind = KINDS[i % 3] if kind == "mixed" else kind
+        tamil = ["".join(_CODES.get(c, c) for c in line) for line in TAMIL_LINES]
+        if page_kind == "unicode":
+            _text_page(doc, tamil, "cour")
+        elif page_kind == "legacy":
+            _text_page(doc, BAMINI_LINES, "tiro")
+        else:
+            if page_kind == "clipping":
+                page, rect = _text_page(doc, tamil, "cour", gap=CLIPPING_RECT), CLIPPING_RECT
+            else:
+                page, rect = doc.new_page(width=595, height=842), None
+            rect = rect or page.rect
+            if image_xref:
+                # One image stream shared by all image pages keeps big files small
+                page.insert_image(rect, xref=image_xref, keep_proportion=False)
+            else:
+                pix = pix or _scan_image()
+                image_xref = page.insert_image(rect, pixmap=pix, keep_proportion=False)
+
+    # Rename the base fonts and give the Unicode one its ToUnicode map
+    renamed = set()
+    for page in doc:
+        for xref, _ext, _type, _base, ref, _enc in page.get_fonts():
+            if xref in renamed:
+                continue
+            renamed.add(xref)
+            if ref == "cour":
+                cmap_xref = doc.get_new_xref()
+                doc.update_object(cmap_xref, "<<>>")
+                doc.update_stream(cmap_xref, _to_unicode_cmap())
+                doc.xref_set_key(xref, "ToUnicode", f"{cmap_xref} 0 R")
+                doc.xref_set_key(xref, "BaseFont", "/NotoSansTamil-Synthetic")
+            elif ref == "tiro":
+                doc.xref_set_key(xref, "BaseFont", "/Bamini")
+        if len(renamed) >= 2:
+            break
+    doc.save(path, garbage=1, deflate=True)
+    doc.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--kind", choices=KINDS, default="mixed")
+    args = parser.parse_args()
+    make_pdf(args.output, args.pages, args.kind)
+    print(f"{args.output}: {args.pages} {args.kind} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Headless CLI - Batch conversion without the GUI (servers, containers, cron).
+
+    python main.py --batch INPUT OUTPUT [--workers N] [--page-workers N] [--dpi 150] [--max-dpi 300]
+                   [--lang tam+eng] [--force-ocr] [--recursive] [--no-resume]
+                   [--trace trace.json]
+
+Progress is written to stdout as JSON lines, logs go to stderr. Exit codes:
+0 all files converted, 1 some files failed, 2 bad arguments or no input.
+Nothing in here imports Flet.
+"""
+import argparse
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, TextIO
+from .core.memory_budget import MB
+from .core.ocr_engine import ENGINES, MIN_OCR_DPI
+from .core.preprocess import PROFILES
+from .utils.logger import logger
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def at_least(minimum: int):
+    """argparse type: an integer no lower than minimum (else exit code 2)."""
+    def parse(text: str) -> int:
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid integer: '{text}'")
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+        return value
+    return parse
+
+
+def positive_number(text: str) -> float:
+    """argparse type: a finite number above zero (else exit code 2)."""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: '{text}'")
+    if not math.isfinite(value) or value <= 0:
+        raise argparse.ArgumentTypeError(f"must be a number above 0, got {text}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="unitamil",
+        description="Convert Tamil PDFs to Markdown without the GUI.",
+    )
+    parser.add_argument("--batch", nargs=2, metavar=("INPUT", "OUTPUT"), required=True,
+                        help="PDF file or folder of PDFs, and the output folder")
+    parser.add_argument("--workers", type=at_least(1), default=None,
+                        help="OCR worker processes (default: one per CPU)")
+    parser.add_argument("--page-workers", type=at_least(1), default=1,
+                        help="processes extracting the pages of each large PDF at once (default: 1)")
+    parser.add_argument("--dpi", type=at_least(MIN_OCR_DPI), default=150, help="first OCR render resolution")
+    parser.add_argument("--max-dpi", type=at_least(MIN_OCR_DPI), default=300,
+                        help="highest resolution for low-confidence pages")
+    parser.add_argument("--lang", default="tam+eng", help="Tesseract languages")
+    parser.add_argument("--ocr-engine", choices=ENGINES, default=None,
+                        help="OCR backend (default: $UNITAMIL_OCR_ENGINE or pytesseract)")
+    parser.add_argument("--preprocess", choices=PROFILES, default=None,
+                        help="cleanup of rendered pages before OCR (default: scan)")
+    parser.add_argument("--region-ocr", action=argparse.BooleanOptionalAction, default=True,
+                        help="OCR only the image regions of partly-text pages (default: on)")
+    parser.add_argument("--memory-budget", type=positive_number, default=None, metavar="MB",
+                        help="memory for rendered pages; renders wait or lower their DPI to stay within it "
+                             "(default: $UNITAMIL_MEMORY_BUDGET_MB or a quarter of RAM)")
+    parser.add_argument("--force-ocr", action="store_true", help="OCR every page, ignoring text layers")
+    parser.add_argument("--correct", action="store_true",
+                        help="correct OCR words one edit from a known Tamil word")
+    parser.add_argument("--lexicon", action="append", type=Path, metavar="FILE",
+                        help="word list for --correct (repeatable; default: open-tamil's)")
+    parser.add_argument("--recursive", action="store_true", help="also scan subfolders of INPUT")
+    parser.add_argument("--resume", action=argparse.BooleanOptionalAction, default=True,
+                        help="continue interrupted documents from their checkpoint (default: on)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write a Chrome/Perfetto trace of the whole batch to FILE")
+    return parser
+
+
+class JsonLinesReporter:
+    """Writes one JSON object per event; callable from any pipeline thread."""
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        line = json.dumps(dict(event=event, time=round(time.time(), 3), **fields), ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def _logs_to_stderr():
+    # stdout is reserved for progress events
+    for handler in logger.handlers:
+        if isinstance(handler, logging.StreamHandler) and getattr(handler, "stream", None) is sys.stdout:
+            handler.setStream(sys.stderr)
+
+
+def run_batch(args: argparse.Namespace, out: TextIO) -> int:
+    # Imported here so "--help" and argument errors stay fast
+    from .core.dependency_checker import DependencyChecker
+    from .core.ocr_pool import OCRWorkerPool
+    from .core.pipeline import ProcessingPipeline
+    from .core.scanner import find_pdfs, output_folder
+    from .core.scheduler import BatchScheduler
+    from .utils import tracing
+
+    reporter = JsonLinesReporter(out)
+    input_path, output_dir = Path(args.batch[0]), Path(args.batch[1])
+    if not input_path.exists():
+        reporter.emit("error", message=f"Input not found: {input_path}")
+        return EXIT_USAGE
+    files = find_pdfs(input_path, args.recursive)
+    if not files:
+        reporter.emit("error", message=f"No PDF files in {input_path}")
+        return EXIT_USAGE
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    checker = DependencyChecker()
+    if not checker.check_tesseract():
+        reporter.emit("warning", message="Tesseract not found; pages that need OCR will be skipped")
+
+    pipeline = ProcessingPipeline(checker.tesseract_path, page_workers=args.page_workers)
+    pipeline.resume = args.resume
+    pipeline.post_correction = args.correct
+    pipeline.lexicon_sources = args.lexicon
+    pipeline.extractor.configure_ocr(start_dpi=args.dpi, max_dpi=args.max_dpi, lang=args.lang,
+                                     force_ocr=args.force_ocr, engine=args.ocr_engine,
+                                     region_ocr=args.region_ocr, preprocess=args.preprocess)
+    if args.memory_budget is not None:
+        pipeline.extractor.memory_budget.set_limit(int(args.memory_budget * MB))
+    if args.workers:
+        pipeline.extractor._ocr_pool = OCRWorkerPool(size=args.workers, tesseract_path=checker.tesseract_path,
+                                                     memory_budget=pipeline.extractor.memory_budget)
+
+    # Names are relative to INPUT so recursive scans keep distinct output folders
+    def name(pdf_path: Path) -> str:
+        return str(pdf_path.relative_to(input_path)) if input_path.is_dir() else pdf_path.name
+
+    def on_progress(pdf_path: Path, progress: float, message: str):
+        reporter.emit("progress", file=name(pdf_path), progress=round(progress, 3), message=message)
+
+    if args.trace:
+        tracing.enable("unitamil")
+    start = time.perf_counter()
+    reporter.emit("batch_start", files=len(files), input=str(input_path), output=str(output_dir))
+    try:
+        results = BatchScheduler(pipeline).run(
+            files,
+            lambda pdf_path: str(output_folder(pdf_path, input_path, output_dir)),
+            progress_callback=on_progress,
+            on_file_start=lambda f: reporter.emit("file_start", file=name(f)),
+            on_file_done=lambda f, ok: reporter.emit("file_done", file=name(f), ok=ok),
+        )
+    finally:
+        if args.workers:
+            pipeline.extractor.ocr_pool.close()
+        if args.trace:
+            tracing.disable()
+            tracing.write_chrome_trace(args.trace)
+            reporter.emit("trace", path=args.trace)
+
+    failed = [name(f) for f, ok in results.items() if not ok]
+    reporter.emit("batch_done", ok=len(results) - len(failed), failed=failed,
+                  seconds=round(time.perf_counter() - start, 2), memory=pipeline.extractor.memory_budget.stats())
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None, out: TextIO = None) -> int:
+    args = build_parser().parse_args(argv)
+    _logs_to_stderr()
+    return run_batch(args, out or sys.stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Resume Checkpoint - Append-only record of a document's finished pages.
+
+The first line holds the extraction settings and a fingerprint of the source
+PDF; every finished page appends one line with its metadata, a hash of its
+text and where extracted.md (still the .tmp file) ended after it. On resume,
+pages up to the last consistent line are skipped before extraction and the
+partial extracted.md is continued from that offset. A page is consistent when
+its page_N.md and its part of extracted.md still hold the text it was
+recorded with.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, TextIO
+from ..utils.logger import logger
+
+CHECKPOINT_NAME = ".checkpoint.jsonl"
+FORMAT_VERSION = 1
+_EDGE_BYTES = 1024 * 1024
+
+
+def source_fingerprint(path: Path) -> str:
+    """Size, mtime and the first and last MB of the file: cheap even for huge PDFs."""
+    stat = os.stat(path)
+    digest = hashlib.sha256(f"{stat.st_size}|{stat.st_mtime_ns}".encode("ascii"))
+    with open(path, "rb") as f:
+        digest.update(f.read(_EDGE_BYTES))
+        if stat.st_size > _EDGE_BYTES:
+            f.seek(max(_EDGE_BYTES, stat.st_size - _EDGE_BYTES))
+            digest.update(f.read(_EDGE_BYTES))
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def page_markdown(page: int, text: str) -> str:
+    """Contents of pages/page_N.md."""
+    return f"# Page {page}\n\n{text}\n"
+
+
+def combined_markdown(page: int, text: str) -> str:
+    """A page's part of extracted.md."""
+    return f"# Page {page}\n\n{text}\n\n---\n\n"
+
+
+def _holds(content: str, page: int, text_sha256: str, layout) -> bool:
+    """True if content is layout(page, text) for a text with that hash."""
+    prefix, suffix = layout(page, "\0").split("\0")
+    if len(content) < len(prefix) + len(suffix) or not (content.startswith(prefix) and content.endswith(suffix)):
+        return False
+    return text_hash(content[len(prefix):len(content) - len(suffix)]) == text_sha256
+
+
+class Checkpoint:
+    def __init__(self, path: Path, settings: Dict, source: str):
+        """
+        Args:
+            path: Checkpoint file (one per output directory)
+            settings: Everything that changes the output; a different value starts over
+            source: Fingerprint of the input PDF
+        """
+        self.path = Path(path)
+        self.header = {"version": FORMAT_VERSION, "settings": settings, "source": source}
+        self.pages: Dict[int, Dict] = {}   # page number -> record, finished pages only
+        self.combined_offset = 0           # bytes of extracted.md covering those pages
+        self.finished = False
+        self._file: Optional[TextIO] = None
+
+    def load(self, pages_dir: Path, combined_tmp: Path, combined_final: Path) -> bool:
+        """
+        Read an earlier run's checkpoint. Keeps the longest run of pages from
+        page 1 whose outputs are still on disk as written (checked against the
+        recorded text hashes). Returns True if anything resumes.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0]) if lines else None
+        except (OSError, ValueError) as e:
+            logger.debug(f"No usable checkpoint at {self.path}: {e}")
+            return False
+        if header != self.header:
+            logger.info(f"Checkpoint {self.path} is for other settings or another file; starting over")
+            return False
+
+        records = {}
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # Torn last line after a crash
+            if record.get("finished"):
+                self.finished = True
+            else:
+                records[record["page"]] = record
+
+        # extracted.md.tmp of an interrupted run, or the finished file of a completed one
+        try:
+            combined = (combined_final if self.finished else combined_tmp).read_bytes()
+        except OSError:
+            combined = b""
+        page = 1
+        while page in records:
+            record = records[page]
+            if not self._intact(page, record, pages_dir, combined, self.combined_offset):
+                logger.info(f"Page {page} of {self.path.parent.name} changed since it was checkpointed; "
+                            f"resuming before it")
+                break
+            self.pages[page] = record
+            self.combined_offset = record["offset"]
+            page += 1
+        return bool(self.pages)
+
+    @staticmethod
+    def _intact(page: int, record: Dict, pages_dir: Path, combined: bytes, start: int) -> bool:
+        """
+        True if the page's outputs on disk still hold the text it was recorded
+        with; its part of extracted.md starts at byte start.
+        """
+        if not start <= record["offset"] <= len(combined):
+            return False
+        segment = combined[start:record["offset"]]
+        if "sha256" not in record:
+            return not segment  # Skipped pages write nothing
+        try:
+            page_md = (pages_dir / f"page_{page}.md").read_text(encoding="utf-8")
+            chunk = segment.decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return False
+        return (_holds(page_md, page, record["sha256"], page_markdown)
+                and _holds(chunk, page, record["sha256"], combined_markdown))
+
+    def open(self):
+        """Start appending: continue the loaded checkpoint, or start a new one."""
+        if self.pages:
+            # Drop lines past the resumed pages so the file stays consistent
+            lines = [json.dumps(self.header)] + [json.dumps(self.pages[p]) for p in sorted(self.pages)]
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(json.dumps(self.header) + "\n")
+            self._file.flush()
+
+    def record(self, page: int, info: Dict, text: Optional[str], combined_offset: int):
+        """Append a finished page. Flushed per page, so a crash loses at most the page in flight."""
+        record = dict(info, page=page, offset=combined_offset)
+        if text is not None:
+            record["sha256"] = text_hash(text)
+        self.pages[page] = record
+        self.combined_offset = combined_offset
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def mark_finished(self):
+        self._file.write(json.dumps({"finished": True}) + "\n")
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
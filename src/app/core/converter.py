@@ -1,32 +1,188 @@
-from typing import List, Optional
+"""
+Legacy Converter - Converts legacy-encoded Tamil (Bamini, TSCII, TAB, TAM, Vanavil) to Unicode.
+
+The mapping tables come from open-tamil. Each table is compiled once into a
+trie-shaped regular expression, so one left-to-right scan finds the longest
+legacy sequence at every position and conversion is linear in the text
+length. Vowel signs that legacy fonts type before the consonant are moved
+after it in a second pass.
+"""
+import re
+from typing import Dict, Optional
 from ..utils.logger import logger
 
+UNICODE = "unicode"
+ENCODINGS = ("bamini", "tscii", "tab", "tam", "vanavil")
+
+# Stand-ins for prefix vowel signs (ெ ே ை) typed before a consonant that the
+# tables do not list in a sign+consonant entry. They are moved behind the
+# consonant afterwards; private-use code points keep them apart from signs the
+# tables already emitted in the right place.
+_PRE_E, _PRE_EE, _PRE_AI = "\uE000", "\uE001", "\uE002"
+_PREFIX_SIGNS = {_PRE_E: "\u0BC6", _PRE_EE: "\u0BC7", _PRE_AI: "\u0BC8"}
+
+_EXTRA_ENTRIES = {
+    "bamini": {"n": _PRE_E, "N": _PRE_EE, "i": _PRE_AI, "h": "\u0BBE"},
+    "tscii": {"\u00A6": _PRE_E, "\u00A7": _PRE_EE, "\u00A8": _PRE_AI, "\u00A1": "\u0BBE"},
+    "tab": {"\u00AA": _PRE_E, "\u00AB": _PRE_EE, "\u00AC": _PRE_AI, "\u00A3": "\u0BBE"},
+    "tam": {"\u00AA": _PRE_E, "\u00AB": _PRE_EE, "\u00AC": _PRE_AI, "\u00A3": "\u0BBE",
+            "\u00AA\u00EB\u00F7": "\u0B9E\u0BCC"},
+    "vanavil": {"b": _PRE_E, "n": _PRE_EE, "i": _PRE_AI, "h": "\u0BBE"},
+}
+
+# Table entries that are wrong for text extraction
+_DROPPED_KEYS = {
+    "bamini": {"+"},  # open-tamil maps it to "10"
+    "tam": {"\u00AA\u00EB\\\u00F7"},  # stray backslash; re-added above as ஞௌ
+}
+
+# Tables are written as regex sources: "\+" means "+", but a bare "\" is a letter (Bamini ஷ)
+_REGEX_ESCAPE = re.compile(r"\\([+^*$.?|()\[\]{}])")
+
+_PREFIX_SIGN = re.compile("([\uE000-\uE002])([\u0B95-\u0BB9](?:\u0BCD\u0BB7)?)(\u0BBE?)")
+# Prefix sign + consonant + ா reads as the two-part vowels ொ / ோ
+_TWO_PART_SIGNS = {(_PRE_E, "\u0BBE"): "\u0BCA", (_PRE_EE, "\u0BBE"): "\u0BCB"}
+
+
+def _reorder(m: "re.Match") -> str:
+    sign, consonant, aa = m.groups()
+    two_part = _TWO_PART_SIGNS.get((sign, aa))
+    if two_part:
+        return consonant + two_part
+    return consonant + _PREFIX_SIGNS[sign] + aa
+
+
+def _is_tamil(c: str) -> bool:
+    return "\u0B80" <= c <= "\u0BFF"
+
+
+def _load_table(encoding: str) -> Dict[str, str]:
+    from tamil.txt2unicode import encode2utf8
+    source = getattr(encode2utf8, f"{encoding}2utf8")
+    table = dict(_EXTRA_ENTRIES.get(encoding, {}))
+    dropped = _DROPPED_KEYS.get(encoding, set())
+    for key, value in source.items():
+        key = _REGEX_ESCAPE.sub(r"\1", key)
+        if key and key not in dropped:
+            table[key] = value
+    return table
+
+
+def _trie_pattern(keys) -> str:
+    """
+    Regex source that matches the longest key at the current position.
+    Branches of a node start with different characters, and a node that ends
+    a key makes its children optional (greedy), so the regex engine tries the
+    longest continuation first and backs off to the shortest complete key.
+    """
+    trie: Dict = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = None
+
+    def build(node: Dict) -> str:
+        # Children that end a key and have no continuation collapse into one class
+        leaves = [ch for ch, child in sorted(node.items()) if ch and list(child) == [""]]
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items())
+                    if ch and ch not in leaves]
+        if leaves:
+            branches.append(re.escape(leaves[0]) if len(leaves) == 1
+                            else "[" + "".join(re.escape(ch) for ch in leaves) + "]")
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + "|".join(branches) + ")"
+        return body + "?" if "" in node else body
+
+    return build(trie)
+
+
+class _CompiledTable:
+    """One encoding's table compiled into a single-pass substitution."""
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self.table = _load_table(encoding)
+        # Capturing group: split() returns unmatched runs and matched keys alternately
+        self.pattern = re.compile("(" + _trie_pattern(self.table) + ")")
+
+    def convert(self, text: str) -> str:
+        # Everything stays in C: split, dict lookups (runs map to themselves), join
+        parts = self.pattern.split(text)
+        text = "".join(map(self.table.get, parts, parts))
+        if _PRE_E in text or _PRE_EE in text or _PRE_AI in text:
+            text = _PREFIX_SIGN.sub(_reorder, text)
+            # A sign with no consonant after it stays where it was typed
+            for marker, sign in _PREFIX_SIGNS.items():
+                text = text.replace(marker, sign)
+        return text
+
+
+_compiled: Dict[str, _CompiledTable] = {}
+
+
+def compiled_table(encoding: str) -> _CompiledTable:
+    table = _compiled.get(encoding)
+    if table is None:
+        table = _compiled[encoding] = _CompiledTable(encoding)
+    return table
+
+
 class LegacyConverter:
     """
-    Handles conversion of legacy Tamil fonts (Bamini, Vanavil, etc.) to Unicode.
-    For now, this is a placeholder/heuristic implementation.
+    Handles conversion of legacy Tamil fonts (Bamini, TSCII, TAB, TAM, Vanavil) to Unicode.
     """
-    def __init__(self):
-        pass
-        
+    def __init__(self, sample_chars: int = 4000):
+        """
+        Args:
+            sample_chars: Characters looked at when detecting the encoding
+        """
+        self.sample_chars = sample_chars
+        # Compile all tables up front so worker threads never race to do it
+        for encoding in ENCODINGS:
+            compiled_table(encoding)
+
     def detect_encoding(self, text: str) -> str:
         """
         Heuristic detection of encoding.
-        Returns 'unicode', 'bamini', 'tscii', etc.
+        Returns 'unicode', 'bamini', 'tscii', 'tab', 'tam' or 'vanavil'.
         """
-        # Very basic check: if contains specific Bamini chars roughly
-        # This will need a robust implementation/library integration
-        # For now, we assume Unicode mostly
-        return "unicode"
+        sample = text[:self.sample_chars]
+        chars = tamil = latin1 = in_word_semicolons = 0
+        for i, c in enumerate(sample):
+            if c.isspace():
+                continue
+            chars += 1
+            if _is_tamil(c):
+                tamil += 1
+            elif "\u0080" <= c <= "\u00FF" or "\u2010" <= c <= "\u2122" or "\u0152" <= c <= "\u02DC":
+                latin1 += 1
+            elif c == ";" and 0 < i < len(sample) - 1 and sample[i - 1].isalpha() and sample[i + 1].isalpha():
+                in_word_semicolons += 1
+        if chars == 0 or tamil / chars > 0.05:
+            return UNICODE
+        # Plain English has neither high Latin-1 glyphs nor pulli-semicolons inside words
+        if latin1 / chars <= 0.1 and in_word_semicolons / chars <= 0.01:
+            return UNICODE
 
-    def convert(self, text: str) -> str:
+        # Pick the table that turns the most of the sample into Tamil
+        best, best_score = UNICODE, 0.0
+        for encoding in ENCODINGS:
+            converted = compiled_table(encoding).convert(sample)
+            letters = [c for c in converted if not c.isspace()]
+            score = sum(1 for c in letters if _is_tamil(c)) / len(letters) if letters else 0.0
+            if score > best_score:
+                best, best_score = encoding, score
+        return best if best_score >= 0.5 else UNICODE
+
+    def convert(self, text: str, encoding: Optional[str] = None) -> str:
         """
-        Detects and converts text to Unicode if needed.
+        Detects (unless `encoding` is given) and converts text to Unicode if needed.
         """
-        encoding = self.detect_encoding(text)
-        if encoding == "unicode":
+        encoding = encoding or self.detect_encoding(text)
+        if encoding == UNICODE:
             return text
-        
-        # Implement conversion logic here
-        logger.warning(f"Legacy conversion for {encoding} not yet implemented.")
-        return text
+        if encoding not in ENCODINGS:
+            logger.warning(f"Legacy conversion for {encoding} is not supported.")
+            return text
+        return compiled_table(encoding).convert(text)
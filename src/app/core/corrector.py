@@ -0,0 +1,135 @@
+"""
+OCR Post-Correction - Repairs near-miss Tamil words against a lexicon.
+
+A word of an OCR page that is not in the lexicon is split into letters
+(open-tamil's get_letters) and its edits at distance one are looked up:
+a consonant or vowel sign swapped for one Tesseract confuses it with, or
+one letter of a long word dropped. The word is replaced only when exactly one candidate
+is a known word; unknown words with no or several candidates are kept.
+The number of candidates per word is bounded and all lookups are memoized,
+so repeated words (most of a book) cost a dictionary hit.
+"""
+import itertools
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from tamil.utf8 import get_letters
+from ..utils.logger import logger
+from .lexicon import Lexicon, load_lexicon
+
+_WORD = re.compile("[\u0B85-\u0B94\u0B95-\u0BB9][\u0B80-\u0BFF]*")
+
+# Pairs Tesseract confuses in Tamil print; each pair is tried both ways
+_CONSONANT_CONFUSIONS = ("னண", "னள", "ணள", "லள", "ளழ", "லழ", "நன", "ரற", "பய", "வஷ", "சக")
+_SIGN_CONFUSIONS = (
+    ("", "\u0BCD"),        # no sign / pulli
+    ("", "\u0BBE"),        # no sign / aa
+    ("\u0BBF", "\u0BC0"),  # i / ii
+    ("\u0BC1", "\u0BC2"),  # u / uu
+    ("\u0BC6", "\u0BC7"),  # e / ee
+    ("\u0BCA", "\u0BCB"),  # o / oo
+)
+
+
+def _alternatives(pairs) -> Dict[str, Tuple[str, ...]]:
+    table: Dict[str, List[str]] = {}
+    for a, b in pairs:
+        table.setdefault(a, []).append(b)
+        table.setdefault(b, []).append(a)
+    return {k: tuple(v) for k, v in table.items()}
+
+
+_CONSONANT_ALTERNATIVES = _alternatives(_CONSONANT_CONFUSIONS)
+_SIGN_ALTERNATIVES = _alternatives(_SIGN_CONFUSIONS)
+
+
+class PostCorrector:
+    def __init__(self, lexicon: Lexicon, min_letters: int = 3, max_letters: int = 24,
+                 min_drop_letters: int = 6, max_candidates: int = 256, cache_size: int = 200_000):
+        """
+        Args:
+            lexicon: Known words
+            min_letters: Shorter words are never changed (too many neighbours)
+            max_letters: Longer words are skipped (compounds, bounded cost)
+            min_drop_letters: Shortest word a letter may be dropped from
+            max_candidates: Most lookups tried for one word
+            cache_size: Memoized words and lookups
+        """
+        self.lexicon = lexicon
+        self.min_letters = min_letters
+        self.max_letters = max_letters
+        self.min_drop_letters = min_drop_letters
+        self.max_candidates = max_candidates
+        self.known = lru_cache(maxsize=cache_size)(self._known)
+        self.correct_word = lru_cache(maxsize=cache_size)(self._correct_word)
+
+    def _known(self, word: str) -> bool:
+        return word in self.lexicon
+
+    def candidates(self, letters: List[str]) -> Iterator[str]:
+        """
+        Words at one edit from letters: a confusable consonant or sign first,
+        then (long words only) one letter dropped.
+        """
+        for i, letter in enumerate(letters):
+            head, tail = "".join(letters[:i]), "".join(letters[i + 1:])
+            base, sign = letter[0], letter[1:]
+            for other in _CONSONANT_ALTERNATIVES.get(base, ()):
+                yield head + other + sign + tail
+            for other in _SIGN_ALTERNATIVES.get(sign, ()):
+                yield head + base + other + tail
+        if len(letters) >= self.min_drop_letters:
+            for i in range(len(letters)):
+                yield "".join(letters[:i] + letters[i + 1:])
+
+    def _unique_known(self, candidates: Iterator[str]) -> Optional[str]:
+        found = None
+        for candidate in itertools.islice(candidates, self.max_candidates):
+            if candidate != found and self.known(candidate):
+                if found is not None:
+                    return None  # Ambiguous
+                found = candidate
+        return found
+
+    def _correct_word(self, word: str) -> Optional[str]:
+        """The single known word one edit away from an unknown word, else None."""
+        if self.known(word):
+            return None
+        letters = get_letters(word)
+        if not self.min_letters <= len(letters) <= self.max_letters:
+            return None
+        return self._unique_known(self.candidates(letters))
+
+    def correct(self, text: str) -> Tuple[str, int]:
+        """Returns the corrected text and the number of words replaced."""
+        corrections = 0
+
+        def fix(match: re.Match) -> str:
+            nonlocal corrections
+            replacement = self.correct_word(match.group())
+            if replacement is None:
+                return match.group()
+            corrections += 1
+            return replacement
+
+        return _WORD.sub(fix, text), corrections
+
+
+_shared: Dict[Tuple, Optional[PostCorrector]] = {}
+_shared_lock = threading.Lock()
+
+
+def get_corrector(sources: List[Path] = None) -> Optional[PostCorrector]:
+    """One corrector (and memo cache) per set of word lists in this process; None if there are none."""
+    key = tuple(str(p) for p in sources or ())
+    with _shared_lock:
+        if key not in _shared:
+            try:
+                lexicon = load_lexicon(sources)
+            except (OSError, ValueError) as e:
+                logger.error(f"Cannot load the Tamil lexicon: {e}")
+                lexicon = None
+            _shared[key] = PostCorrector(lexicon) if lexicon is not None else None
+        return _shared[key]
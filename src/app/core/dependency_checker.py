@@ -1,3 +1,6 @@
+import json
+import os
+import re
 import shutil
 import sys
 import subprocess
@@ -5,29 +8,83 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from ..utils.logger import logger
 
+DEFAULT_CACHE_PATH = Path.home() / ".unitamil" / "dependencies.json"
+CACHE_VERSION = 1
+_VERSION_LINE = re.compile(r"tesseract\s+v?(\d+)\.(\d+)(?:\.(\d+))?", re.IGNORECASE)
+_SIMD = ("AVX512F", "AVX2", "AVX", "FMA", "SSE4.1", "NEON")
+
+
+def parse_version(output: str) -> Optional[str]:
+    """'5.3.0' from `tesseract --version` output (stdout on 4+, stderr on 3.x)."""
+    match = _VERSION_LINE.search(output)
+    if not match:
+        return None
+    return ".".join(part for part in match.groups() if part is not None)
+
+
+def parse_capabilities(version_output: str, version: Optional[str]) -> Dict[str, object]:
+    """What the engine build supports: LSTM models (4+), SIMD paths and OpenMP threading."""
+    major = int(version.split(".")[0]) if version else 0
+    found = {line.split()[1] for line in version_output.splitlines()
+             if line.strip().startswith("Found ") and len(line.split()) > 1}
+    return {
+        "lstm": major >= 4,
+        "simd": [name for name in _SIMD if name in found],
+        "openmp": "OpenMP" in found,
+    }
+
+
+def parse_languages(output: str):
+    """Language codes and the tessdata folder from `tesseract --list-langs`."""
+    lines = output.splitlines()
+    tessdata = None
+    if lines and lines[0].startswith("List of available languages"):
+        match = re.search(r'"(.+?)"', lines[0])
+        tessdata = match.group(1) if match else None
+        lines = lines[1:]
+    return [line.strip() for line in lines if line.strip()], tessdata
+
+
 class DependencyChecker:
-    def __init__(self):
+    def __init__(self, cache_path: Optional[Path] = DEFAULT_CACHE_PATH):
+        """
+        Args:
+            cache_path: Where probe results are kept between runs (None = no disk cache)
+        """
         self.tesseract_path: Optional[str] = None
         self.tesseract_version: Optional[str] = None
         self.languages: List[str] = []
-        
+        self.capabilities: Dict[str, object] = {}
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._status: Optional[Dict[str, any]] = None
+
     def check_tesseract(self) -> bool:
         """Checks if Tesseract is installed and available in PATH or common locations."""
-        # 1. Check PATH
-        self.tesseract_path = shutil.which("tesseract")
-        
-        # 2. Check common Windows paths
+        # 1. Explicit override (containers, CI)
+        override = os.environ.get("UNITAMIL_TESSERACT_CMD")
+        self.tesseract_path = override if override and Path(override).exists() else None
+
+        # 2. Check PATH
+        if not self.tesseract_path:
+            self.tesseract_path = shutil.which("tesseract")
+
+        # 3. Check common Windows, Linux and macOS paths
         if not self.tesseract_path:
             common_paths = [
                 r"C:\Program Files\Tesseract-OCR\tesseract.exe",
                 r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-                Path.home() / "AppData/Local/Tesseract-OCR/tesseract.exe"
+                Path.home() / "AppData/Local/Tesseract-OCR/tesseract.exe",
+                "/usr/bin/tesseract",
+                "/usr/local/bin/tesseract",
+                "/snap/bin/tesseract",
+                "/opt/homebrew/bin/tesseract",
+                "/opt/local/bin/tesseract",
             ]
             for p in common_paths:
                 if Path(p).exists():
                     self.tesseract_path = str(p)
                     break
-                    
+
         if self.tesseract_path:
             logger.info(f"Tesseract found at: {self.tesseract_path}")
             return True
@@ -35,56 +92,136 @@ class DependencyChecker:
             logger.error("Tesseract not found.")
             return False
 
+    def _run(self, *args: str) -> str:
+        # Prepare startupinfo for window hiding on Windows
+        startupinfo = None
+        creationflags = 0
+        if sys.platform == 'win32':
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            creationflags = 0x08000000 # CREATE_NO_WINDOW
+
+        result = subprocess.run(
+            [self.tesseract_path, *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            startupinfo=startupinfo,
+            creationflags=creationflags,
+            timeout=30
+        )
+        # Tesseract 3.x prints --version and --list-langs to stderr
+        return result.stdout + result.stderr
+
+    def _probe(self) -> Dict[str, any]:
+        """Runs tesseract for its version, build features and installed languages."""
+        try:
+            version_output = self._run("--version")
+            version = parse_version(version_output)
+            capabilities = parse_capabilities(version_output, version)
+        except Exception as e:
+            logger.error(f"Failed to query the Tesseract version: {e}")
+            version, capabilities = None, {}
+        try:
+            installed, tessdata = parse_languages(self._run("--list-langs"))
+        except Exception as e:
+            logger.error(f"Failed to check languages: {e}")
+            installed, tessdata = [], None
+        capabilities["languages"] = installed
+        return {"tesseract_version": version, "capabilities": capabilities, "tessdata": tessdata}
+
     def check_languages(self) -> Dict[str, bool]:
         """Checks for required language packs (tam, eng)."""
         if not self.tesseract_path:
             return {"eng": False, "tam": False}
-            
+        if not self.languages:
+            self.languages = self._probe()["capabilities"]["languages"]
+        return self._language_status()
+
+    def _language_status(self) -> Dict[str, bool]:
+        status = {
+            "eng": "eng" in self.languages,
+            "tam": "tam" in self.languages
+        }
+        logger.info(f"Language Pack Status: {status}")
+        return status
+
+    def _cache_key(self, tessdata: Optional[str]) -> Dict[str, object]:
+        """Changes when the binary is replaced or language packs are added or removed."""
+        stat = Path(self.tesseract_path).stat()
+        key = {
+            "version": CACHE_VERSION,
+            "path": str(Path(self.tesseract_path).resolve()),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "tessdata_prefix": os.environ.get("TESSDATA_PREFIX"),
+            "tessdata": tessdata,
+            "traineddata": None,
+        }
+        if tessdata:
+            try:
+                key["traineddata"] = sorted(e.name for e in os.scandir(tessdata) if e.name.endswith(".traineddata"))
+            except OSError:
+                pass
+        return key
+
+    def _load_cached(self) -> Optional[Dict[str, any]]:
+        if not self.cache_path:
+            return None
         try:
-            # Prepare startupinfo for window hiding on Windows
-            startupinfo = None
-            creationflags = 0
-            if sys.platform == 'win32':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-                creationflags = 0x08000000 # CREATE_NO_WINDOW
-
-            # Query languages
-            result = subprocess.run(
-                [self.tesseract_path, "--list-langs"],
-                capture_output=True,
-                text=True,
-                check=True,
-                startupinfo=startupinfo,
-                creationflags=creationflags
-            )
-            output = result.stdout.lower()
-            
-            # Helper to check lang in output
-            # Tesseract output format varies, usually just a list of codes
-            installed_langs = [line.strip() for line in output.splitlines()]
-            
-            status = {
-                "eng": any("eng" in l for l in installed_langs),
-                "tam": any("tam" in l for l in installed_langs)
-            }
-            
-            logger.info(f"Language Pack Status: {status}")
-            return status
-            
-        except Exception as e:
-            logger.error(f"Failed to check languages: {e}")
-            return {"eng": False, "tam": False}
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached["key"] == self._cache_key(cached["probe"].get("tessdata")):
+                return cached["probe"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return None
 
-    def get_status(self) -> Dict[str, any]:
-        """Returns full dependency status."""
+    def _store(self, probe: Dict[str, any]):
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": self._cache_key(probe.get("tessdata")), "probe": probe}, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache the dependency check: {e}")
+
+    def get_status(self, refresh: bool = False) -> Dict[str, any]:
+        """
+        Returns full dependency status. Probing Tesseract starts subprocesses,
+        so its result is kept in memory and on disk until the binary or its
+        language packs change; refresh=True probes again regardless.
+        """
+        if self._status is not None and not refresh:
+            return self._status
         tess_ok = self.check_tesseract()
-        lang_status = self.check_languages() if tess_ok else {"eng": False, "tam": False}
-        
-        return {
+        probe = None
+        if tess_ok:
+            probe = None if refresh else self._load_cached()
+            if probe is None:
+                probe = self._probe()
+                if probe["tesseract_version"]:  # Failed probes are retried next time
+                    self._store(probe)
+            else:
+                logger.debug("Using cached Tesseract check")
+        probe = probe or {"tesseract_version": None, "capabilities": {}, "tessdata": None}
+
+        self.tesseract_version = probe["tesseract_version"]
+        self.capabilities = probe["capabilities"]
+        self.languages = list(self.capabilities.get("languages", []))
+        lang_status = self._language_status() if tess_ok else {"eng": False, "tam": False}
+
+        self._status = {
             "tesseract_found": tess_ok,
             "tesseract_path": self.tesseract_path,
+            "tesseract_version": self.tesseract_version,
+            "capabilities": self.capabilities,
+            "tessdata": probe["tessdata"],
             "languages": lang_status,
             "ready": tess_ok and lang_status["eng"] and lang_status["tam"]
         }
+        return self._status
@@ -1,94 +1,211 @@
 import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
-import io
-import multiprocessing
-import time
-from typing import Callable, Iterator, Dict
+import hashlib
+import math
+from typing import Callable, Iterator, Dict, List, Optional, Set, Tuple
+from ..utils import tracing
 from ..utils.logger import logger
-from .dependency_checker import DependencyChecker
-from .ocr_worker import run_ocr
+from .converter import UNICODE, LegacyConverter
+from .font_index import FontIndex
+from .ocr_cache import OCRCache, cache_key
+from .ocr_engine import ENGINES, MIN_OCR_DPI, default_engine
+from .memory_budget import MemoryBudget, get_shared_budget
+from .ocr_pool import WORKER_COPIES, OCRWorkerPool, get_shared_pool
+from .ocr_worker import FORMAT_RAW_GRAY, OCRError, OCRResponse
+from .preprocess import DEFAULT_PROFILE, get_profile, preprocess_pixmap, working_bytes
+from .regions import RegionPlan, TextBlock, has_text_over, image_regions, merge_reading_order, text_blocks
+from .text_classifier import LEGACY, OCR, PageClassification, TextLayerClassifier
+
+# Render resolutions tried, in order, when OCR confidence is too low
+DPI_STEPS = (96, 150, 200, 300, 400, 600)
+# OCR'd image regions below this mean word confidence are photos or drawings, not text
+MIN_REGION_CONFIDENCE = 40.0
+
+def render_for_ocr(page: fitz.Page, dpi: int, clip: fitz.Rect = None) -> fitz.Pixmap:
+    """
+    Render a page (or the clip area of it) as an alpha-free grayscale pixmap.
+    Tesseract binarizes internally, so colour only triples the bytes we render and ship.
+    """
+    return page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False, clip=clip)
+
+
+def render_size(page: fitz.Page, dpi: int, clip: fitz.Rect = None) -> Tuple[int, int]:
+    """(width, height) in pixels of render_for_ocr(page, dpi, clip), without rendering."""
+    rect = page.rect if clip is None else fitz.Rect(clip) & page.rect
+    irect = (rect * fitz.Matrix(dpi / 72, dpi / 72)).irect
+    return irect.width, irect.height
+
+
+def page_fingerprint(page: fitz.Page) -> str:
+    """
+    Digest of everything that determines how a page renders: geometry,
+    content streams, form XObjects and image streams. Cheap compared to
+    rendering, and identical for the same page in a renamed PDF.
+    """
+    doc = page.parent
+    digest = hashlib.sha256(f"{tuple(page.rect)}|{page.rotation}".encode("ascii"))
+    digest.update(page.read_contents())
+    for xobject in page.get_xobjects():
+        digest.update(doc.xref_stream_raw(xobject[0]) or b"")
+    for image in page.get_images(full=True):
+        digest.update(doc.xref_stream_raw(image[0]) or b"")
+    return digest.hexdigest()
 
-# Configure pytesseract path if needed
-# In a real app, we might pass the path from DependencyChecker instance
 
 class PDFExtractor:
-    def __init__(self, tesseract_path: str = None):
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    def __init__(self, tesseract_path: str = None, ocr_pool: OCRWorkerPool = None,
+                 ocr_cache: Optional[OCRCache] = None, use_ocr_cache: bool = True,
+                 memory_budget: MemoryBudget = None):
+        # Handed to the OCR workers and engine version checks; nothing here runs Tesseract
+        self.tesseract_path = tesseract_path
+        self._ocr_pool = ocr_pool
+        self.classifier = TextLayerClassifier()
+        self.converter = LegacyConverter()
+        self.ocr_cache = (ocr_cache or OCRCache()) if use_ocr_cache else None
+        # Renders wait for memory here; shared with the OCR pool, which charges its requests
+        self.memory_budget = memory_budget or (ocr_pool.memory_budget if ocr_pool else get_shared_budget())
+        self.lang = 'tam+eng'
+        # Progressive OCR: render at start_dpi, escalate up to max_dpi while
+        # the mean word confidence stays below min_confidence
+        self.start_dpi = 150
+        self.max_dpi = 300
+        self.min_confidence = 70.0
+        # OCR every page, ignoring text layers
+        self.force_ocr = False
+        # OCR only the image regions of pages that are partly text (else the whole page)
+        self.region_ocr = True
+        # OCR backend the workers run (see ocr_engine.ENGINES)
+        self.ocr_engine = default_engine()
+        # Cleanup of rendered pages before OCR (see preprocess.PROFILES)
+        self.preprocess_profile = DEFAULT_PROFILE
+        self._engine_version: Optional[str] = None
+
+    @property
+    def ocr_pool(self) -> OCRWorkerPool:
+        # Resolved lazily so text-only documents never start OCR workers
+        if self._ocr_pool is None:
+            self._ocr_pool = get_shared_pool(self.tesseract_path)
+        return self._ocr_pool
+
+    @property
+    def engine_version(self) -> str:
+        # Part of the OCR cache key: a Tesseract upgrade or another engine invalidates old results.
+        # Each engine reports its own version (libtesseract: the library, not the CLI)
+        if self._engine_version is None:
+            if self.ocr_engine == "stub":
+                self._engine_version = "stub"
+            else:
+                try:
+                    version = ENGINES[self.ocr_engine].installed_version(self.tesseract_path)
+                except Exception:
+                    version = "unknown"
+                prefix = "tesseract" if self.ocr_engine == "pytesseract" else self.ocr_engine
+                self._engine_version = f"{prefix}-{version}"
+        return self._engine_version
+
+    def configure_ocr(self, start_dpi: int = None, max_dpi: int = None, min_confidence: float = None,
+                      lang: str = None, force_ocr: bool = None, engine: str = None, region_ocr: bool = None,
+                      preprocess: str = None):
+        """Apply OCR settings (e.g. from the UI or CLI). max_dpi is never below start_dpi."""
+        if preprocess:
+            get_profile(preprocess)
+            self.preprocess_profile = preprocess
+        if engine and engine != self.ocr_engine:
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown OCR engine '{engine}' (choose from {', '.join(ENGINES)})")
+            self.ocr_engine = engine
+            self._engine_version = None
+        if lang:
+            self.lang = lang
+        if force_ocr is not None:
+            self.force_ocr = bool(force_ocr)
+        if region_ocr is not None:
+            self.region_ocr = bool(region_ocr)
+        if start_dpi:
+            self.start_dpi = int(start_dpi)
+        if max_dpi:
+            self.max_dpi = int(max_dpi)
+        if min_confidence is not None:
+            self.min_confidence = float(min_confidence)
+        self.max_dpi = max(self.max_dpi, self.start_dpi)
+
+    def dpi_ladder(self) -> List[int]:
+        """Resolutions to try for one page: start_dpi, then higher steps up to max_dpi."""
+        return [self.start_dpi] + [d for d in DPI_STEPS if self.start_dpi < d <= self.max_dpi]
             
-    def process_pdf(self, pdf_path: str, should_stop: Callable[[], bool] = None) -> Iterator[Dict]:
+    def process_pdf(self, pdf_path: str, should_stop: Callable[[], bool] = None, pages: range = None,
+                    skip_pages: Set[int] = None) -> Iterator[Dict]:
         """
         Process a single PDF file and yield page data one by one.
         Yields: {'page_num': int, 'text': str, 'method': str, 'total_pages': int}
+                plus 'error': {'type', 'status', 'message'} when OCR failed.
         
         Args:
             pdf_path: Path to PDF file
             should_stop: Callable that returns True if processing should stop
+            pages: 0-based page indices to process (default: all pages)
+            skip_pages: Page numbers finished by an earlier run; they are not
+                        loaded, and yield a 'resumed' marker instead
         """
         try:
-            doc = fitz.open(pdf_path)
+            with tracing.span("open_pdf"):
+                doc = fitz.open(pdf_path)
             logger.info(f"Processing PDF: {pdf_path} ({len(doc)} pages)")
             total_pages = len(doc)
+            fonts = self.font_index(doc)
             
-            for page_num, page in enumerate(doc, 1):
-                # Check stop BEFORE processing page
-                if should_stop and should_stop():
-                    logger.info(f"Stop requested before page {page_num}")
-                    doc.close()
-                    return
-                    
-                logger.debug(f"Processing page {page_num}...")
-                
-                # 1. Try text extraction first (fast)
-                text = page.get_text()
-                
-                # 2. Heuristic: Check if text is sufficient
-                use_ocr = len(text.strip()) < 50
-                method = "text_extraction"
-                
-                if use_ocr:
-                    logger.debug(f"Page {page_num}: Low text, attempting OCR...")
-                    
-                    # Check stop BEFORE expensive OCR
+            for page_index in (pages if pages is not None else range(total_pages)):
+                page_num = page_index + 1
+                if skip_pages and page_num in skip_pages:
+                    yield self.resumed_page(page_num, total_pages)
+                    continue
+                with tracing.collect() as stages:
+                    with tracing.span("load_page"):
+                        page = doc.load_page(page_index)
+                    # Check stop BEFORE processing page
                     if should_stop and should_stop():
-                        logger.info(f"Stop requested before OCR on page {page_num}")
+                        logger.info(f"Stop requested before page {page_num}")
                         doc.close()
                         return
                     
-                    try:
-                        # Render page to image bytes
-                        pix = page.get_pixmap(dpi=300)
-                        img_bytes = pix.tobytes("png")
-                        
-                        # Run OCR in subprocess (killable)
-                        text, ocr_success = self._run_ocr_subprocess(img_bytes, should_stop)
-                        
-                        if not ocr_success:
+                    logger.debug(f"Processing page {page_num}...")
+                
+                    # 1. Classify the text layer; use it directly when it is good (fast)
+                    layer = self.text_pass(page, fonts)
+                    result = self.text_result(layer)
+                    plan = self.plan_regions(page, layer)
+
+                    if plan is not None:
+                        # 2. Text layer plus OCR of the image areas it does not cover
+                        if should_stop and should_stop():
+                            logger.info(f"Stop requested before OCR on page {page_num}")
+                            doc.close()
+                            return
+                        result = self.region_pass(page_num, page, plan, should_stop)
+                        if result is None:
+                            doc.close()
+                            return
+
+                    elif layer.kind == OCR:
+                        logger.debug(f"Page {page_num}: Low text, attempting OCR...")
+                    
+                        # Check stop BEFORE expensive OCR
+                        if should_stop and should_stop():
+                            logger.info(f"Stop requested before OCR on page {page_num}")
+                            doc.close()
+                            return
+                    
+                        result, key = self.lookup_ocr(page)
+                        if result is None:
+                            result = self.ocr_pass(
+                                page_num, self.render_page(page), should_stop, key,
+                                rerender=lambda dpi: self.retry_render(page, dpi)
+                            )
+                        if result is None:
                             # Stop was requested during OCR
-                            logger.info(f"OCR interrupted on page {page_num}")
                             doc.close()
                             return
-                            
-                        method = "ocr"
-                        logger.debug(f"Page {page_num}: OCR completed.")
-                        
-                    except Exception as e:
-                        logger.warning(f"Page {page_num}: OCR failed: {e}")
-                        text = ""
-                        method = "skipped_ocr_failed"
                 
-                # Check for unreadable text
-                if not text.strip():
-                     logger.warning(f"Page {page_num}: No readable text found. Skipping.")
-                     method = "skipped_no_text"
-                
-                yield {
-                    "page_num": page_num,
-                    "text": text,
-                    "method": method,
-                    "total_pages": total_pages
-                }
+                yield self.page_data(page_num, total_pages, result, stages)
                 
             doc.close()
             
@@ -96,106 +213,303 @@ class PDFExtractor:
             logger.error(f"Failed to process PDF {pdf_path}: {e}")
             raise e
 
-    def _run_ocr_subprocess(self, img_bytes: bytes, should_stop: Callable[[], bool] = None, poll_interval: float = 0.1) -> tuple:
+    def font_index(self, doc: fitz.Document) -> FontIndex:
+        """Font classes of one open document, shared by all of its pages."""
+        return FontIndex(doc, self.converter, self.classifier)
+
+    def text_pass(self, page: fitz.Page, fonts: FontIndex = None) -> PageClassification:
         """
-        Run OCR in a subprocess using stdin/stdout.
-        
-        Returns:
-            (text, success): text result and whether it completed (vs was killed)
+        Fast text-layer pass: classifies the page as text, legacy-convert or OCR
+        and extracts its text from the same TextPage. With the document's font
+        index, spans in legacy fonts are converted here and the page's text is Unicode.
         """
-        import subprocess
-        import sys
-        import base64
-        
-        # Prepare input
-        encoded_img = base64.b64encode(img_bytes).decode('ascii')
-        
-        # Prepare command: [executable, "--ocr-worker"]
-        # In frozen app, sys.executable is the exe. In dev, it's python.exe.
-        # If in dev, we need to pass the script path too, but our main.py handles the flag.
-        # However, running "python main.py --ocr-worker" is required in dev.
-        # We can detect if frozen.
-        
-        cmd = [sys.executable]
-        if not getattr(sys, 'frozen', False):
-            # Development mode: python src/main.py --ocr-worker
-            # We assume we are running from root or src is in path
-            # Actually simplest is to point to src/main.py
-            import os
-            # Get path to main.py. It's usually known relative to this file?
-            # Safer: current main script
-            main_script = sys.modules['__main__'].__file__
-            if main_script: 
-                 cmd.append(main_script)
-            else:
-                 # Fallback
-                 cmd.append("src/main.py")
-        
-        cmd.append("--ocr-worker")
-        
-        # Startup info to hide window on Windows
-        startupinfo = None
-        if sys.platform == 'win32':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-            # Also use creationflags for extra insurance against console popping up
-            creationflags = 0x08000000 # CREATE_NO_WINDOW
+        if self.force_ocr:
+            return PageClassification(OCR, "", None, {"forced": 1.0})
+        with tracing.span("text_layer"):
+            layer = self.classifier.classify(page)
+        if fonts is not None:
+            with tracing.span("font_decode"):
+                layer = fonts.decode(page, layer)
+        logger.debug(f"Page {page.number + 1}: text layer '{layer.kind}' ({layer.scores})")
+        return layer
+
+    def text_result(self, layer: PageClassification) -> Dict:
+        """Pass result for a page whose text layer is used."""
+        result = {"text": layer.text, "method": "text_extraction", "text_layer": layer.kind}
+        if layer.encodings is not None:
+            # Decoded by font: the pipeline must not run encoding detection again
+            result["encoding"] = UNICODE
+            if layer.encodings:
+                result["legacy_encodings"] = list(layer.encodings)
+        return result
 
+    def page_bytes(self, pixels: int) -> int:
+        """Memory one page of that many pixels takes at most: render, preprocessing, worker copies."""
+        return pixels * (1 + WORKER_COPIES) + working_bytes(get_profile(self.preprocess_profile), pixels)
+
+    def fit_dpi(self, page: fitz.Page, dpi: int, clip: fitz.Rect = None, limit: int = None) -> int:
+        """
+        dpi, or the highest lower one (down to MIN_OCR_DPI) at which the page
+        fits in limit bytes (default: the whole memory budget). Only pages too
+        big for the whole budget count as lowered in its stats; a limit of what
+        is free at the moment caps a retry, not the page.
+        """
+        whole_budget = limit is None
+        limit = self.memory_budget.limit if whole_budget else limit
+        width, height = render_size(page, dpi, clip)
+        needed = self.page_bytes(width * height)
+        if needed <= limit or dpi <= MIN_OCR_DPI:
+            return dpi
+        # Bytes grow with the square of the resolution; step down from the estimate until it fits
+        fitted = max(MIN_OCR_DPI, min(dpi - 1, int(dpi * math.sqrt(limit / needed))))
+        while fitted > MIN_OCR_DPI and self.page_bytes(math.prod(render_size(page, fitted, clip))) > limit:
+            fitted -= 1
+        if whole_budget:
+            logger.info(f"Page needs {needed // 2**20} MB at {dpi} DPI, over the {limit // 2**20} MB "
+                        f"memory budget; rendering at {fitted} DPI")
+            self.memory_budget.record_lowered_dpi()
+        else:
+            logger.debug(f"Only {limit // 2**20} MB free for a {dpi} DPI retry; rendering at {fitted} DPI")
+        return fitted
+
+    def render_page(self, page: fitz.Page, dpi: int = None, clip: fitz.Rect = None, wait: bool = True) -> fitz.Pixmap:
+        """
+        Render a page or region for OCR (at start_dpi by default), within the
+        memory budget. All the page will take (page_bytes) is reserved before
+        rendering and released when the pixmap is freed. With wait, waits
+        while the budget is used up (first renders); without, it is only
+        charged (regions rendered while OCR is under way).
+        """
+        dpi = self.fit_dpi(page, dpi or self.start_dpi, clip)
+        nbytes = self.page_bytes(math.prod(render_size(page, dpi, clip)))
+        waited_ms = self.memory_budget.acquire(nbytes, wait)
+        if waited_ms:
+            tracing.add_stage("memory_wait", waited_ms)
+        return self._render(page, dpi, clip, nbytes)
+
+    def retry_render(self, page: fitz.Page, dpi: int, clip: fitz.Rect = None) -> fitz.Pixmap:
+        """
+        Render a low-confidence page or region again at a higher DPI, at once,
+        at no more than the memory free now allows. That may be no higher than
+        the last attempt, which ends ocr_pass's escalation.
+        """
+        while True:
+            # Another thread may take the memory between sizing and reserving: size again
+            fitted = self.fit_dpi(page, dpi, clip, self.memory_budget.available())
+            nbytes = self.page_bytes(math.prod(render_size(page, fitted, clip)))
+            if self.memory_budget.try_acquire(nbytes):
+                break
+            if fitted <= MIN_OCR_DPI:
+                self.memory_budget.acquire(nbytes, wait=False)
+                break
+        return self._render(page, fitted, clip, nbytes)
+
+    def _render(self, page: fitz.Page, dpi: int, clip: Optional[fitz.Rect], nbytes: int) -> fitz.Pixmap:
+        """Render with nbytes already reserved; the reservation passes to the pixmap."""
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True, # We'll send base64 string
-                startupinfo=startupinfo,
-                creationflags=creationflags if sys.platform == 'win32' else 0,
-                encoding='utf-8' # Ensure text pipes are utf-8
-            )
-            
-            # Write input non-blocking? No, just write.
-            # But we want to kill it if it hangs.
-            # subprocess.communicate supports timeout, which is great, but we want to check `should_stop`.
-            
-            # We can't use communicate if we want granular stopping during the "write" phase easily,
-            # but write is fast. The wait for output is slow.
-            
-            # Proper strategy: verify process started, write data, then wait for result with polling.
-            
-            # Since communicate blocks, we use a loop with Popen.poll() or similar?
-            # Actually, `communicate` with timeout is the best way to leverage threading for I/O.
-            # But we can't share the "should_stop" cleanly with communicate's internal wait.
-            
-            # Hybrid approach: 
-            # 1. Write input in a separate thread? Or just write it (it's small, <10MB usually).
-            process.stdin.write(encoded_img)
-            process.stdin.close() # Signal EOF
-            
-            # 2. Wait for finish
-            while process.poll() is None:
-                if should_stop and should_stop():
-                    logger.info("Killing OCR subprocess (Popen)...")
-                    process.terminate()
+            with tracing.span("render", dpi=dpi, region=clip is not None):
+                pix = render_for_ocr(page, dpi, clip)
+        except Exception:
+            self.memory_budget.release(nbytes)
+            raise
+        self.memory_budget.track(pix, nbytes)
+        return pix
+
+    def plan_regions(self, page: fitz.Page, layer: PageClassification) -> Optional[RegionPlan]:
+        """
+        Image areas of a partly-text page to OCR, with the text blocks they are
+        merged into. None when the page is all text, or needs whole-page OCR.
+
+        Text pages: images with no text over them. OCR pages whose thin but
+        readable text lies beside the images (the "just under min_chars" case):
+        all their images, else (text on the images) the whole page is OCR'd.
+        Legacy-font pages keep their text layer only: their blocks are not
+        decoded to Unicode.
+        """
+        if not self.region_ocr or layer.textpage is None or layer.kind == LEGACY or layer.encodings:
+            return None
+        if layer.kind == OCR and (not layer.scores.get("chars")
+                                  or layer.scores.get("broken_ratio", 1.0) > self.classifier.max_broken_ratio):
+            return None
+        with tracing.span("plan_regions"):
+            images = image_regions(page)
+            if not images:
+                return None
+            blocks = text_blocks(page, layer.textpage)
+            regions = [rect for rect in images if not has_text_over(rect, blocks)]
+            if layer.kind == OCR:
+                if not blocks or len(regions) < len(images):
+                    return None
+                if self.converter.detect_encoding("".join(b.text for b in blocks)) != UNICODE:
+                    return None
+        if not regions:
+            return None
+        return RegionPlan(layer.kind, blocks, regions)
+
+    def region_pass(self, page_num: int, page: fitz.Page, plan: RegionPlan,
+                    should_stop: Callable[[], bool] = None, wait: bool = True) -> Optional[Dict]:
+        """
+        OCR each planned region (cached per region, DPI ladder as for pages) and
+        merge the text into the page's blocks. Returns None if stopped.
+        wait: region renders wait for the memory budget (see render_page).
+        """
+        fingerprint = None
+        ocr_blocks = []
+        dpis = []
+        for rect in plan.regions:
+            key = None
+            result = None
+            if self.ocr_cache is not None:
+                with tracing.span("ocr_cache"):
                     try:
-                        process.wait(timeout=1)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
-                    return ("", False)
-                time.sleep(poll_interval)
-                
-            # 3. Get output
-            stdout_content = process.stdout.read()
-            stderr_content = process.stderr.read()
-            process.stdout.close()
-            process.stderr.close()
-            
-            if process.returncode != 0:
-                logger.warning(f"OCR Subprocess failed code {process.returncode}: {stderr_content}")
-                return ("", True) # Treated as empty text (failure), but "not skipped/killed"
-                
-            return (stdout_content, True)
+                        fingerprint = fingerprint or page_fingerprint(page)
+                        key = self.ocr_cache_key(f"{fingerprint}|{tuple(round(v, 1) for v in rect)}")
+                        cached = self.ocr_cache.get(key)
+                    except Exception as e:
+                        logger.debug(f"Cannot fingerprint page for OCR cache: {e}")
+                        cached = None
+                if cached is not None:
+                    text, dpi = cached
+                    result = {"text": text, "method": "ocr", "dpi": dpi}
+            if result is None:
+                result = self.ocr_pass(page_num, self.render_page(page, clip=rect, wait=wait), should_stop, key,
+                                       rerender=lambda dpi, rect=rect: self.retry_render(page, dpi, rect))
+                if result is None:
+                    return None
+            if result["method"] != "ocr" or result.get("confidence", 100.0) < MIN_REGION_CONFIDENCE:
+                logger.debug(f"Page {page_num}: no text in image region {tuple(round(v) for v in rect)}")
+                continue
+            ocr_blocks.append(TextBlock(rect, result["text"]))
+            dpis.append(result["dpi"])
+        result = {
+            "text": merge_reading_order(plan.blocks, ocr_blocks),
+            "method": "mixed",
+            "text_layer": plan.kind,
+            "encoding": UNICODE,
+            "ocr_regions": len(ocr_blocks),
+        }
+        if dpis:
+            result["dpi"] = max(dpis)
+        return result
+
+    def lookup_ocr(self, page: fitz.Page) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Check the OCR cache before rendering.
+        Returns (cached OCR pass result or None, cache key for ocr_pass).
+        """
+        if self.ocr_cache is None:
+            return None, None
+        with tracing.span("ocr_cache"):
+            try:
+                key = self.ocr_cache_key(page_fingerprint(page))
+            except Exception as e:
+                logger.debug(f"Cannot fingerprint page for OCR cache: {e}")
+                return None, None
+            cached = self.ocr_cache.get(key)
+        if cached is None:
+            return None, key
+        text, dpi = cached
+        return {"text": text, "method": "ocr", "dpi": dpi, "ocr_cache": "hit"}, key
+
+    def ocr_cache_key(self, fingerprint: str) -> str:
+        """OCR cache key of a page (or region) fingerprint under the current OCR settings."""
+        dpi_profile = f"{self.start_dpi}-{self.max_dpi}@{self.min_confidence:g}/{self.preprocess_profile}"
+        return cache_key(fingerprint, self.lang, dpi_profile, self.engine_version)
+
+    def ocr_pass(self, page_num: int, pix: fitz.Pixmap, should_stop: Callable[[], bool] = None,
+                 cache_key: str = None, rerender: Callable[[int], fitz.Pixmap] = None) -> Optional[Dict]:
+        """
+        OCR a rendered page. While the mean word confidence is below
+        min_confidence, the page is rendered again at the next DPI step
+        (through rerender) up to max_dpi; the most confident attempt wins.
+        The result is stored in the OCR cache under cache_key.
+        Returns {'text', 'method', 'dpi', 'confidence'} (or 'error' on failure), or None if stopped.
+        """
+        try:
+            ladder = self.dpi_ladder()
+            best: Optional[OCRResponse] = None
+            best_dpi = 0
+            while True:
+                dpi = int(pix.xres)
+                # Run OCR in a pooled worker (killable)
+                response = self._run_ocr_subprocess(pix, should_stop)
+                if response is None:
+                    logger.info(f"OCR interrupted on page {page_num}")
+                    return None
+                if best is None or response.confidence > best.confidence:
+                    best, best_dpi = response, dpi
+
+                higher = [d for d in ladder if d > dpi]
+                if response.confidence >= self.min_confidence or not higher or rerender is None:
+                    break
+                logger.debug(f"Page {page_num}: confidence {response.confidence:.0f} at {dpi} DPI, retrying at {higher[0]} DPI")
+                pix = None  # Release the low-DPI render before the next one
+                pix = rerender(higher[0])
+                if int(pix.xres) <= dpi:
+                    break  # The memory free now allows no higher resolution
+
+            logger.debug(f"Page {page_num}: OCR completed at {best_dpi} DPI.")
+            result = {"text": best.text, "method": "ocr", "dpi": best_dpi, "confidence": round(best.confidence, 1)}
+            if cache_key and self.ocr_cache is not None:
+                self.ocr_cache.put(cache_key, best.text, best_dpi)
+                result["ocr_cache"] = "miss"
+            return result
 
+        except OCRError as e:
+            logger.warning(f"Page {page_num}: OCR failed (status {e.status}): {e}")
+            error = {"type": type(e).__name__, "status": e.status, "message": str(e)}
+            return {"text": "", "method": "skipped_ocr_failed", "error": error}
         except Exception as e:
-            logger.error(f"Subprocess launch failed: {e}")
-            return ("", True)
+            logger.warning(f"Page {page_num}: OCR failed: {e}")
+            return {"text": "", "method": "skipped_ocr_failed"}
+
+    def resumed_page(self, page_num: int, total_pages: int) -> Dict:
+        """Marker for a page whose output an earlier run already wrote."""
+        return {"page_num": page_num, "total_pages": total_pages, "text": "", "method": "resumed"}
+
+    def page_data(self, page_num: int, total_pages: int, result: Dict, stages: Dict[str, float] = None) -> Dict:
+        """
+        Builds the page dict yielded to the pipeline from a text or OCR pass result.
+        stages: the page's stage totals so far (tracing.collect); the pipeline adds its own.
+        """
+        page_data = {"page_num": page_num, "total_pages": total_pages}
+        page_data.update(result)
+        if stages is not None:
+            page_data["stages"] = stages
+        if page_data["method"] == "ocr":
+            page_data.setdefault("encoding", UNICODE)
+        # Check for unreadable text
+        if not page_data["text"].strip() and page_data["method"] != "skipped_ocr_failed":
+             logger.warning(f"Page {page_num}: No readable text found. Skipping.")
+             page_data["method"] = "skipped_no_text"
+        return page_data
+
+    def prepare_image(self, pix: fitz.Pixmap) -> Tuple[memoryview, int, int]:
+        """The gray pixels sent to the OCR engine, after the preprocessing profile: (payload, width, height)."""
+        profile = get_profile(self.preprocess_profile)
+        if profile == get_profile("off") and pix.n == 1:
+            return pix.samples_mv, pix.width, pix.height
+        with tracing.span("preprocess", profile=self.preprocess_profile):
+            image = preprocess_pixmap(pix, profile)
+        return image.data.cast("B"), image.shape[1], image.shape[0]
+
+    def _run_ocr_subprocess(self, pix: fitz.Pixmap, should_stop: Callable[[], bool] = None, poll_interval: float = 0.1) -> Optional[OCRResponse]:
+        """
+        Run OCR on a pooled worker process (killable through should_stop).
+        
+        Returns:
+            The worker's response, or None if the request was killed because of should_stop.
+        Raises:
+            OCRError if OCR failed.
+        """
+        payload, width, height = self.prepare_image(pix)
+        with tracing.span("ocr", dpi=pix.xres):
+            response = self.ocr_pool.run(
+                payload, FORMAT_RAW_GRAY, width, height, lang=self.lang, dpi=pix.xres,
+                should_stop=should_stop, poll_interval=poll_interval, engine=self.ocr_engine,
+                reserved=True
+            )
+        if response is None:
+            return None
+        logger.debug(f"OCR request {response.request_id}: {response.ocr_ms} ms OCR, {response.total_ms} ms in worker")
+        return response
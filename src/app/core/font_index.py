@@ -0,0 +1,168 @@
+"""
+Font Index - Per-document classification of fonts by how their text decodes.
+
+Each font xref is classified once per document: Unicode, one of the legacy
+encodings LegacyConverter handles, or broken (glyph-indexed text with no
+ToUnicode map, which only OCR can read). Known legacy families are recognised
+by name; other fonts are classified from the text of their spans the first
+time enough of it is seen. Later pages reuse the index, so only spans in
+legacy fonts are converted.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import fitz  # PyMuPDF
+from ..utils.logger import logger
+from .converter import ENCODINGS, UNICODE, LegacyConverter
+from .text_classifier import LEGACY, OCR, TEXT, PageClassification, TextLayerClassifier, _is_broken
+
+BROKEN = "broken"
+
+# Font family names -> class. TSCu_* fonts are the Unicode builds of the TSC_* family.
+_FONT_NAMES: List[Tuple["re.Pattern", str]] = [
+    (re.compile(r"^tscu_|latha|vijaya|nirmala|inaimathi|lohit.?tamil|noto.*tamil|tamil.?sangam|arial.?unicode", re.I), UNICODE),
+    (re.compile(r"bamini|suntommy", re.I), "bamini"),
+    (re.compile(r"^tsc_|tscii", re.I), "tscii"),
+    (re.compile(r"^tab[-_]", re.I), "tab"),
+    (re.compile(r"^tam[-_]", re.I), "tam"),
+    (re.compile(r"vanavil", re.I), "vanavil"),
+]
+
+# Encodings whose codes are glyph ids, unreadable without a ToUnicode CMap
+_GLYPH_ID_ENCODINGS = {"Identity-H", "Identity-V"}
+
+
+class FontInfo(NamedTuple):
+    xref: int
+    name: str                 # base font name without the subset prefix
+    font_class: Optional[str]  # UNICODE, a legacy encoding, BROKEN, or None (decide from text)
+
+
+def font_basename(basefont: str) -> str:
+    """Strip the 'ABCDEF+' subset prefix from a base font name."""
+    if len(basefont) > 7 and basefont[6] == "+" and basefont[:6].isupper():
+        return basefont[7:]
+    return basefont
+
+
+def classify_font_name(name: str) -> Optional[str]:
+    for pattern, font_class in _FONT_NAMES:
+        if pattern.search(name):
+            return font_class
+    return None
+
+
+class FontIndex:
+    """
+    Font xref -> class for one open document. Not thread-safe: use one index
+    per document from the thread that reads its pages.
+    """
+    def __init__(self,
+                 doc: fitz.Document,
+                 converter: LegacyConverter = None,
+                 classifier: TextLayerClassifier = None,
+                 min_sample_chars: int = 40):
+        """
+        Args:
+            doc: Document whose fonts are indexed
+            converter: Converter used for detection and for legacy spans
+            classifier: Supplies the broken-text threshold and scan detection
+            min_sample_chars: Characters of a font's text needed before its
+                              detected class is stored for later pages
+        """
+        self.doc = doc
+        self.converter = converter or LegacyConverter()
+        self.classifier = classifier or TextLayerClassifier()
+        self.min_sample_chars = min_sample_chars
+        self.fonts: Dict[int, FontInfo] = {}
+
+    def _font(self, xref: int, ftype: str, basefont: str, encoding: str) -> FontInfo:
+        info = self.fonts.get(xref)
+        if info is None:
+            name = font_basename(basefont)
+            font_class = classify_font_name(name)
+            if font_class is None and self._lacks_unicode_map(xref, ftype, encoding):
+                font_class = BROKEN
+            info = self.fonts[xref] = FontInfo(xref, name, font_class)
+            logger.debug(f"Font {xref} '{name}' ({ftype}, {encoding}): {font_class or 'from text'}")
+        return info
+
+    def _lacks_unicode_map(self, xref: int, ftype: str, encoding: str) -> bool:
+        if ftype != "Type3" and encoding not in _GLYPH_ID_ENCODINGS:
+            return False
+        try:
+            return self.doc.xref_get_key(xref, "ToUnicode")[0] == "null"
+        except Exception:
+            return False
+
+    def page_fonts(self, page: fitz.Page) -> Dict[str, FontInfo]:
+        """Span font name -> FontInfo for the fonts used on a page."""
+        fonts = {}
+        for xref, _ext, ftype, basefont, _ref, encoding in page.get_fonts():
+            info = self._font(xref, ftype, basefont, encoding)
+            fonts[info.name] = info
+        return fonts
+
+    def _learn(self, info: FontInfo, sample: str) -> str:
+        """Detect an undecided font's class from its text; stored once the sample is big enough."""
+        font_class = self.converter.detect_encoding(sample)
+        if len(sample.replace(" ", "")) >= self.min_sample_chars:
+            self.fonts[info.xref] = info._replace(font_class=font_class)
+            logger.debug(f"Font {info.xref} '{info.name}': {font_class} (from text)")
+        return font_class
+
+    def decode(self, page: fitz.Page, layer: PageClassification) -> PageClassification:
+        """
+        Re-decide a classified page from its fonts: legacy spans are converted
+        span by span, broken spans send the page to OCR. Scans and empty pages
+        keep the classifier's decision.
+        """
+        if layer.kind == OCR and self.classifier.is_scan(layer.scores):
+            return layer
+        fonts = self.page_fonts(page)
+        if not fonts:
+            return layer
+        if layer.kind == TEXT and all(info.font_class == UNICODE for info in fonts.values()):
+            # The common case once a document's fonts are known: no span pass
+            return layer._replace(encodings=())
+
+        raw = page.get_text("dict", textpage=layer.textpage)
+        lines = [line["spans"] for block in raw.get("blocks", []) if block.get("type") == 0
+                 for line in block.get("lines", [])]
+
+        # Undecided fonts: classify from all of their text on this page
+        classes = {name: info.font_class for name, info in fonts.items()}
+        samples: Dict[str, List[str]] = {}
+        for spans in lines:
+            for span in spans:
+                if classes.get(span["font"], UNICODE) is None:
+                    samples.setdefault(span["font"], []).append(span["text"])
+        for name, texts in samples.items():
+            classes[name] = self._learn(fonts[name], " ".join(texts))
+
+        out: List[str] = []
+        chars = broken = 0
+        encodings = set()
+        for spans in lines:
+            for span in spans:
+                text = span["text"]
+                # Spans whose font get_fonts() does not list are taken as Unicode
+                font_class = classes.get(span["font"]) or UNICODE
+                chars += len(text)
+                if font_class == BROKEN:
+                    broken += len(text)
+                elif font_class in ENCODINGS:
+                    text = self.converter.convert(text, font_class)
+                    encodings.add(font_class)
+                else:
+                    broken += sum(1 for c in text if _is_broken(ord(c)))
+                out.append(text)
+            out.append("\n")
+
+        if chars and broken / chars > self.classifier.max_broken_ratio:
+            return layer._replace(kind=OCR, text="", encodings=())
+        if encodings:
+            # Also pages the classifier sent to OCR: legacy code points look broken
+            return layer._replace(kind=LEGACY, text="".join(out), encodings=tuple(sorted(encodings)))
+        if layer.kind == OCR:
+            return layer
+        return layer._replace(kind=TEXT, encodings=())
@@ -0,0 +1,133 @@
+"""
+Tamil Lexicon - Precompiled, memory-mapped word list for OCR post-correction.
+
+The word lists are compiled once into a binary file:
+
+    magic (8 bytes) | word count (uint32) | offsets ((count + 1) x native uint32)
+    | words, UTF-8, sorted by their bytes, concatenated
+
+Opening it maps the file instead of parsing it, so every process that needs
+the lexicon (pipeline threads, shard processes) shares the same pages of the
+OS cache. Lookups are a binary search over the offsets.
+"""
+import hashlib
+import mmap
+import os
+import re
+import struct
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Iterable, List, Optional
+from ..utils.logger import logger
+
+MAGIC = b"UTLEX\x00\x00\x01"
+_HEADER = struct.Struct("<8sI")
+DEFAULT_LEXICON_DIR = Path.home() / ".unitamil"
+_TAMIL_WORD = re.compile("[\u0B80-\u0BFF]+")
+
+
+def default_sources() -> List[Path]:
+    """Word lists shipped with open-tamil: the TamilVU dictionary and the tamilsandhi noun list."""
+    sources = []
+    try:
+        import solthiruthi
+        sources.append(Path(solthiruthi.__file__).parent / "data" / "tamilvu_dictionary_words.txt")
+    except ImportError:
+        pass
+    try:
+        import tamilsandhi
+        sources.append(Path(tamilsandhi.__file__).parent / "all-tamil-nouns.txt")
+    except ImportError:
+        pass
+    return [p for p in sources if p.exists()]
+
+
+def read_words(paths: Iterable[Path]) -> Iterable[str]:
+    """Tamil words of UTF-8 word lists (one or more per line), NFC-normalized."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                for word in _TAMIL_WORD.findall(line):
+                    yield unicodedata.normalize("NFC", word)
+
+
+def compile_lexicon(words: Iterable[str], path: Path) -> Path:
+    """Write the binary lexicon (atomically: other processes may have it open)."""
+    encoded = sorted({w.encode("utf-8") for w in words if w})
+    offsets = array("I", [0])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    if offsets.itemsize != 4:
+        raise RuntimeError("array('I') is not 32-bit on this platform")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(encoded)))
+        # Native byte order: the file is a local cache, read back with memoryview.cast
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+    os.replace(tmp_path, path)
+    return path
+
+
+class Lexicon:
+    """Read-only view of a compiled lexicon file."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a compiled lexicon")
+        start = _HEADER.size
+        self._view = memoryview(self._mmap)
+        self._offsets = self._view[start:start + 4 * (self.count + 1)].cast("I")
+        self._words_start = start + 4 * (self.count + 1)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _word(self, i: int) -> bytes:
+        base = self._words_start
+        return self._mmap[base + self._offsets[i]:base + self._offsets[i + 1]]
+
+    def __contains__(self, word: str) -> bool:
+        key = word.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self.count and self._word(lo) == key
+
+    def close(self):
+        self._offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def load_lexicon(sources: List[Path] = None, cache_dir: Path = DEFAULT_LEXICON_DIR) -> Optional[Lexicon]:
+    """
+    Open the compiled lexicon of the given word lists (default: open-tamil's),
+    compiling it first if the lists changed. Returns None without word lists.
+    """
+    sources = [Path(p) for p in (sources or default_sources())]
+    if not sources:
+        logger.warning("No Tamil word lists found; post-correction is disabled")
+        return None
+    digest = hashlib.sha256(MAGIC)
+    for source in sources:
+        stat = source.stat()
+        digest.update(f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+    path = Path(cache_dir) / f"lexicon-{digest.hexdigest()[:16]}.bin"
+    if not path.exists():
+        logger.info(f"Compiling Tamil lexicon from {len(sources)} word lists...")
+        compile_lexicon(read_words(sources), path)
+    lexicon = Lexicon(path)
+    logger.debug(f"Lexicon {path}: {len(lexicon)} words")
+    return lexicon
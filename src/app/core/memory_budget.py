@@ -0,0 +1,215 @@
+"""
+Memory Budget - Admission control for the memory rendered pages hold.
+
+A 300 DPI page is tens of megabytes by the time it is rendered, cleaned up
+and copied into an OCR worker, and a batch renders many pages at once. The
+extractor estimates each render from the page size and DPI before rendering
+and reserves it here; when the budget is used up, new renders wait until
+earlier pages are released. A page too big for the budget on its own is
+rendered at a lower DPI instead (see PDFExtractor.fit_dpi).
+
+Reservations follow the objects that hold the memory (track(): released
+when the pixmap is freed) or a block of code (hold()). Work already under
+way (OCR requests, regions of a page being OCR'd) is charged without
+waiting, so the pages holding memory always progress and free it;
+higher-DPI retries take only what is free.
+"""
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+MB = 1024 * 1024
+# Without UNITAMIL_MEMORY_BUDGET_MB: this share of physical memory, within bounds
+DEFAULT_RAM_SHARE = 0.25
+MIN_LIMIT = 256 * MB
+MAX_LIMIT = 4096 * MB
+
+
+def physical_memory() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None  # Windows: no sysconf
+
+
+def default_limit() -> int:
+    """UNITAMIL_MEMORY_BUDGET_MB, else a quarter of physical memory (256 MB - 4 GB)."""
+    override = os.environ.get("UNITAMIL_MEMORY_BUDGET_MB")
+    if override:
+        return int(float(override) * MB)
+    total = physical_memory()
+    if not total:
+        return 1024 * MB
+    return int(min(MAX_LIMIT, max(MIN_LIMIT, total * DEFAULT_RAM_SHARE)))
+
+
+class MemoryBudget:
+    """Bytes in use against a limit, shared by the threads of one process."""
+    def __init__(self, limit: int = None):
+        self.limit = int(limit or default_limit())
+        self._cond = threading.Condition()
+        self.used = 0
+        self.queued = 0
+        self.peak = 0
+        self.peak_queued = 0
+        self.waits = 0
+        self.wait_ms = 0.0
+        self.lowered_dpi = 0  # Pages rendered below the requested DPI to fit
+        self._windows: "weakref.WeakSet[BudgetWindow]" = weakref.WeakSet()
+
+    def set_limit(self, limit: int):
+        with self._cond:
+            self.limit = int(limit)
+            self._cond.notify_all()
+
+    def acquire(self, nbytes: int, wait: bool = True) -> float:
+        """
+        Reserve nbytes. With wait, blocks while the reservation would take the
+        budget over its limit (unless nothing else is reserved: a lone page
+        always proceeds). Without, reserves at once.
+        Returns the milliseconds spent waiting.
+        """
+        waited_ms = 0.0
+        with self._cond:
+            if wait and self.used and self.used + nbytes > self.limit:
+                self.waits += 1
+                self.queued += nbytes
+                self._note_peaks()
+                start = time.perf_counter()
+                try:
+                    while self.used and self.used + nbytes > self.limit:
+                        self._cond.wait()
+                finally:
+                    self.queued -= nbytes
+                    waited_ms = (time.perf_counter() - start) * 1000
+                    self.wait_ms += waited_ms
+            self.used += nbytes
+            self._note_peaks()
+        return waited_ms
+
+    def try_acquire(self, nbytes: int) -> bool:
+        """Reserve nbytes only if they fit under the limit now."""
+        with self._cond:
+            if self.used + nbytes > self.limit:
+                return False
+            self.used += nbytes
+            self._note_peaks()
+            return True
+
+    def _note_peaks(self):
+        # Called with the lock held, after used or queued grew
+        self.peak = max(self.peak, self.used)
+        self.peak_queued = max(self.peak_queued, self.queued)
+        for window in self._windows:
+            window.peak = max(window.peak, self.used)
+            window.peak_queued = max(window.peak_queued, self.queued)
+
+    def window(self) -> "BudgetWindow":
+        """Start measuring a span of work (one document) on its own."""
+        with self._cond:
+            window = BudgetWindow(self)
+            self._windows.add(window)
+            return window
+
+    def available(self) -> int:
+        """Bytes free under the limit right now."""
+        with self._cond:
+            return max(0, self.limit - self.used)
+
+    def release(self, nbytes: int):
+        with self._cond:
+            self.used -= nbytes
+            self._cond.notify_all()
+
+    def record_lowered_dpi(self):
+        with self._cond:
+            self.lowered_dpi += 1
+
+    def track(self, obj, nbytes: int):
+        """Hand a reservation to obj: it is released when obj is freed."""
+        weakref.finalize(obj, self.release, nbytes)
+
+    @contextmanager
+    def hold(self, nbytes: int, wait: bool = False):
+        """Reserve nbytes for the duration of a with block."""
+        self.acquire(nbytes, wait)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "limit_bytes": self.limit,
+                "used_bytes": self.used,
+                "peak_bytes": self.peak,
+                "queued_bytes": self.queued,
+                "peak_queued_bytes": self.peak_queued,
+                "waits": self.waits,
+                "wait_ms": round(self.wait_ms, 1),
+                "lowered_dpi": self.lowered_dpi,
+            }
+
+
+class BudgetWindow:
+    """
+    A budget's stats since the window opened: counts are the difference from
+    then, peaks those reached while it was open. Work running at the same
+    time (other documents of a batch) shares the budget and shows up too.
+    """
+    def __init__(self, budget: MemoryBudget):
+        self.budget = budget
+        self._start = {"waits": budget.waits, "wait_ms": budget.wait_ms, "lowered_dpi": budget.lowered_dpi}
+        self.peak = budget.used
+        self.peak_queued = budget.queued
+        self._final: Optional[Dict[str, float]] = None
+
+    def stats(self) -> Dict[str, float]:
+        if self._final is not None:
+            return dict(self._final)
+        stats = self.budget.stats()
+        with self.budget._cond:
+            stats.update(peak_bytes=self.peak, peak_queued_bytes=self.peak_queued,
+                         waits=self.budget.waits - self._start["waits"],
+                         wait_ms=round(self.budget.wait_ms - self._start["wait_ms"], 1),
+                         lowered_dpi=self.budget.lowered_dpi - self._start["lowered_dpi"])
+        return stats
+
+    def close(self):
+        """End the window: stats() keeps the figures it has now."""
+        if self._final is None:
+            self._final = self.stats()
+            with self.budget._cond:
+                self.budget._windows.discard(self)
+
+
+def merge_stats(stats: Iterable[Dict[str, float]]) -> Dict[str, float]:
+    """
+    stats() of budgets in processes that ran side by side (page shards), as
+    one: limits and counts add up, and so do peaks (an upper bound, as the
+    processes' peaks need not coincide).
+    """
+    merged: Dict[str, float] = {}
+    for entry in stats:
+        for key, value in entry.items():
+            merged[key] = merged.get(key, 0) + value
+    if "wait_ms" in merged:
+        merged["wait_ms"] = round(merged["wait_ms"], 1)
+    return merged
+
+
+_shared_budget: Optional[MemoryBudget] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_budget() -> MemoryBudget:
+    """Process-wide budget used by extractors and OCR pools that are not given one explicitly."""
+    global _shared_budget
+    with _shared_lock:
+        if _shared_budget is None:
+            _shared_budget = MemoryBudget()
+        return _shared_budget
@@ -1,6 +1,74 @@
+"""
+Normalizer - Tamil-aware NFC normalization with repair of common broken sequences.
+
+Repairs what text layers and OCR get wrong:
+    - zero-width characters (ZWSP, ZWNJ, ZWJ, BOM) next to Tamil letters
+    - a vowel sign or pulli doubled (்் -> ்)
+    - a prefix vowel sign (ெ ே ை) typed before its consonant (ெக -> கெ)
+and composes split two-part vowel signs (ெ + ா -> ொ) as part of NFC.
+
+Most pages need none of this, so every step is guarded by a cheap check
+and the page is returned untouched when they all pass. NFC is not run over
+Tamil at all: it only composes the four pairs in _COMPOSE, so once the rest
+of the text is known to be normalized, those are replaced directly.
+"""
+import re
 import unicodedata
 from ..utils.logger import logger
 
+_TAMIL_FIRST, _TAMIL_LAST = "\u0B80", "\u0BFF"
+_CONSONANT = "\u0B95-\u0BB9"
+_SIGN = "\u0BBE-\u0BCD\u0BD7"  # Dependent vowel signs, pulli and the au length mark
+_PREFIX_SIGN = "\u0BC6-\u0BC8"
+_ZERO_WIDTH_CHARS = ("\u200B", "\u200C", "\u200D", "\u2060", "\uFEFF")
+
+_ZERO_WIDTH = re.compile(f"[{''.join(_ZERO_WIDTH_CHARS)}]+")
+_DOUBLED_SIGN = re.compile(f"([{_SIGN}])\\1+")
+_MISPLACED_PREFIX = re.compile(f"([{_PREFIX_SIGN}])(?<![{_CONSONANT}][{_PREFIX_SIGN}])([{_CONSONANT}])")
+
+# Canonical compositions in the Tamil block (ொ ோ ௌ ஔ); ா and ௗ only occur in these
+_COMPOSE = (("\u0BC6\u0BBE", "\u0BCA"), ("\u0BC7\u0BBE", "\u0BCB"),
+            ("\u0BC6\u0BD7", "\u0BCC"), ("\u0B92\u0BD7", "\u0B94"))
+
+
+def _is_tamil(ch: str) -> bool:
+    return _TAMIL_FIRST <= ch <= _TAMIL_LAST
+
+
+def _drop_zero_width(match: re.Match) -> str:
+    # Kept elsewhere: ZWJ has a job in emoji and other scripts
+    text, start, end = match.string, match.start(), match.end()
+    if (start and _is_tamil(text[start - 1])) or (end < len(text) and _is_tamil(text[end])):
+        return ""
+    return match.group()
+
+
+def repair(text: str) -> str:
+    """Fix zero-width noise, doubled signs and misplaced prefix signs; each pass only runs when needed."""
+    if any(ch in text for ch in _ZERO_WIDTH_CHARS):
+        text = _ZERO_WIDTH.sub(_drop_zero_width, text)
+    if _DOUBLED_SIGN.search(text):
+        text = _DOUBLED_SIGN.sub(r"\1", text)
+    if _MISPLACED_PREFIX.search(text):
+        text = _MISPLACED_PREFIX.sub(r"\2\1", text)
+    return text
+
+
+def to_nfc(text: str) -> str:
+    """
+    unicodedata.normalize('NFC', text), fast for Tamil. ா and ௗ are "maybe"
+    in the NFC quick check, which makes is_normalized as slow as normalizing;
+    they only compose in _COMPOSE, so the text is checked without them and
+    those pairs are composed by replacement.
+    """
+    if not unicodedata.is_normalized('NFC', text.replace("\u0BBE", "").replace("\u0BD7", "")):
+        return unicodedata.normalize('NFC', text)
+    for pair, composed in _COMPOSE:
+        if pair in text:
+            text = text.replace(pair, composed)
+    return text
+
+
 class Normalizer:
     def normalize(self, text: str) -> str:
         """
@@ -8,7 +76,9 @@ class Normalizer:
         This is standard for Tamil Unicode.
         """
         try:
-            return unicodedata.normalize('NFC', text)
+            if text.isascii():
+                return text
+            return to_nfc(repair(text))
         except Exception as e:
             logger.error(f"Normalization failed: {e}")
             return text
@@ -0,0 +1,105 @@
+"""
+OCR Result Cache - Content-addressed, size-limited SQLite store of OCR text.
+
+Keys are hashes of what gets rendered (page content and image streams, or the
+rendered pixels) plus the OCR settings, so renamed or reprocessed PDFs hit the
+cache. The least recently used entries are evicted when the size limit is hit.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+from ..utils.logger import logger
+
+DEFAULT_CACHE_PATH = Path.home() / ".unitamil" / "ocr_cache.sqlite"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def cache_key(content_digest: str, lang: str, dpi_profile: str, engine_version: str) -> str:
+    """Combine a page's content digest with the settings that change OCR output."""
+    material = f"{content_digest}|{lang}|{dpi_profile}|{engine_version}".encode("utf-8")
+    return hashlib.sha256(material).hexdigest()
+
+
+class OCRCache:
+    def __init__(self, path: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared by pipeline threads (guarded by self._lock) and by shard processes
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " dpi INTEGER NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_last_used ON ocr(last_used)")
+            self._conn.commit()
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """Returns (text, DPI the text was recognised at), or None on a miss."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT text, dpi FROM ocr WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE ocr SET last_used = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                self.hits += 1
+                return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.warning(f"OCR cache read failed: {e}")
+            return None
+
+    def put(self, key: str, text: str, dpi: int = 0):
+        size = len(text.encode("utf-8")) + len(key)
+        try:
+            with self._lock:
+                conn = self._connect()
+                old = conn.execute("SELECT size FROM ocr WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr (key, text, dpi, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, text, dpi, size, time.time())
+                )
+                self._total_bytes += size - (old[0] if old else 0)
+                if self._total_bytes > self.max_bytes:
+                    self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"OCR cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache is at 90% of its limit."""
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM ocr ORDER BY last_used ASC"):
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        conn.executemany("DELETE FROM ocr WHERE key = ?", evicted)
+        logger.debug(f"OCR cache evicted {len(evicted)} entries")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,255 @@
+"""
+OCR Engines - Backends that turn a page image into text and a confidence.
+
+    pytesseract   the tesseract CLI through pytesseract: a temp image, a new
+                  process and a fresh model load for every page
+    libtesseract  libtesseract in the worker process through ctypes: one
+                  TessBaseAPI per language, models loaded once
+    stub          deterministic text derived from the image; no Tesseract,
+                  for tests and benchmarks
+
+Engines run in the OCR worker, which keeps one of each it is asked for.
+The name travels with every OCR request; extractors default to
+UNITAMIL_OCR_ENGINE, else pytesseract. Like the worker, this module imports
+only the standard library until an engine is used.
+"""
+import os
+import sys
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+DEFAULT_ENGINE = "pytesseract"
+# Lowest resolution pages are rendered at for OCR (also when lowered to fit the memory budget)
+MIN_OCR_DPI = 72
+TSV_COLUMNS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text")
+
+
+def default_engine() -> str:
+    return os.environ.get("UNITAMIL_OCR_ENGINE") or DEFAULT_ENGINE
+
+
+def words_to_text(data: dict) -> Tuple[str, float]:
+    """
+    Rebuild page text from image_to_data output (lines joined by newlines,
+    blocks and paragraphs by blank lines) and the mean word confidence.
+    """
+    lines = []
+    current_key = None
+    current_para = None
+    words = []
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        if not word or not word.strip():
+            continue
+        para = (data["block_num"][i], data["par_num"][i])
+        key = para + (data["line_num"][i],)
+        if key != current_key:
+            if words:
+                lines.append(" ".join(words))
+            if current_para is not None and para != current_para:
+                lines.append("")
+            words = []
+            current_key = key
+            current_para = para
+        words.append(word)
+        conf = float(data["conf"][i])
+        if conf >= 0:
+            confidences.append(conf)
+    if words:
+        lines.append(" ".join(words))
+    mean_conf = sum(confidences) / len(confidences) if confidences else 0.0
+    return "\n".join(lines) + ("\n" if lines else ""), mean_conf
+
+
+def parse_tsv(tsv: str) -> Dict[str, List]:
+    """Tesseract TSV output (with or without its header row) as image_to_data columns."""
+    data: Dict[str, List] = {column: [] for column in TSV_COLUMNS}
+    for line in tsv.splitlines():
+        fields = line.split("\t")
+        if len(fields) < len(TSV_COLUMNS) - 1 or fields[0] == "level":
+            continue
+        fields += [""] * (len(TSV_COLUMNS) - len(fields))
+        for column, value in zip(TSV_COLUMNS, fields):
+            data[column].append(value if column == "text" else float(value) if column == "conf" else int(value))
+    return data
+
+
+class OCREngine(ABC):
+    """Recognizes page images. One instance serves many pages, in one thread."""
+    name = ""
+
+    @classmethod
+    @abstractmethod
+    def installed_version(cls, tesseract_cmd: str = None) -> str:
+        """Version of what this engine would recognize pages with (for cache keys). Raises if unavailable."""
+
+    @abstractmethod
+    def recognize(self, image: "Image.Image", lang: str, dpi: int) -> Tuple[str, float]:
+        """Returns (text, mean word confidence 0-100)."""
+
+    def close(self):
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    name = "pytesseract"
+
+    def __init__(self, tesseract_cmd: str = None):
+        self._pytesseract = self._import(tesseract_cmd)
+
+    @staticmethod
+    def _import(tesseract_cmd: str = None):
+        # Imported here: pytesseract pulls in numpy and pandas when installed
+        import pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        return pytesseract
+
+    @classmethod
+    def installed_version(cls, tesseract_cmd: str = None) -> str:
+        # The tesseract executable, which this engine runs
+        return str(cls._import(tesseract_cmd).get_tesseract_version())
+
+    def recognize(self, image: "Image.Image", lang: str, dpi: int) -> Tuple[str, float]:
+        data = self._pytesseract.image_to_data(image, lang=lang, config=f"--dpi {dpi}" if dpi else "",
+                                               output_type=self._pytesseract.Output.DICT)
+        return words_to_text(data)
+
+
+def find_libtesseract(tesseract_cmd: str = None) -> Optional[str]:
+    """
+    The libtesseract shared library: UNITAMIL_LIBTESSERACT, the system
+    library path, or next to the tesseract executable (Windows installs).
+    """
+    import ctypes.util
+    override = os.environ.get("UNITAMIL_LIBTESSERACT")
+    if override:
+        return override
+    found = ctypes.util.find_library("tesseract")
+    if found:
+        return found
+    if tesseract_cmd:
+        folder = Path(tesseract_cmd).resolve().parent
+        patterns = ("libtesseract*.dll",) if sys.platform == "win32" else ("libtesseract.so*", "libtesseract*.dylib")
+        for folder in (folder, folder.parent / "lib"):
+            for pattern in patterns:
+                for candidate in sorted(folder.glob(pattern)):
+                    return str(candidate)
+    return None
+
+
+class LibTesseractEngine(OCREngine):
+    """In-process Tesseract through its C API."""
+    name = "libtesseract"
+
+    def __init__(self, tesseract_cmd: str = None, library: str = None):
+        import ctypes
+        lib = self._load(tesseract_cmd, library)
+        handle = ctypes.c_void_p
+        lib.TessBaseAPICreate.restype = handle
+        lib.TessBaseAPIInit3.argtypes = (handle, ctypes.c_char_p, ctypes.c_char_p)
+        lib.TessBaseAPISetImage.argtypes = (handle, ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                            ctypes.c_int, ctypes.c_int)
+        lib.TessBaseAPISetSourceResolution.argtypes = (handle, ctypes.c_int)
+        lib.TessBaseAPIRecognize.argtypes = (handle, ctypes.c_void_p)
+        # char * owned by the caller: kept as a pointer so it can be freed
+        lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+        lib.TessBaseAPIGetTsvText.argtypes = (handle, ctypes.c_int)
+        lib.TessDeleteText.argtypes = (ctypes.c_void_p,)
+        for name in ("TessBaseAPIClear", "TessBaseAPIEnd", "TessBaseAPIDelete"):
+            getattr(lib, name).argtypes = (handle,)
+        self._lib = lib
+        self._ctypes = ctypes
+        self.version = lib.TessVersion().decode("ascii", "replace")
+        # Loading a language's models is the slow part: one API per language, kept
+        self._apis: Dict[str, int] = {}
+
+    @staticmethod
+    def _load(tesseract_cmd: str = None, library: str = None):
+        import ctypes
+        path = library or find_libtesseract(tesseract_cmd)
+        if not path:
+            raise OSError("libtesseract not found (set UNITAMIL_LIBTESSERACT)")
+        lib = ctypes.CDLL(path)
+        lib.TessVersion.restype = ctypes.c_char_p
+        return lib
+
+    @classmethod
+    def installed_version(cls, tesseract_cmd: str = None) -> str:
+        # The shared library itself: it need not match the tesseract executable
+        return cls._load(tesseract_cmd).TessVersion().decode("ascii", "replace")
+
+    def _api(self, lang: str) -> int:
+        api = self._apis.get(lang)
+        if api is None:
+            api = self._lib.TessBaseAPICreate()
+            # NULL datapath: TESSDATA_PREFIX or the library's built-in location
+            if self._lib.TessBaseAPIInit3(api, None, lang.encode("ascii")) != 0:
+                self._lib.TessBaseAPIDelete(api)
+                raise RuntimeError(f"Tesseract could not load language '{lang}'")
+            self._apis[lang] = api
+        return api
+
+    def recognize(self, image: "Image.Image", lang: str, dpi: int) -> Tuple[str, float]:
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+        channels = 1 if image.mode == "L" else 3
+        pixels = image.tobytes()
+        api = self._api(lang)
+        lib = self._lib
+        lib.TessBaseAPISetImage(api, pixels, image.width, image.height, channels, image.width * channels)
+        if dpi:
+            lib.TessBaseAPISetSourceResolution(api, dpi)
+        try:
+            if lib.TessBaseAPIRecognize(api, None) != 0:
+                raise RuntimeError("Tesseract recognition failed")
+            tsv = lib.TessBaseAPIGetTsvText(api, 0)
+            try:
+                data = parse_tsv(self._ctypes.string_at(tsv).decode("utf-8", "replace") if tsv else "")
+            finally:
+                if tsv:
+                    lib.TessDeleteText(tsv)
+        finally:
+            # Drops the page's results, keeps the loaded models
+            lib.TessBaseAPIClear(api)
+        return words_to_text(data)
+
+    def close(self):
+        for api in self._apis.values():
+            self._lib.TessBaseAPIEnd(api)
+            self._lib.TessBaseAPIDelete(api)
+        self._apis.clear()
+
+
+class StubEngine(OCREngine):
+    """Same text for the same image: a few fixed words and a checksum of the pixels."""
+    name = "stub"
+    WORDS = "தமிழ் stub page"
+
+    def __init__(self, tesseract_cmd: str = None, confidence: float = 90.0):
+        self.confidence = confidence
+
+    @classmethod
+    def installed_version(cls, tesseract_cmd: str = None) -> str:
+        return "stub"
+
+    def recognize(self, image: "Image.Image", lang: str, dpi: int) -> Tuple[str, float]:
+        checksum = zlib.crc32(image.tobytes())
+        return f"{self.WORDS} {image.width}x{image.height} {checksum:08x}\n", self.confidence
+
+
+ENGINES = {engine.name: engine for engine in (PytesseractEngine, LibTesseractEngine, StubEngine)}
+
+
+def create_engine(name: str = None, tesseract_cmd: str = None) -> OCREngine:
+    """Instantiate an engine by name (default: default_engine()). Raises ValueError for unknown names."""
+    name = name or default_engine()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown OCR engine '{name}' (choose from {', '.join(ENGINES)})")
+    return ENGINES[name](tesseract_cmd=tesseract_cmd)
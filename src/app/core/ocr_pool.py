@@ -0,0 +1,301 @@
+"""
+OCR Worker Pool - Long-lived OCR worker processes shared by all extractions.
+
+Each worker runs `ocr_worker.main` in a request/response loop, so the
+interpreter and OCR libraries are loaded once per worker instead of once per page.
+"""
+import atexit
+import collections
+import itertools
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from ..utils import tracing
+from ..utils.logger import logger
+from .memory_budget import MemoryBudget, get_shared_budget
+from .ocr_worker import (
+    FORMAT_PNG, STATUS_OK, OCRRequest, OCRResponse, WorkerCrashedError,
+    error_for_status, read_response, write_request
+)
+
+# Copies of an image a request keeps alive in the worker: the received
+# payload, and the engine's own (a temp file image, or Tesseract's Pix)
+WORKER_COPIES = 2
+# Lines of a worker's stderr kept for the error when it dies (its traceback)
+STDERR_TAIL_LINES = 20
+
+
+def worker_command() -> List[str]:
+    """
+    Command line used to start an OCR worker.
+    In a frozen app sys.executable is the exe, which handles the flag itself.
+    In development we run "python main.py --ocr-worker".
+    """
+    cmd = [sys.executable]
+    if not getattr(sys, 'frozen', False):
+        main_module = sys.modules.get('__main__')
+        main_script = getattr(main_module, '__file__', None)
+        if main_script and os.path.basename(main_script) == "main.py":
+            cmd.append(main_script)
+        else:
+            # Fallback: src/main.py relative to this package
+            cmd.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "main.py"))
+    cmd.append("--ocr-worker")
+    return cmd
+
+
+class OCRWorker:
+    """
+    A single OCR worker process. Responses are read by a background thread
+    so callers can wait with a timeout and still honour should_stop; another
+    keeps the last lines of its stderr for crash reports.
+    """
+    def __init__(self, cmd: List[str], env: dict = None):
+        startupinfo = None
+        creationflags = 0
+        if sys.platform == 'win32':
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            creationflags = 0x08000000  # CREATE_NO_WINDOW
+
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            startupinfo=startupinfo,
+            creationflags=creationflags
+        )
+        self.responses: "queue.Queue[Optional[OCRResponse]]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        self._stderr_tail: "collections.deque[str]" = collections.deque(maxlen=STDERR_TAIL_LINES)
+        self._stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stderr_reader.start()
+
+    def _read_loop(self):
+        try:
+            while True:
+                response = read_response(self.process.stdout)
+                if response is None:
+                    break
+                self.responses.put(response)
+        except Exception:
+            pass
+        # EOF: worker exited or was killed
+        self.responses.put(None)
+
+    def _read_stderr(self):
+        # Drained continuously so a chatty worker never blocks on a full pipe
+        try:
+            for line in self.process.stderr:
+                self._stderr_tail.append(line.decode("utf-8", "replace").rstrip())
+        except Exception:
+            pass
+
+    def stderr_tail(self, timeout: float = 1.0) -> str:
+        """The last lines the worker wrote to stderr, once it has exited (waits up to timeout)."""
+        self._stderr_reader.join(timeout)
+        return "\n".join(self._stderr_tail)
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, request: OCRRequest):
+        write_request(self.process.stdin, request)
+
+    def kill(self):
+        try:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        except Exception:
+            pass
+
+    def close(self):
+        """Ask the worker to exit cleanly (EOF on stdin), then make sure it does."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except Exception:
+            self.kill()
+
+
+class OCRWorkerPool:
+    """
+    Pool of long-lived OCR workers, sized to the machine.
+    Workers are started lazily and replaced when they crash or are killed.
+    Images in flight are charged to the memory budget (without waiting: a
+    request under way is what frees memory) unless the caller reserved them.
+    """
+    def __init__(self, size: int = None, cmd: List[str] = None, tesseract_path: str = None,
+                 memory_budget: MemoryBudget = None):
+        self.size = max(1, size or os.cpu_count() or 2)
+        self.cmd = cmd or worker_command()
+        self.tesseract_path = tesseract_path
+        self.memory_budget = memory_budget or get_shared_budget()
+        self._idle: "queue.Queue[OCRWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._closed = False
+        self._request_ids = itertools.count(1)
+        atexit.register(self.close)
+
+    def _spawn(self) -> OCRWorker:
+        env = None
+        if self.tesseract_path:
+            env = dict(os.environ, UNITAMIL_TESSERACT_CMD=self.tesseract_path)
+        with tracing.span("ocr_worker_start"):
+            worker = OCRWorker(self.cmd, env)
+        tracing.name_process("ocr-worker", worker.process.pid)
+        return worker
+
+    def _acquire(self, should_stop: Callable[[], bool] = None, poll_interval: float = 0.1) -> Optional[OCRWorker]:
+        """An idle or new worker; None if should_stop turns true while all are busy."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("OCR worker pool is closed")
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._started < self.size:
+                self._started += 1
+                try:
+                    return self._spawn()
+                except Exception:
+                    self._started -= 1
+                    raise
+        # All workers busy: wait for one to be released, still honouring should_stop
+        while True:
+            try:
+                return self._idle.get(timeout=poll_interval)
+            except queue.Empty:
+                if should_stop and should_stop():
+                    return None
+
+    def _release(self, worker: OCRWorker):
+        if self._closed:
+            worker.close()
+        else:
+            self._idle.put(worker)
+
+    def _discard(self, worker: OCRWorker):
+        """Kill a worker and start a replacement so the pool keeps its size."""
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+            if self._closed:
+                return
+            try:
+                self._started += 1
+                self._idle.put(self._spawn())
+            except Exception as e:
+                self._started -= 1
+                logger.error(f"Failed to restart OCR worker: {e}")
+
+    def run(self, payload: bytes, image_format: int = FORMAT_PNG, width: int = 0, height: int = 0,
+            lang: str = 'tam+eng', dpi: int = 300,
+            should_stop: Callable[[], bool] = None, poll_interval: float = 0.1,
+            engine: str = "", reserved: bool = False) -> Optional[OCRResponse]:
+        """
+        Run OCR on one image using a pooled worker. The image's copies in the
+        worker are charged to the memory budget while the request runs, unless
+        reserved (the caller's reservation covers them, see PDFExtractor.page_bytes).
+
+        Returns:
+            The worker's response, or None if should_stop killed the request.
+        Raises:
+            OCRError (or a subclass) when the worker reports a failure or crashes.
+        """
+        request = OCRRequest(next(self._request_ids), image_format, width, height, dpi, lang, payload, engine)
+        with self.memory_budget.hold(0 if reserved else memoryview(payload).nbytes * WORKER_COPIES):
+            return self._run(request, should_stop, poll_interval)
+
+    def _run(self, request: OCRRequest, should_stop: Callable[[], bool], poll_interval: float) -> Optional[OCRResponse]:
+        with tracing.span("ocr_wait_worker"):
+            worker = self._acquire(should_stop, poll_interval)
+        if worker is None:
+            logger.info("OCR request dropped while waiting for a worker (stop requested)")
+            return None
+        try:
+            worker.send(request)
+        except Exception as e:
+            self._discard(worker)
+            raise WorkerCrashedError(_with_stderr(f"OCR worker crashed before request: {e}", worker))
+
+        while True:
+            if should_stop and should_stop():
+                logger.info("Killing OCR worker (stop requested)...")
+                self._discard(worker)
+                return None
+            try:
+                response = worker.responses.get(timeout=poll_interval)
+            except queue.Empty:
+                continue
+
+            if response is None:
+                message = _with_stderr(f"OCR worker exited with code {worker.process.poll()}", worker)
+                self._discard(worker)
+                logger.error(message)
+                raise WorkerCrashedError(message)
+
+            self._release(worker)
+            _trace_worker_time(worker, response, time.perf_counter_ns())
+            if response.status != STATUS_OK:
+                raise error_for_status(response.status, response.text)
+            return response
+
+    def close(self):
+        """Stop all idle workers. Busy workers are closed when released."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def _with_stderr(message: str, worker: OCRWorker) -> str:
+    tail = worker.stderr_tail()
+    return f"{message}:\n{tail}" if tail else message
+
+
+def _trace_worker_time(worker: OCRWorker, response: OCRResponse, received_ns: int):
+    """
+    The worker reports its own timings; its spans are placed back from the
+    moment the response arrived, on the worker's pid.
+    """
+    decode_ms = response.total_ms - response.ocr_ms
+    tracing.add_stage("ocr_decode", decode_ms)
+    tracing.add_stage("tesseract", response.ocr_ms)
+    if tracing.is_enabled():
+        pid = worker.process.pid
+        start_ns = received_ns - response.total_ms * 1_000_000
+        tracing.record_complete("ocr_request", start_ns, response.total_ms * 1_000_000, pid,
+                                request_id=response.request_id)
+        tracing.record_complete("tesseract", start_ns + decode_ms * 1_000_000, response.ocr_ms * 1_000_000, pid)
+
+
+_shared_pool: Optional[OCRWorkerPool] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_pool(tesseract_path: str = None) -> OCRWorkerPool:
+    """Process-wide pool used by extractors that are not given one explicitly."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = OCRWorkerPool(tesseract_path=tesseract_path)
+        elif tesseract_path:
+            _shared_pool.tesseract_path = tesseract_path
+        return _shared_pool
@@ -1,51 +1,269 @@
 """
 OCR Worker Module - Runs in a separate process for killable OCR.
+
+Requests and responses are framed binary messages on stdin/stdout:
+
+    request:  REQUEST_HEADER, language (ascii), image payload, engine name (ascii)
+    response: RESPONSE_HEADER, text (utf-8; the error message when status != OK)
+
+Workers are started often (one per CPU, and again after a crash or kill), so
+this module imports only the standard library at load time. PIL and the OCR
+engine (pytesseract pulls in numpy and pandas when they are installed) are
+imported by the functions that use them, on the first page. PyInstaller
+still finds them: it collects imports inside functions too.
 """
-import pytesseract
-from PIL import Image
 import io
+import os
+import struct
 import sys
-import base64
+import time
+from typing import TYPE_CHECKING, BinaryIO, Dict, NamedTuple, Optional, Tuple
+from .ocr_engine import OCREngine, create_engine, words_to_text
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# magic, request id, image format, width, height, dpi, language length, payload length, engine length
+REQUEST_HEADER = struct.Struct("<4sIBIIHHIB")
+REQUEST_MAGIC = b"UTQ2"
+# magic, request id, status, ocr ms, total ms, mean word confidence, text length
+RESPONSE_HEADER = struct.Struct("<4sIBIIfI")
+RESPONSE_MAGIC = b"UTR1"
+
+# Image formats. Raw formats are uncompressed pixel rows (stride == width * channels)
+FORMAT_PNG = 1
+FORMAT_RAW_GRAY = 2
+FORMAT_RAW_RGB = 3
+
+_RAW_MODES = {FORMAT_RAW_GRAY: ("L", 1), FORMAT_RAW_RGB: ("RGB", 3)}
+
+# Status codes
+STATUS_OK = 0
+STATUS_BAD_REQUEST = 1
+STATUS_BAD_IMAGE = 2
+STATUS_ENGINE_ERROR = 3
+STATUS_INTERNAL_ERROR = 4
+
+# Tesseract executable for the engines (set by main() from UNITAMIL_TESSERACT_CMD)
+_tesseract_cmd: Optional[str] = None
+_engines: Dict[str, OCREngine] = {}
+
+
+class OCRError(Exception):
+    """OCR failed for a page. `status` is one of the STATUS_* codes."""
+    status = STATUS_INTERNAL_ERROR
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        if status is not None:
+            self.status = status
+
+
+class ProtocolError(OCRError):
+    status = STATUS_BAD_REQUEST
+
+
+class ImageDecodeError(OCRError):
+    status = STATUS_BAD_IMAGE
+
+
+class OCREngineError(OCRError):
+    status = STATUS_ENGINE_ERROR
+
+
+class WorkerCrashedError(OCRError):
+    """The worker process died before answering (raised on the pool side)."""
+
+
+_ERRORS_BY_STATUS = {
+    STATUS_BAD_REQUEST: ProtocolError,
+    STATUS_BAD_IMAGE: ImageDecodeError,
+    STATUS_ENGINE_ERROR: OCREngineError,
+}
+
+
+def error_for_status(status: int, message: str) -> OCRError:
+    return _ERRORS_BY_STATUS.get(status, OCRError)(message, status)
+
+
+class OCRRequest(NamedTuple):
+    request_id: int
+    image_format: int
+    width: int
+    height: int
+    dpi: int
+    lang: str
+    payload: bytes  # bytes-like; the worker receives a bytearray
+    engine: str = ""  # OCR engine name; empty for the worker's default
+
 
-def run_ocr(image_bytes: bytes, lang: str = 'tam+eng') -> str:
+class OCRResponse(NamedTuple):
+    request_id: int
+    status: int
+    text: str
+    ocr_ms: int
+    total_ms: int
+    confidence: float = -1.0  # mean word confidence 0-100, -1 when unknown
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    """Read exactly `size` bytes, or None on a clean EOF before the first byte."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise EOFError("Stream closed in the middle of a frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+
+def _read_payload(stream: BinaryIO, size: int) -> bytearray:
+    """Read a payload into one preallocated buffer so it can be wrapped without copying."""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    pos = 0
+    while pos < size:
+        n = stream.readinto(view[pos:])
+        if not n:
+            raise EOFError("Stream closed in the middle of a payload")
+        pos += n
+    return buf
+
+
+def write_request(stream: BinaryIO, request: OCRRequest):
+    lang = request.lang.encode('ascii')
+    engine = request.engine.encode('ascii')
+    stream.write(REQUEST_HEADER.pack(
+        REQUEST_MAGIC, request.request_id, request.image_format,
+        request.width, request.height, request.dpi, len(lang), len(request.payload), len(engine)
+    ))
+    stream.write(lang)
+    stream.write(request.payload)
+    stream.write(engine)
+    stream.flush()
+
+
+def read_request(stream: BinaryIO) -> Optional[OCRRequest]:
+    header = _read_exact(stream, REQUEST_HEADER.size)
+    if header is None:
+        return None
+    magic, request_id, image_format, width, height, dpi, lang_len, payload_len, engine_len = REQUEST_HEADER.unpack(header)
+    if magic != REQUEST_MAGIC:
+        raise ProtocolError(f"Bad request magic {magic!r}")
+    lang = (_read_exact(stream, lang_len) or b"").decode('ascii')
+    payload = _read_payload(stream, payload_len)
+    engine = (_read_exact(stream, engine_len) or b"").decode('ascii')
+    return OCRRequest(request_id, image_format, width, height, dpi, lang, payload, engine)
+
+
+def write_response(stream: BinaryIO, response: OCRResponse):
+    text = response.text.encode('utf-8')
+    stream.write(RESPONSE_HEADER.pack(
+        RESPONSE_MAGIC, response.request_id, response.status,
+        response.ocr_ms, response.total_ms, response.confidence, len(text)
+    ))
+    stream.write(text)
+    stream.flush()
+
+
+def read_response(stream: BinaryIO) -> Optional[OCRResponse]:
+    header = _read_exact(stream, RESPONSE_HEADER.size)
+    if header is None:
+        return None
+    magic, request_id, status, ocr_ms, total_ms, confidence, text_len = RESPONSE_HEADER.unpack(header)
+    if magic != RESPONSE_MAGIC:
+        raise ProtocolError(f"Bad response magic {magic!r}")
+    text = (_read_exact(stream, text_len) or b"").decode('utf-8')
+    return OCRResponse(request_id, status, text, ocr_ms, total_ms, confidence)
+
+
+def decode_image(request: OCRRequest) -> "Image.Image":
+    from PIL import Image
+    if request.image_format == FORMAT_PNG:
+        try:
+            return Image.open(io.BytesIO(request.payload))
+        except Exception as e:
+            raise ImageDecodeError(f"Cannot decode image: {e}")
+    if request.image_format in _RAW_MODES:
+        mode, channels = _RAW_MODES[request.image_format]
+        expected = request.width * request.height * channels
+        if not expected or len(request.payload) != expected:
+            raise ImageDecodeError(
+                f"Raw payload is {len(request.payload)} bytes, expected {expected} for {request.width}x{request.height} {mode}"
+            )
+        # Wraps the received buffer, no copy
+        image = Image.frombuffer(mode, (request.width, request.height), request.payload, "raw", mode, 0, 1)
+        # pytesseract hands Tesseract a temp file in image.format; PNM skips compression
+        image.format = "PPM"
+        return image
+    raise ProtocolError(f"Unsupported image format {request.image_format}")
+
+
+def get_engine(name: str = "") -> OCREngine:
+    """The worker's engine of that name, created on first use and kept (models stay loaded)."""
+    engine = _engines.get(name)
+    if engine is None:
+        try:
+            engine = create_engine(name or None, _tesseract_cmd)
+        except Exception as e:
+            raise OCREngineError(f"Cannot start OCR engine '{name or 'default'}': {e}")
+        _engines[name] = engine
+    return engine
+
+
+def run_ocr(image: "Image.Image", lang: str = 'tam+eng', dpi: int = 0, engine: str = "") -> Tuple[str, float]:
     """
-    Run OCR on image bytes. This function is designed to be called
+    Run OCR on a decoded image. This function is designed to be called
     from a separate process.
+    Returns (text, mean word confidence).
     """
+    ocr_engine = get_engine(engine)
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-        text = pytesseract.image_to_string(image, lang=lang)
-        return text
+        return ocr_engine.recognize(image, lang, dpi)
     except Exception as e:
-        return f"[OCR_ERROR: {e}]"
+        raise OCREngineError(str(e))
+
+
+def handle_request(request: OCRRequest) -> OCRResponse:
+    start = time.perf_counter()
+    ocr_ms = 0
+    confidence = -1.0
+    try:
+        image = decode_image(request)
+        ocr_start = time.perf_counter()
+        text, confidence = run_ocr(image, request.lang or 'tam+eng', request.dpi, request.engine)
+        ocr_ms = int((time.perf_counter() - ocr_start) * 1000)
+        status = STATUS_OK
+    except OCRError as e:
+        text, status = str(e), e.status
+    except Exception as e:
+        text, status = str(e), STATUS_INTERNAL_ERROR
+    total_ms = int((time.perf_counter() - start) * 1000)
+    return OCRResponse(request.request_id, status, text, ocr_ms, total_ms, confidence)
+
 
 def main():
     """
     Main entry point for the OCR worker process.
-    Reads base64 image from stdin, prints result to stdout.
+    Serves framed requests from stdin until it is closed.
     """
-    try:
-        # Read all of stdin
-        encoded_input = sys.stdin.read()
-        if not encoded_input:
-            return
-
-        # Decode and run
-        image_bytes = base64.b64decode(encoded_input)
-        result = run_ocr(image_bytes)
-        
-        # Print result to stdout (utf-8)
-        # Print result to stdout (utf-8)
-        # Using sys.stdout.buffer.write to ensure encoding safety if needed
-        # We MUST use buffer for unicode characters on Windows console
-        sys.stdout.buffer.write(result.encode('utf-8'))
-        sys.stdout.buffer.flush()
-    except Exception as e:
-        error_msg = f"[OCR_ERROR: {e}]"
-        sys.stdout.buffer.write(error_msg.encode('utf-8'))
-        sys.stdout.buffer.flush()
+    global _tesseract_cmd
+    # Tesseract location chosen by the parent (see OCRWorkerPool)
+    _tesseract_cmd = os.environ.get("UNITAMIL_TESSERACT_CMD")
+
+    # We MUST use the binary buffers: frames are raw bytes, text is utf-8
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    while True:
+        request = read_request(stdin)
+        if request is None:
+            break
+        write_response(stdout, handle_request(request))
 
 # Entry point for subprocess (if run directly)
 if __name__ == "__main__":
-    import base64
     main()
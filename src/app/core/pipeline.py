@@ -1,128 +1,360 @@
 from pathlib import Path
-from typing import List, Callable
+from typing import Callable, Dict, List, Optional
 import json
+import os
+import shutil
 from .extractor import PDFExtractor
-from .converter import LegacyConverter
+from .memory_budget import BudgetWindow
+from .sharding import ShardedExtractor
+from .checkpoint import CHECKPOINT_NAME, Checkpoint, combined_markdown, page_markdown, source_fingerprint
+from .converter import UNICODE, LegacyConverter
 from .normalizer import Normalizer
+from .corrector import PostCorrector, get_corrector
+from ..utils import tracing
 from ..utils.logger import logger
 
+class CombinedMarkdownWriter:
+    """
+    Streams extracted.md page by page through a buffered temporary file that
+    is renamed into place when the document is finished. Pages may arrive out
+    of order; only those that cannot be written yet are held in memory.
+    """
+    def __init__(self, path: Path, buffer_size: int = 1024 * 1024, resume_offset: int = 0, next_page: int = 1):
+        """
+        Args:
+            path: Final extracted.md path
+            buffer_size: Write buffer size
+            resume_offset: Continue an interrupted run's .tmp file (or a copy
+                           of the finished file) from this byte offset
+            next_page: First page still to be written after resuming
+        """
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        if resume_offset:
+            if not self.tmp_path.exists():
+                shutil.copyfile(self.path, self.tmp_path)
+            os.truncate(self.tmp_path, resume_offset)
+            self._file = open(self.tmp_path, "a", encoding="utf-8", buffering=buffer_size)
+        else:
+            self._file = open(self.tmp_path, "w", encoding="utf-8", buffering=buffer_size)
+        self.bytes_written = resume_offset
+        self._pending: Dict[int, Optional[str]] = {}
+        self._next_page = next_page
+
+    @property
+    def next_page(self) -> int:
+        """Pages before this one are in the stream."""
+        return self._next_page
+
+    def add(self, page_num: int, text: Optional[str]):
+        """Queue a page's final text; None marks a page with no output (skipped)."""
+        if page_num < self._next_page:
+            return  # Already in the stream (resumed)
+        self._pending[page_num] = text
+        while self._next_page in self._pending:
+            self._write(self._next_page, self._pending.pop(self._next_page))
+            self._next_page += 1
+
+    def _write(self, page_num: int, text: Optional[str]):
+        if text is not None:
+            chunk = combined_markdown(page_num, text)
+            self._file.write(chunk)
+            self.bytes_written += len(chunk.encode("utf-8"))
+
+    def finish(self):
+        # Pages after a gap (numbers that never arrived) still go out in order
+        for page_num in sorted(self._pending):
+            self._write(page_num, self._pending[page_num])
+        self._pending.clear()
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def close(self):
+        """Stop without finishing; the .tmp file is kept for a resumed run."""
+        self._pending.clear()
+        if not self._file.closed:
+            self._file.close()
+
+    def abort(self):
+        """Drop the partial output; an existing extracted.md is left untouched."""
+        self._pending.clear()
+        if not self._file.closed:
+            self._file.close()
+        try:
+            self.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class DocumentWriter:
+    """
+    Writes the outputs of one PDF as its pages arrive.
+    Pages must be added in page order, from one thread at a time.
+    """
+    def __init__(self,
+                 pipeline: "ProcessingPipeline",
+                 input_path: str,
+                 output_dir: str,
+                 progress_callback: Callable[[float, str], None] = None):
+        self.pipeline = pipeline
+        self.input_file = Path(input_path)
+        self.progress_callback = progress_callback
+        # Create output directory for this PDF
+        self.pdf_out_dir = Path(output_dir) / self.input_file.stem
+        self.pdf_out_dir.mkdir(parents=True, exist_ok=True)
+        self.pages_dir = self.pdf_out_dir / "pages"
+        self.pages_dir.mkdir(exist_ok=True)
+
+        # Resume: pages finished by an earlier run are never extracted again
+        combined_path = self.pdf_out_dir / "extracted.md"
+        self.checkpoint = Checkpoint(self.pdf_out_dir / CHECKPOINT_NAME,
+                                     pipeline.checkpoint_settings(), source_fingerprint(self.input_file))
+        if pipeline.resume:
+            self.checkpoint.load(self.pages_dir, combined_path.with_name("extracted.md.tmp"), combined_path)
+        self.checkpoint.open()
+        self.skip_pages = set(self.checkpoint.pages)
+        self.combined = CombinedMarkdownWriter(combined_path, resume_offset=self.checkpoint.combined_offset,
+                                               next_page=len(self.skip_pages) + 1)
+        # Memory budget figures while this document is extracted
+        self.memory_window = pipeline.extractor.memory_budget.window()
+        # Need to track processed pages for metadata
+        self.processed_count = 0
+        self.total_pages = 0
+        self.ocr_cache_stats = {"hits": 0, "misses": 0}
+        self.corrections = 0
+        self.page_info = []
+        if self.skip_pages:
+            logger.info(f"Resuming {self.input_file.name}: {len(self.skip_pages)} pages already done")
+
+        self._progress(0.1, f"Starting extraction: {self.input_file.name}")
+
+    def _progress(self, value: float, msg: str):
+        if self.progress_callback:
+            self.progress_callback(value, msg)
+
+    def add_page(self, page_data: Dict):
+        page_num = page_data['page_num']
+        self.total_pages = page_data.get('total_pages', 0)
+        if page_data.get("ocr_cache") == "hit":
+            self.ocr_cache_stats["hits"] += 1
+        elif page_data.get("ocr_cache") == "miss":
+            self.ocr_cache_stats["misses"] += 1
+        # Calculate progress for this page (used by all branches below)
+        if self.total_pages > 0:
+            prog = 0.2 + (0.7 * (page_num / self.total_pages))
+        else:
+            prog = 0.5
+
+        # Resume Logic: finished in an earlier run, its output is already written
+        if page_data["method"] == "resumed":
+            record = self.checkpoint.pages[page_num]
+            self.page_info.append({k: v for k, v in record.items() if k not in ("offset", "sha256")})
+            if record["method"] != "skipped_no_text":
+                self.processed_count += 1
+            self.corrections += record.get("corrections", 0)
+            self._progress(prog, f"Page {page_num} done earlier, skipping (Resume).")
+            return
+
+        info = {"page": page_num, "method": page_data["method"]}
+        for key in ("text_layer", "legacy_encodings", "dpi", "confidence", "ocr_regions"):
+            if key in page_data:
+                info[key] = page_data[key]
+        self.page_info.append(info)
+        page_md_path = self.pages_dir / f"page_{page_num}.md"
+
+        self._progress(prog, f"Processing page {page_num}/{self.total_pages}...")
+
+        # Handle status
+        if "skipped" in page_data["method"]:
+            self._progress(prog, f"Warning: Page {page_num} skipped ({page_data['method']})")
+            logger.warning(f"Skipping Page {page_num} due to {page_data['method']}")
+            self.combined.add(page_num, None)
+            if page_data.get("stages"):
+                info["stages"] = tracing.rounded(page_data["stages"])
+            # Pages without text stay skipped; failed OCR is retried on resume
+            if page_data["method"] == "skipped_no_text":
+                self._checkpoint(page_num, info, None)
+            return # Skip processing this page
+
+        raw_text = page_data["text"]
+
+        # Stage totals continue from the extractor's
+        with tracing.collect(page_data.get("stages")) as stages:
+            # Legacy Conversion (pages the extractor decoded by font are already Unicode)
+            if page_data.get("encoding") == UNICODE:
+                converted_text = raw_text
+            else:
+                with tracing.span("convert"):
+                    converted_text = self.pipeline.converter.convert(raw_text)
+
+            # Normalization
+            with tracing.span("normalize"):
+                final_text = self.pipeline.normalizer.normalize(converted_text)
+
+            # Post-correction of OCR words against the lexicon (text layers are trusted)
+            corrector = self.pipeline.corrector if page_data["method"] == "ocr" else None
+            if corrector is not None:
+                with tracing.span("post_correct"):
+                    final_text, corrections = corrector.correct(final_text)
+                info["corrections"] = corrections
+                self.corrections += corrections
+
+            # Save Page Markdown
+            with tracing.span("write_page"):
+                self.pipeline._write_markdown(page_md_path, final_text, page_num)
+
+            with tracing.span("write_combined"):
+                self.combined.add(page_num, final_text)
+        info["stages"] = tracing.rounded(stages)
+        self.processed_count += 1
+        self._checkpoint(page_num, info, final_text)
+
+    def _checkpoint(self, page_num: int, info: Dict, text: Optional[str]):
+        # Only pages already in the combined stream can be resumed from its offset
+        if self.combined.next_page > page_num:
+            self.checkpoint.record(page_num, info, text, self.combined.bytes_written)
+
+    def finish(self):
+        # Combined Markdown was streamed as pages arrived; move it into place
+        self.combined.finish()
+        self.checkpoint.mark_finished()
+        self.memory_window.close()
+
+        # Metadata
+        metadata = {
+            "original_filename": self.input_file.name,
+            "total_pages": self.total_pages,
+            "processed_pages": self.processed_count,
+            "ocr_cache": self.ocr_cache_stats,
+            "corrections": self.corrections,
+            "stages": self._stage_totals(),
+            "memory": self.pipeline.memory_stats(self.input_file, self.memory_window),
+            "pages": self.page_info
+        }
+        with open(self.pdf_out_dir / "metadata.json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=4)
+
+        self._progress(1.0, "Complete")
+
+    def _stage_totals(self) -> Dict[str, float]:
+        """Milliseconds per stage over all pages (stages nest, so they overlap)."""
+        totals: Dict[str, float] = {}
+        for info in self.page_info:
+            for name, ms in info.get("stages", {}).items():
+                totals[name] = totals.get(name, 0.0) + ms
+        return tracing.rounded(totals)
+
+    def abort(self):
+        """Stop writing this document (stopped or failed); outputs so far are kept for resume."""
+        self.combined.close()
+        self.checkpoint.close()
+        self.memory_window.close()
+
 class ProcessingPipeline:
-    def __init__(self, tesseract_path: str = None):
+    def __init__(self, tesseract_path: str = None, page_workers: int = 1):
+        """
+        Args:
+            tesseract_path: Tesseract executable, if not on PATH
+            page_workers: Processes used to extract the pages of one large PDF
+                          in parallel (1 = extract in the calling thread)
+        """
         self.extractor = PDFExtractor(tesseract_path)
+        self.sharded_extractor = ShardedExtractor(self.extractor, page_workers)
         self.converter = LegacyConverter()
         self.normalizer = Normalizer()
-        
-    def process_file(self, 
-                     input_path: str, 
-                     output_dir: str, 
+        # Continue interrupted documents from their checkpoint
+        self.resume = True
+        # Lexicon-based correction of OCR pages; word lists default to open-tamil's
+        self.post_correction = False
+        self.lexicon_sources: Optional[List[Path]] = None
+
+    @property
+    def page_workers(self) -> int:
+        """Processes per large PDF (see ShardedExtractor); settable from the UI or CLI."""
+        return self.sharded_extractor.workers
+
+    @page_workers.setter
+    def page_workers(self, workers: int):
+        self.sharded_extractor.workers = max(1, int(workers))
+
+    @property
+    def corrector(self) -> Optional[PostCorrector]:
+        """The post-corrector when enabled (loaded on first use), else None."""
+        if not self.post_correction:
+            return None
+        return get_corrector(self.lexicon_sources)
+
+    def checkpoint_settings(self) -> Dict:
+        """Settings that change a page's output; resuming under different ones starts over."""
+        return {
+            "lang": str(self.extractor.lang),
+            "start_dpi": int(self.extractor.start_dpi),
+            "max_dpi": int(self.extractor.max_dpi),
+            "min_confidence": float(self.extractor.min_confidence),
+            "force_ocr": bool(self.extractor.force_ocr),
+            "region_ocr": bool(self.extractor.region_ocr),
+            "ocr_engine": str(self.extractor.ocr_engine),
+            "preprocess": str(self.extractor.preprocess_profile),
+            "post_correction": bool(self.post_correction),
+        }
+
+    def memory_stats(self, input_path: Path, window: BudgetWindow) -> Dict:
+        """
+        Memory budget stats for a finished document: its page shards' when it
+        was sharded, else the process budget's while it was open (window).
+        """
+        sharded = self.sharded_extractor.memory_stats.pop(str(Path(input_path)), None)
+        return sharded if sharded is not None else window.stats()
+
+    def open_document(self,
+                      input_path: str,
+                      output_dir: str,
+                      progress_callback: Callable[[float, str], None] = None) -> DocumentWriter:
+        """Creates the writer that turns one PDF's page dicts into its output files."""
+        return DocumentWriter(self, input_path, output_dir, progress_callback)
+
+    def process_file(self,
+                     input_path: str,
+                     output_dir: str,
                      progress_callback: Callable[[float, str], None] = None,
                      should_stop: Callable[[], bool] = None) -> bool: # Added should_stop arg
         """
         Full processing pipeline for a single PDF.
         """
+        writer = None
         try:
             input_file = Path(input_path)
-            # Create output directory for this PDF
-            pdf_out_dir = Path(output_dir) / input_file.stem
-            pdf_out_dir.mkdir(parents=True, exist_ok=True)
-            pages_dir = pdf_out_dir / "pages"
-            pages_dir.mkdir(exist_ok=True)
-            
-            if progress_callback:
-                progress_callback(0.1, f"Starting extraction: {input_file.name}")
-                
-            # 1. Iterate over generator
-            full_text = []
-             # Need to track processed pages for metadata
-            processed_count = 0
-            total_pages = 0
-            
-            for page_data in self.extractor.process_pdf(str(input_file), should_stop=should_stop):
-                # 2. Check Stop Signal
+            writer = self.open_document(input_path, output_dir, progress_callback)
+
+            # Iterate over generator
+            extractor = self.sharded_extractor if self.page_workers > 1 else self.extractor
+            for page_data in extractor.process_pdf(str(input_file), should_stop=should_stop,
+                                                   skip_pages=writer.skip_pages):
+                # Check Stop Signal
                 if should_stop and should_stop():
-                    logger.info(f"Stopping processing for {input_file.name} (User Request)")
-                    if progress_callback:
-                        progress_callback(0.0, "Stopped by User")
-                    return False
-                
-                page_num = page_data['page_num']
-                total_pages = page_data.get('total_pages', 0)
-                
-                # Calculate progress for this page (used by all branches below)
-                if total_pages > 0:
-                    prog = 0.2 + (0.7 * (page_num / total_pages))
-                else:
-                    prog = 0.5
-                
-                # 3. Resume Logic: Check if exists
-                page_md_path = pages_dir / f"page_{page_num}.md"
-                if page_md_path.exists():
-                     if progress_callback:
-                         progress_callback(prog, f"Page {page_num} exists, skipping (Resume).")
-                     # Read content to append to full_text for combined MD
-                     with open(page_md_path, "r", encoding="utf-8") as f:
-                         # Skip header "# Page N"
-                         content = f.read().split("\n\n", 1)[-1] 
-                         full_text.append(content)
-                     processed_count += 1
-                     continue
+                    break
+                writer.add_page(page_data)
 
+            # The extractor also returns early when stopped
+            if should_stop and should_stop():
+                logger.info(f"Stopping processing for {input_file.name} (User Request)")
                 if progress_callback:
-                    progress_callback(prog, f"Processing page {page_num}/{total_pages}...")
-                
-                # 4. Handle status
-                if "skipped" in page_data["method"]:
-                    if progress_callback:
-                        progress_callback(prog, f"Warning: Page {page_num} skipped ({page_data['method']})")
-                    logger.warning(f"Skipping Page {page_num} due to {page_data['method']}")
-                    continue # Skip processing this page
-                
-                raw_text = page_data["text"]
-                
-                # 5. Legacy Conversion
-                converted_text = self.converter.convert(raw_text)
-                
-                # 6. Normalization
-                final_text = self.normalizer.normalize(converted_text)
-                
-                # 7. Save Page Markdown
-                self._write_markdown(page_md_path, final_text, page_num)
-                
-                full_text.append(final_text)
-                processed_count += 1
-            
-            # 8. Save combined Markdown
-            combined_md_path = pdf_out_dir / "extracted.md"
-            self._write_combined_markdown(combined_md_path, full_text)
-            
-            # 9. Metadata
-            metadata = {
-                "original_filename": input_file.name,
-                "total_pages": total_pages,
-                "processed_pages": processed_count
-            }
-            with open(pdf_out_dir / "metadata.json", "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=4)
-                
-            if progress_callback:
-                progress_callback(1.0, "Complete")
-                
+                    progress_callback(0.0, "Stopped by User")
+                writer.abort()
+                return False
+
+            writer.finish()
             return True
-            
+
         except Exception as e:
             logger.error(f"Pipeline failed for {input_path}: {e}")
+            if writer is not None:
+                writer.abort()
             if progress_callback:
                 progress_callback(0.0, f"Error: {e}")
             return False
 
     def _write_markdown(self, path: Path, text: str, page_num: int):
-        content = f"# Page {page_num}\n\n{text}\n"
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
-
-    def _write_combined_markdown(self, path: Path, text_list: List[str]):
-        content = ""
-        for i, text in enumerate(text_list, 1):
-            content += f"# Page {i}\n\n{text}\n\n---\n\n"
+        content = page_markdown(page_num, text)
         with open(path, "w", encoding="utf-8") as f:
             f.write(content)
@@ -0,0 +1,229 @@
+"""
+Image Preprocessing - Cleans rendered pages up before OCR, on the pixmap
+buffer as a NumPy array.
+
+    grayscale   colour renders reduced to luma (gray renders are used as-is)
+    binarize    Otsu (one global threshold) or Sauvola (local mean and
+                deviation from integral images, for uneven backgrounds)
+    deskew      projection-profile skew estimate; the page is sheared back
+    crop        scanner borders and blank margins removed
+
+Every step works on whole arrays; the only Python loops are over a handful
+of candidate angles, never over pixels. Which steps run is a profile:
+
+    off     the render goes to the engine untouched
+    crop    borders and margins removed, gray levels kept
+    scan    Otsu, deskew, crop (default)
+    noisy   Sauvola, deskew, crop: shadows, stains, uneven lighting
+"""
+from typing import NamedTuple, Tuple
+import numpy as np
+
+DEFAULT_PROFILE = "scan"
+
+
+class PreprocessProfile(NamedTuple):
+    binarize: str = ""            # "", "otsu" or "sauvola"
+    deskew: bool = False
+    crop: bool = False
+    max_skew: float = 5.0         # Degrees either way searched by deskew
+    sauvola_k: float = 0.2
+    window_inches: float = 0.25   # Sauvola window side (about two text lines)
+    margin_inches: float = 0.05   # Blank space kept around the cropped content
+
+
+PROFILES = {
+    "off": PreprocessProfile(),
+    "crop": PreprocessProfile(crop=True),
+    "scan": PreprocessProfile(binarize="otsu", deskew=True, crop=True),
+    "noisy": PreprocessProfile(binarize="sauvola", deskew=True, crop=True),
+}
+
+
+def get_profile(name: str) -> PreprocessProfile:
+    """The named profile. Raises ValueError for unknown names."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown preprocessing profile '{name}' (choose from {', '.join(PROFILES)})")
+    return PROFILES[name]
+
+
+def working_bytes(profile: PreprocessProfile, pixels: int) -> int:
+    """Memory preprocess() needs on top of the page itself, at most."""
+    # Peak temporaries per pixel, measured: Sauvola's float64 integral images;
+    # deskew's row index array; crop's ink mask and the cropped copy
+    if profile.binarize == "sauvola":
+        return pixels * 50
+    if profile.binarize or profile.deskew:
+        return pixels * 12
+    return pixels * 4 if profile.crop else 0
+
+
+def pixmap_gray(samples, width: int, height: int, channels: int, stride: int = 0) -> np.ndarray:
+    """
+    A height x width uint8 luma array over a pixmap's samples (a view, no
+    copy, when the pixmap is already gray). Alpha is ignored.
+    """
+    rows = np.frombuffer(samples, dtype=np.uint8).reshape(height, stride or width * channels)
+    pixels = rows[:, :width * channels].reshape(height, width, channels)
+    if channels < 3:
+        return pixels[:, :, 0]
+    # ITU-R 601 weights in integer arithmetic
+    rgb = pixels[:, :, :3].astype(np.uint16)
+    return ((rgb[:, :, 0] * 77 + rgb[:, :, 1] * 150 + rgb[:, :, 2] * 29) >> 8).astype(np.uint8)
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """The gray level that best splits the histogram into ink and paper (between-class variance)."""
+    # bincount widens its input to int64: a band of rows at a time keeps that copy small
+    band = max(1, (1 << 20) // max(1, gray.shape[1]))
+    hist = sum((np.bincount(gray[top:top + band].ravel(), minlength=256) for top in range(0, gray.shape[0], band)),
+               np.zeros(256, dtype=np.int64)).astype(np.float64)
+    weight = np.cumsum(hist)
+    total = weight[-1]
+    if not total:
+        return 128
+    mass = np.cumsum(hist * np.arange(256))
+    background = total - weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mass[-1] * weight - mass * total) ** 2 / (weight * background)
+    between[~np.isfinite(between)] = 0.0
+    return int(np.argmax(between))
+
+
+def _box_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of each pixel's window x window neighbourhood (edges replicated), via an integral image."""
+    half = window // 2
+    padded = np.pad(values, ((half + 1, half), (half + 1, half)), mode="edge")
+    padded[0, :] = 0
+    padded[:, 0] = 0
+    integral = padded.cumsum(axis=0).cumsum(axis=1)
+    return (integral[window:, window:] - integral[:-window, window:]
+            - integral[window:, :-window] + integral[:-window, :-window])
+
+
+def sauvola_mask(gray: np.ndarray, window: int, k: float = 0.2, dynamic_range: float = 128.0) -> np.ndarray:
+    """Ink pixels by Sauvola's local threshold mean * (1 + k * (deviation / R - 1))."""
+    window = max(3, window | 1)
+    values = gray.astype(np.float64)
+    area = float(window * window)
+    mean = _box_sums(values, window) / area
+    variance = _box_sums(values * values, window) / area - mean * mean
+    threshold = mean * (1.0 + k * (np.sqrt(np.maximum(variance, 0.0)) / dynamic_range - 1.0))
+    return values <= threshold
+
+
+def _edge_run(dark: np.ndarray) -> Tuple[int, int]:
+    """How many leading and trailing entries of a boolean profile are True."""
+    light = np.flatnonzero(~dark)
+    if not light.size:
+        return 0, 0
+    return int(light[0]), int(len(dark) - 1 - light[-1])
+
+
+def border_box(ink: np.ndarray, max_ink: float = 0.5) -> Tuple[int, int, int, int]:
+    """
+    (top, bottom, left, right) inside the dark bands a scanner leaves at the
+    edges: leading and trailing rows and columns that are mostly ink.
+    """
+    height, width = ink.shape
+    top, bottom = _edge_run(np.count_nonzero(ink, axis=1) > max_ink * width)
+    left, right = _edge_run(np.count_nonzero(ink, axis=0) > max_ink * height)
+    return top, height - bottom, left, width - right
+
+
+def content_box(ink: np.ndarray, margin: int, min_ink: float = 0.005) -> Tuple[int, int, int, int]:
+    """
+    (top, bottom, left, right) of the rows and columns with ink, grown by
+    margin. A row or column needs min_ink of its length inked (at least two
+    pixels), so scattered noise specks do not count as content.
+    """
+    height, width = ink.shape
+    rows = np.flatnonzero(np.count_nonzero(ink, axis=1) >= max(2, min_ink * width))
+    cols = np.flatnonzero(np.count_nonzero(ink, axis=0) >= max(2, min_ink * height))
+    if not rows.size or not cols.size:
+        return 0, height, 0, width
+    return (max(0, rows[0] - margin), min(height, rows[-1] + 1 + margin),
+            max(0, cols[0] - margin), min(width, cols[-1] + 1 + margin))
+
+
+def _profile_scores(ys: np.ndarray, xs: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    # Row index of every ink pixel once the page is sheared by each angle, one
+    # histogram per angle in a single bincount; aligned lines give peaky rows
+    shifted = np.rint(ys[None, :] - xs[None, :] * np.tan(np.radians(angles))[:, None]).astype(np.int64)
+    shifted -= shifted.min()
+    span = int(shifted.max()) + 1
+    shifted += np.arange(len(angles))[:, None] * span
+    hist = np.bincount(shifted.ravel(), minlength=len(angles) * span).reshape(len(angles), span)
+    return np.square(np.diff(hist.astype(np.float64), axis=1)).sum(axis=1)
+
+
+def estimate_skew(ink: np.ndarray, max_angle: float = 5.0, max_points: int = 50_000) -> float:
+    """
+    Text line angle in degrees (positive: lines run down to the right), by
+    projection profiles: a coarse 0.5 degree search, then 0.1 around the best.
+    """
+    ys, xs = np.nonzero(ink)
+    if len(ys) < 100:
+        return 0.0
+    step = max(1, len(ys) // max_points)
+    ys = ys[::step].astype(np.float64)
+    xs = xs[::step].astype(np.float64) - ink.shape[1] / 2
+    coarse = np.arange(-max_angle, max_angle + 0.25, 0.5)
+    best = coarse[np.argmax(_profile_scores(ys, xs, coarse))]
+    fine = np.arange(best - 0.5, best + 0.55, 0.1)
+    scores = _profile_scores(ys, xs, fine)
+    # Ties (a straight page) resolve to the angle nearest zero
+    candidates = fine[scores == scores.max()]
+    return round(float(candidates[np.argmin(np.abs(candidates))]), 2)
+
+
+def deskew(image: np.ndarray, angle: float, fill: int = 255) -> np.ndarray:
+    """
+    Straighten lines at `angle` by shifting each column vertically about the
+    page centre. For scanner skew (a few degrees) this is the part of a
+    rotation that matters to line finding; the horizontal part only slides
+    glyphs along their line.
+    """
+    if abs(angle) < 0.05:
+        return image
+    height, width = image.shape
+    shift = np.rint((np.arange(width) - width / 2) * np.tan(np.radians(angle))).astype(np.int32)
+    rows = np.arange(height, dtype=np.int32)[:, None] + shift[None, :]
+    inside = (rows >= 0) & (rows < height)
+    out = image[np.clip(rows, 0, height - 1), np.arange(width, dtype=np.int32)[None, :]]
+    out[~inside] = fill
+    return out
+
+
+def preprocess(gray: np.ndarray, profile: PreprocessProfile, dpi: int = 150) -> np.ndarray:
+    """
+    Run a profile's steps on a gray page. Returns a C-contiguous uint8 array
+    (possibly the input itself when no step changed it).
+    """
+    if not (profile.binarize or profile.deskew or profile.crop):
+        return gray
+    dpi = dpi or 150
+    if profile.binarize == "sauvola":
+        ink = sauvola_mask(gray, int(profile.window_inches * dpi), profile.sauvola_k)
+    else:
+        ink = gray < otsu_threshold(gray)
+    image = np.where(ink, np.uint8(0), np.uint8(255)) if profile.binarize else gray
+
+    if profile.crop:
+        top, bottom, left, right = border_box(ink)
+        image, ink = image[top:bottom, left:right], ink[top:bottom, left:right]
+    if profile.deskew and image.size:
+        angle = estimate_skew(ink, profile.max_skew)
+        if angle:
+            image = deskew(image, angle)
+            ink = deskew(ink, angle, fill=False)
+    if profile.crop and image.size:
+        top, bottom, left, right = content_box(ink, int(profile.margin_inches * dpi))
+        image = image[top:bottom, left:right]
+    return np.ascontiguousarray(image)
+
+
+def preprocess_pixmap(pix, profile: PreprocessProfile) -> np.ndarray:
+    """preprocess() on a fitz.Pixmap's samples, gray or colour."""
+    gray = pixmap_gray(pix.samples_mv, pix.width, pix.height, pix.n, pix.stride)
+    return preprocess(gray, profile, int(pix.xres))
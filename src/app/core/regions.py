@@ -0,0 +1,94 @@
+"""
+Page Regions - Image areas of a page that need OCR, and merging their text
+back into the text layer in reading order.
+
+A page with a usable text layer may still carry a scanned clipping: its text
+is only in the pixels. Image placements (get_image_info, no decoding) that
+no text block lies on are those areas; rendering and OCR'ing just them is a
+fraction of the pixels of a full-page render.
+"""
+from typing import List, NamedTuple, Sequence
+import fitz  # PyMuPDF
+
+
+class TextBlock(NamedTuple):
+    rect: fitz.Rect
+    text: str
+
+
+class RegionPlan(NamedTuple):
+    kind: str                 # Text layer classification of the page
+    blocks: List[TextBlock]   # Text-layer blocks, in the layer's order
+    regions: List[fitz.Rect]  # Image areas to OCR
+
+
+def text_blocks(page: fitz.Page, textpage: fitz.TextPage = None) -> List[TextBlock]:
+    """Non-empty text blocks of a page, in content order."""
+    blocks = []
+    for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks", textpage=textpage):
+        if block_type == 0 and text.strip():
+            blocks.append(TextBlock(fitz.Rect(x0, y0, x1, y1), text))
+    return blocks
+
+
+def _merge_overlapping(rects: List[fitz.Rect]) -> List[fitz.Rect]:
+    """Union of every chain of intersecting rects: no two results overlap."""
+    merged: List[fitz.Rect] = []
+    for rect in sorted(rects, key=lambda r: (r.y0, r.x0)):
+        rect = fitz.Rect(rect)
+        # A grown rect may now reach others already merged: absorb them until none is left
+        while True:
+            touching = [other for other in merged if rect.intersects(other)]
+            if not touching:
+                break
+            for other in touching:
+                merged.remove(other)
+                rect = rect | other
+        merged.append(rect)
+    return sorted(merged, key=lambda r: (r.y0, r.x0))
+
+
+def image_regions(page: fitz.Page, min_area_ratio: float = 0.02, min_side: float = 36.0) -> List[fitz.Rect]:
+    """
+    Areas covered by images, overlapping placements merged. Images smaller
+    than min_area_ratio of the page or min_side points (logos, rules,
+    bullets) are left out.
+    """
+    page_rect = page.rect
+    min_area = abs(page_rect) * min_area_ratio
+    rects = []
+    for info in page.get_image_info():
+        rect = fitz.Rect(info["bbox"]) & page_rect
+        if rect.is_empty or abs(rect) < min_area or min(rect.width, rect.height) < min_side:
+            continue
+        rects.append(rect)
+    return _merge_overlapping(rects)
+
+
+def has_text_over(region: fitz.Rect, blocks: Sequence[TextBlock], min_inside: float = 0.5) -> bool:
+    """True if a text block lies (mostly) on the region: its text is already in the layer."""
+    for block in blocks:
+        area = abs(block.rect)
+        if area and abs(block.rect & region) >= min_inside * area:
+            return True
+    return False
+
+
+def merge_reading_order(blocks: Sequence[TextBlock], ocr_blocks: Sequence[TextBlock]) -> str:
+    """
+    Page text with each OCR'd region placed after the last block above it
+    in the same column, or else before the first block below its top.
+    Text-layer blocks keep their own order, which follows the columns.
+    """
+    items = list(blocks)
+    for region in sorted(ocr_blocks, key=lambda b: (b.rect.y0, b.rect.x0)):
+        rect = region.rect
+        above = [i for i, item in enumerate(items)
+                 if item.rect.y1 <= rect.y0 + 2 and min(item.rect.x1, rect.x1) > max(item.rect.x0, rect.x0)]
+        if above:
+            index = above[-1] + 1
+        else:
+            index = next((i for i, item in enumerate(items) if item.rect.y0 >= rect.y0), len(items))
+        items.insert(index, region)
+    texts = [item.text.strip() for item in items if item.text.strip()]
+    return "\n\n".join(texts) + ("\n" if texts else "")
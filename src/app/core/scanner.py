@@ -0,0 +1,70 @@
+"""
+Input Scanner - Streams the PDFs under an input folder in batches.
+
+Input shares can hold tens of thousands of PDFs in nested folders. The walk
+uses os.scandir (file sizes come with the directory listing on Windows),
+does not follow directory links, skips folders it cannot read and yields
+results in batches, so a caller can show them before the walk is done.
+"""
+import os
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple
+from ..utils.logger import logger
+
+
+class ScannedFile(NamedTuple):
+    path: Path
+    size: int
+
+
+def scan_pdfs(root: Path, recursive: bool = True, batch_size: int = 256,
+              should_stop: Callable[[], bool] = None) -> Iterator[List[ScannedFile]]:
+    """
+    Yield the PDFs under root in batches of up to batch_size, folder by folder,
+    each folder's files by name. A file given as root is yielded on its own.
+    """
+    root = Path(root)
+    if root.is_file():
+        yield [ScannedFile(root, root.stat().st_size)]
+        return
+    batch: List[ScannedFile] = []
+    folders = [root]
+    while folders:
+        if should_stop and should_stop():
+            return
+        folder = folders.pop()
+        try:
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Cannot scan {folder}: {e}")
+            continue
+        subfolders = []
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.name.lower().endswith(".pdf"):
+                    batch.append(ScannedFile(Path(entry.path), entry.stat().st_size))
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    subfolders.append(Path(entry.path))
+            except OSError as e:
+                logger.debug(f"Skipping {entry.path}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        # Depth-first, subfolders in name order
+        folders.extend(reversed(subfolders))
+    if batch:
+        yield batch
+
+
+def find_pdfs(input_path: Path, recursive: bool = False) -> List[Path]:
+    """All PDFs under input_path, sorted by path."""
+    return sorted(f.path for batch in scan_pdfs(input_path, recursive) for f in batch)
+
+
+def output_folder(pdf_path: Path, input_path: Path, output_dir: Path) -> Path:
+    """Subfolders of the input folder are mirrored under the output folder."""
+    if input_path.is_dir():
+        return output_dir / pdf_path.parent.relative_to(input_path)
+    return output_dir
@@ -0,0 +1,274 @@
+"""
+Batch Scheduler - Two-lane page scheduling across all files of a batch.
+
+The text lane opens documents and runs the cheap text-layer pass on every
+page; pages that need OCR are rendered there and handed to the OCR lane,
+which has a fixed capacity. Partly-text pages go to the OCR lane with their
+region plan; the lane renders just those regions. Finished pages are put
+back in order per file and passed to the pipeline's DocumentWriter.
+
+Text-lane renders wait for the extractor's memory budget. The OCR lane
+never waits for it: its pages are the ones that free memory.
+"""
+import concurrent.futures
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+import fitz  # PyMuPDF
+from ..utils import tracing
+from ..utils.logger import logger
+from .pipeline import DocumentWriter, ProcessingPipeline
+from .regions import RegionPlan
+from .text_classifier import OCR
+
+
+class _DocumentCollector:
+    """Re-orders one file's finished pages and feeds them to its writer."""
+    def __init__(self, writer: DocumentWriter, on_done: Callable[[bool], None]):
+        self.writer = writer
+        self.on_done = on_done
+        self.lock = threading.Lock()
+        self.pending: Dict[int, Dict] = {}
+        self.next_page = 1
+        self.total_pages: Optional[int] = None
+        self.done = False
+
+    def put(self, page_data: Dict):
+        with self.lock:
+            if self.done:
+                return
+            self.pending[page_data["page_num"]] = page_data
+            try:
+                while self.next_page in self.pending:
+                    self.writer.add_page(self.pending.pop(self.next_page))
+                    self.next_page += 1
+            except Exception as e:
+                logger.error(f"Writing {self.writer.input_file.name} failed: {e}")
+                self._finish(False)
+                return
+            self._maybe_finish()
+
+    def all_submitted(self, total_pages: int):
+        with self.lock:
+            self.total_pages = total_pages
+            self._maybe_finish()
+
+    def fail(self):
+        with self.lock:
+            self._finish(False)
+
+    def _maybe_finish(self):
+        if self.done or self.total_pages is None or self.next_page <= self.total_pages:
+            return
+        try:
+            self.writer.finish()
+            self._finish(True)
+        except Exception as e:
+            logger.error(f"Finishing {self.writer.input_file.name} failed: {e}")
+            self._finish(False)
+
+    def _finish(self, success: bool):
+        if not self.done:
+            self.done = True
+            self.pending.clear()
+            if not success:
+                try:
+                    self.writer.abort()
+                except Exception as e:
+                    logger.debug(f"Cleaning up {self.writer.input_file.name} failed: {e}")
+            self.on_done(success)
+
+
+class BatchScheduler:
+    """
+    Runs a batch of PDFs through a pipeline with separate text and OCR lanes.
+    Used by the UI and the headless CLI.
+    """
+    def __init__(self, pipeline: ProcessingPipeline, text_workers: int = None, ocr_capacity: int = None):
+        cpus = os.cpu_count() or 2
+        self.pipeline = pipeline
+        self.text_workers = max(1, text_workers or min(4, cpus))
+        self.ocr_capacity = max(1, ocr_capacity or pipeline.extractor.ocr_pool.size)
+
+    def run(self,
+            files: List[Path],
+            output_dir: Union[str, Callable[[Path], str]],
+            progress_callback: Callable[[Path, float, str], None] = None,
+            on_file_start: Callable[[Path], None] = None,
+            on_file_done: Callable[[Path, bool], None] = None,
+            should_stop: Callable[[], bool] = None) -> Dict[Path, bool]:
+        """
+        Process all files and block until every file is finished or stopped.
+        output_dir is a folder, or a function giving each file's folder.
+        Returns {file: success}.
+        """
+        results: Dict[Path, bool] = {}
+        results_lock = threading.Lock()
+        finished = {f: threading.Event() for f in files}
+        # Limits rendered pixmaps waiting for the OCR lane
+        ocr_slots = threading.BoundedSemaphore(self.ocr_capacity * 2)
+        stopped = should_stop or (lambda: False)
+
+        def file_done(pdf_path: Path, success: bool):
+            with results_lock:
+                if pdf_path in results:
+                    return
+                results[pdf_path] = success
+            if not success and stopped() and progress_callback:
+                progress_callback(pdf_path, 0.0, "Stopped by User")
+            if on_file_done:
+                on_file_done(pdf_path, success)
+            finished[pdf_path].set()
+
+        with concurrent.futures.ThreadPoolExecutor(self.ocr_capacity, thread_name_prefix="ocr-lane",
+                                                   initializer=tracing.name_thread) as ocr_lane, \
+             concurrent.futures.ThreadPoolExecutor(self.text_workers, thread_name_prefix="text-lane",
+                                                   initializer=tracing.name_thread) as text_lane:
+
+            def ocr_task(collector: _DocumentCollector, pdf_path: Path, page_num: int, total_pages: int,
+                         render: List[fitz.Pixmap], key: str, stages: Dict[str, float], submitted: float):
+                def rerender(dpi: int) -> fitz.Pixmap:
+                    # Low-confidence escalation: this lane has no open document
+                    with fitz.open(str(pdf_path)) as doc:
+                        return self.pipeline.extractor.retry_render(doc.load_page(page_num - 1), dpi)
+
+                try:
+                    if collector.done or stopped():
+                        collector.fail()
+                        return
+                    # The page's stage totals continue from the text lane
+                    with tracing.collect(stages):
+                        tracing.add_stage("ocr_lane_wait", (time.perf_counter() - submitted) * 1000)
+                        # Popped, not passed: ocr_pass then holds the only reference and
+                        # can free the render (and its memory) before a higher-DPI retry
+                        result = self.pipeline.extractor.ocr_pass(page_num, render.pop(), stopped, key, rerender)
+                    if result is None:
+                        collector.fail()
+                        return
+                    collector.put(self.pipeline.extractor.page_data(page_num, total_pages, result, stages))
+                except Exception as e:
+                    logger.error(f"OCR lane failed on page {page_num}: {e}")
+                    collector.fail()
+                finally:
+                    ocr_slots.release()
+
+            def region_task(collector: _DocumentCollector, pdf_path: Path, page_num: int, total_pages: int,
+                            plan: RegionPlan, stages: Dict[str, float], submitted: float):
+                # Regions are rendered here, from this lane's own handle on the document
+                try:
+                    if collector.done or stopped():
+                        collector.fail()
+                        return
+                    with tracing.collect(stages):
+                        tracing.add_stage("ocr_lane_wait", (time.perf_counter() - submitted) * 1000)
+                        with fitz.open(str(pdf_path)) as doc:
+                            # No waiting for memory in this lane: it frees what the text lane waits for
+                            result = self.pipeline.extractor.region_pass(page_num, doc.load_page(page_num - 1),
+                                                                         plan, stopped, wait=False)
+                    if result is None:
+                        collector.fail()
+                        return
+                    collector.put(self.pipeline.extractor.page_data(page_num, total_pages, result, stages))
+                except Exception as e:
+                    logger.error(f"OCR lane failed on page {page_num}: {e}")
+                    collector.fail()
+                finally:
+                    ocr_slots.release()
+
+            def lane_pages(collector: _DocumentCollector, pdf_path: Path, writer: DocumentWriter) -> bool:
+                """Feed a document's pages through both lanes. False when stopped."""
+                extractor = self.pipeline.extractor
+                with fitz.open(str(pdf_path)) as doc:
+                    total_pages = len(doc)
+                    fonts = extractor.font_index(doc)
+                    for page_index in range(total_pages):
+                        if stopped() or collector.done:
+                            return False
+                        page_num = page_index + 1
+                        if page_num in writer.skip_pages:
+                            collector.put(extractor.resumed_page(page_num, total_pages))
+                            continue
+                        with tracing.collect() as stages:
+                            with tracing.span("load_page"):
+                                page = doc.load_page(page_index)
+                            layer = extractor.text_pass(page, fonts)
+                            plan = extractor.plan_regions(page, layer)
+                            if plan is None and layer.kind == OCR:
+                                cached, key = extractor.lookup_ocr(page)
+                        if plan is not None:
+                            ocr_slots.acquire()
+                            try:
+                                ocr_lane.submit(region_task, collector, pdf_path, page_num, total_pages, plan,
+                                                stages, time.perf_counter())
+                            except Exception:
+                                ocr_slots.release()
+                                raise
+                            continue
+                        if layer.kind != OCR:
+                            collector.put(extractor.page_data(page_num, total_pages, extractor.text_result(layer),
+                                                              stages))
+                            continue
+                        if cached is not None:
+                            collector.put(extractor.page_data(page_num, total_pages, cached, stages))
+                            continue
+                        ocr_slots.acquire()
+                        try:
+                            with tracing.collect(stages):
+                                pix = extractor.render_page(page)
+                            ocr_lane.submit(ocr_task, collector, pdf_path, page_num, total_pages, [pix], key,
+                                            stages, time.perf_counter())
+                            # The OCR lane holds the render now; it frees it (and its memory) when done
+                            pix = None
+                        except Exception:
+                            ocr_slots.release()
+                            raise
+                return True
+
+            def text_task(pdf_path: Path):
+                if stopped():
+                    file_done(pdf_path, False)
+                    return
+                progress = (lambda p, m: progress_callback(pdf_path, p, m)) if progress_callback else None
+                if on_file_start:
+                    on_file_start(pdf_path)
+                collector = None
+                try:
+                    folder = output_dir(pdf_path) if callable(output_dir) else output_dir
+                    writer = self.pipeline.open_document(str(pdf_path), folder, progress)
+                    collector = _DocumentCollector(writer, lambda ok: file_done(pdf_path, ok))
+                    sharded = self.pipeline.sharded_extractor
+                    with fitz.open(str(pdf_path)) as doc:
+                        total_pages = len(doc)
+                    if sharded.should_shard(total_pages, writer.skip_pages):
+                        # A large document: processes of its own extract its pages, this thread collects them
+                        for page_data in sharded.process_pdf(str(pdf_path), should_stop=stopped,
+                                                             skip_pages=writer.skip_pages):
+                            if collector.done:
+                                break
+                            collector.put(page_data)
+                        stopped_early = stopped()
+                    else:
+                        stopped_early = not lane_pages(collector, pdf_path, writer)
+                    if stopped_early:
+                        collector.fail()
+                        return
+                    collector.all_submitted(total_pages)
+                except Exception as e:
+                    logger.error(f"Pipeline failed for {pdf_path}: {e}")
+                    if progress:
+                        progress(0.0, f"Error: {e}")
+                    if collector is not None:
+                        # Aborts the writer and drops pages the OCR lane still delivers
+                        collector.fail()
+                    else:
+                        file_done(pdf_path, False)
+
+            for pdf_path in files:
+                text_lane.submit(text_task, pdf_path)
+
+            for pdf_path in files:
+                finished[pdf_path].wait()
+
+        return results
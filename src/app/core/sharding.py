@@ -0,0 +1,154 @@
+"""
+Intra-document page sharding - extracts one large PDF with several processes.
+
+The document is split into page ranges; each range is extracted by a child
+process that opens the PDF itself. Results are yielded back in page order, so
+callers see the same stream of page dicts as from PDFExtractor.process_pdf.
+Each process has its own share of the memory budget; their stats for the
+last sharded run of a document are in ShardedExtractor.memory_stats.
+"""
+import concurrent.futures
+import math
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+import fitz  # PyMuPDF
+from ..utils import tracing
+from ..utils.logger import logger
+from .extractor import PDFExtractor
+from .memory_budget import merge_stats
+
+# Per-process extractor used inside shard workers (one OCR worker each)
+_shard_extractor: Optional[PDFExtractor] = None
+_stop_event = None
+
+
+def _init_shard_process(tesseract_path: str, stop_event, cache_path: Optional[str], cache_max_bytes: int,
+                        ocr_settings: Dict, trace: bool = False, memory_limit: int = None):
+    global _shard_extractor, _stop_event
+    if trace:
+        tracing.enable("page-shard")
+    from .memory_budget import MemoryBudget
+    from .ocr_cache import OCRCache
+    from .ocr_pool import OCRWorkerPool
+    _shard_extractor = PDFExtractor(
+        tesseract_path,
+        ocr_pool=OCRWorkerPool(size=1, tesseract_path=tesseract_path, memory_budget=MemoryBudget(memory_limit)),
+        ocr_cache=OCRCache(cache_path, cache_max_bytes) if cache_path else None,
+        use_ocr_cache=cache_path is not None
+    )
+    _shard_extractor.configure_ocr(**ocr_settings)
+    _stop_event = stop_event
+
+
+def _extract_shard(pdf_path: str, start: int, stop: int,
+                   skip_pages: Set[int]) -> Tuple[List[Dict], List[Dict], Tuple[int, Dict]]:
+    """
+    Runs in a child process: extract pages [start, stop) of the document.
+    Returns the pages, the trace events recorded meanwhile and (pid, the
+    process's memory budget stats so far).
+    """
+    pages = list(_shard_extractor.process_pdf(pdf_path, should_stop=_stop_event.is_set, pages=range(start, stop),
+                                              skip_pages=skip_pages))
+    return pages, tracing.drain(), (os.getpid(), _shard_extractor.memory_budget.stats())
+
+
+def plan_shards(total_pages: int, workers: int, min_pages: int = 4) -> List[range]:
+    """
+    Split pages into ranges. Several ranges per worker keep all workers busy
+    when OCR-heavy pages cluster, and let results stream back early.
+    """
+    if total_pages <= 0:
+        return []
+    size = max(min_pages, math.ceil(total_pages / (workers * 4)))
+    return [range(start, min(start + size, total_pages)) for start in range(0, total_pages, size)]
+
+
+class ShardedExtractor:
+    """
+    Drop-in replacement for PDFExtractor.process_pdf that fans one document
+    out over `workers` processes. Small documents stay in-process.
+    """
+    def __init__(self, extractor: PDFExtractor, workers: int = None, min_pages_to_shard: int = 32):
+        self.extractor = extractor
+        self.workers = max(1, workers or os.cpu_count() or 2)
+        self.min_pages_to_shard = min_pages_to_shard
+        # Document path -> merged memory budget stats of the processes that extracted it
+        self.memory_stats: Dict[str, Dict] = {}
+
+    def should_shard(self, total_pages: int, skip_pages: Set[int] = None) -> bool:
+        """True if the pages still to extract are worth the processes' start-up."""
+        return self.workers > 1 and total_pages - len(skip_pages or ()) >= self.min_pages_to_shard
+
+    def _cache_args(self):
+        cache = self.extractor.ocr_cache
+        return (str(cache.path), cache.max_bytes) if cache is not None else (None, 0)
+
+    def _ocr_settings(self) -> Dict:
+        return {
+            "start_dpi": self.extractor.start_dpi,
+            "max_dpi": self.extractor.max_dpi,
+            "min_confidence": self.extractor.min_confidence,
+            "lang": self.extractor.lang,
+            "force_ocr": self.extractor.force_ocr,
+            "engine": self.extractor.ocr_engine,
+            "region_ocr": self.extractor.region_ocr,
+            "preprocess": self.extractor.preprocess_profile,
+        }
+
+    def process_pdf(self, pdf_path: str, should_stop: Callable[[], bool] = None, poll_interval: float = 0.2,
+                    skip_pages: Set[int] = None) -> Iterator[Dict]:
+        skip_pages = skip_pages or set()
+        self.memory_stats.pop(str(Path(pdf_path)), None)
+        with fitz.open(pdf_path) as doc:
+            total_pages = len(doc)
+
+        if not self.should_shard(total_pages, skip_pages):
+            yield from self.extractor.process_pdf(pdf_path, should_stop=should_stop, skip_pages=skip_pages)
+            return
+
+        shards = plan_shards(total_pages, self.workers)
+        logger.info(f"Sharding {pdf_path}: {total_pages} pages in {len(shards)} ranges over {self.workers} processes")
+
+        # Spawn (not fork): the parent has UI and OCR reader threads running
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Manager() as manager:
+            stop_event = manager.Event()
+            processes = min(self.workers, len(shards))
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=ctx,
+                initializer=_init_shard_process,
+                # The processes split the memory budget between them
+                initargs=(self.extractor.tesseract_path, stop_event, *self._cache_args(), self._ocr_settings(),
+                          tracing.is_enabled(), self.extractor.memory_budget.limit // processes)
+            )
+            process_stats: Dict[int, Dict] = {}
+            try:
+                futures = [
+                    executor.submit(_extract_shard, pdf_path, r.start, r.stop,
+                                    {p for p in skip_pages if r.start < p <= r.stop})
+                    for r in shards
+                ]
+                # Yield in page order: wait for each range in turn
+                for future in futures:
+                    while True:
+                        if should_stop and should_stop():
+                            logger.info(f"Stop requested, cancelling page shards of {pdf_path}")
+                            stop_event.set()
+                            return
+                        try:
+                            pages, events, (pid, stats) = future.result(timeout=poll_interval)
+                            break
+                        except concurrent.futures.TimeoutError:
+                            continue
+                    tracing.extend(events)
+                    # A process's stats are cumulative: keep its latest
+                    process_stats[pid] = stats
+                    if future is futures[-1]:
+                        self.memory_stats[str(Path(pdf_path))] = merge_stats(process_stats.values())
+                    yield from pages
+            finally:
+                stop_event.set()
+                executor.shutdown(wait=True, cancel_futures=True)
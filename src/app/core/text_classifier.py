@@ -0,0 +1,129 @@
+"""
+Text Layer Classifier - Decides per page whether the PDF text layer is usable.
+
+One rawdict pass gives per-character codepoints and glyph boxes; image
+placements come from get_image_info (no image decoding). The page is scored
+on script ratios, broken characters (replacement, private-use, control),
+glyph coverage and image coverage, and classified as plain text,
+legacy-encoded text, or OCR.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import fitz  # PyMuPDF
+
+TEXT = "text"
+LEGACY = "legacy"
+OCR = "ocr"
+
+
+class PageClassification(NamedTuple):
+    kind: str                 # TEXT, LEGACY or OCR
+    text: str                 # plain text from the same TextPage ("" for OCR pages)
+    textpage: fitz.TextPage   # reusable for further extraction from this page
+    scores: Dict[str, float]
+    # Legacy encodings converted per font span (None: text not decoded by font)
+    encodings: Optional[Tuple[str, ...]] = None
+
+
+def _is_tamil(cp: int) -> bool:
+    return 0x0B80 <= cp <= 0x0BFF
+
+
+def _is_broken(cp: int) -> bool:
+    # Replacement char, private use area (unmapped glyphs), C0/C1 controls
+    return (cp == 0xFFFD or 0xE000 <= cp <= 0xF8FF
+            or (cp < 0x20 and cp not in (0x09, 0x0A, 0x0D)) or 0x7F <= cp <= 0x9F)
+
+
+class TextLayerClassifier:
+    def __init__(self,
+                 min_chars: int = 50,
+                 max_broken_ratio: float = 0.1,
+                 scan_image_coverage: float = 0.5,
+                 min_glyph_coverage: float = 0.01):
+        """
+        Args:
+            min_chars: Pages with fewer characters are OCR'd if they are mostly image
+            max_broken_ratio: Share of broken characters above which the layer is unusable
+            scan_image_coverage: Image area share that marks a page as a scan
+            min_glyph_coverage: Glyph area share below which text on a scan is ignored
+        """
+        self.min_chars = min_chars
+        self.max_broken_ratio = max_broken_ratio
+        self.scan_image_coverage = scan_image_coverage
+        self.min_glyph_coverage = min_glyph_coverage
+
+    def score(self, raw: Dict, page_rect: fitz.Rect, image_rects: List[fitz.Rect]) -> Dict[str, float]:
+        chars = tamil = latin = latin1 = broken = in_word_semicolons = 0
+        glyph_area = 0.0
+        image_area = sum(abs(r & page_rect) for r in image_rects)
+        for block in raw.get("blocks", []):
+            if block.get("type") != 0:
+                continue
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    prev = ""
+                    span_chars = span.get("chars", [])
+                    for i, ch in enumerate(span_chars):
+                        c = ch["c"]
+                        cp = ord(c)
+                        if c.isspace():
+                            prev = c
+                            continue
+                        chars += 1
+                        if _is_tamil(cp):
+                            tamil += 1
+                        elif c.isascii() and c.isalpha():
+                            latin += 1
+                        elif 0xA0 <= cp <= 0xFF:
+                            latin1 += 1
+                        if _is_broken(cp):
+                            broken += 1
+                        # Bamini-style encodings put ';' (pulli) inside words
+                        if c == ";" and prev.isalpha() and i + 1 < len(span_chars) and span_chars[i + 1]["c"].isalpha():
+                            in_word_semicolons += 1
+                        x0, y0, x1, y1 = ch["bbox"]
+                        glyph_area += max(0.0, x1 - x0) * max(0.0, y1 - y0)
+                        prev = c
+
+        area = abs(page_rect) or 1.0
+        return {
+            "chars": chars,
+            "tamil_ratio": tamil / chars if chars else 0.0,
+            "latin_ratio": latin / chars if chars else 0.0,
+            "latin1_ratio": latin1 / chars if chars else 0.0,
+            "broken_ratio": broken / chars if chars else 0.0,
+            "in_word_semicolon_ratio": in_word_semicolons / chars if chars else 0.0,
+            "glyph_coverage": min(1.0, glyph_area / area),
+            "image_coverage": min(1.0, image_area / area),
+        }
+
+    def is_scan(self, s: Dict[str, float]) -> bool:
+        """No text, or an image page whose text layer is too thin to use."""
+        if s["chars"] == 0:
+            return True
+        # A scan with a thin OCR'd or stamped text layer on top
+        if s["image_coverage"] >= self.scan_image_coverage and s["glyph_coverage"] < self.min_glyph_coverage:
+            return True
+        # Little text on a mostly-image page (the old "< 50 characters" case)
+        return s["chars"] < self.min_chars and s["image_coverage"] >= self.scan_image_coverage
+
+    def decide(self, s: Dict[str, float]) -> str:
+        if self.is_scan(s):
+            return OCR
+        # Broken ToUnicode maps: boxes, private-use glyphs, control characters
+        if s["broken_ratio"] > self.max_broken_ratio:
+            return OCR
+        # Tamil rendered through legacy fonts comes out as Latin/Latin-1 gibberish
+        if s["tamil_ratio"] < 0.05 and (s["latin1_ratio"] > 0.1 or s["in_word_semicolon_ratio"] > 0.01):
+            return LEGACY
+        return TEXT
+
+    def classify(self, page: fitz.Page) -> PageClassification:
+        # Same flags as page.get_text(), so the final text matches the old extraction
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+        raw = page.get_text("rawdict", textpage=textpage)
+        image_rects = [fitz.Rect(info["bbox"]) for info in page.get_image_info()]
+        scores = self.score(raw, page.rect, image_rects)
+        kind = self.decide(scores)
+        text = page.get_text("text", textpage=textpage) if kind != OCR else ""
+        return PageClassification(kind, text, textpage, scores)
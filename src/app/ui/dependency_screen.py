@@ -1,5 +1,7 @@
+import threading
 import flet as ft
 from ..core.dependency_checker import DependencyChecker
+from ..utils.logger import logger
 from .components import *
 
 class DependencyScreen(ft.UserControl):
@@ -10,30 +12,51 @@ class DependencyScreen(ft.UserControl):
         self.checker = DependencyChecker()
         
     def did_mount(self):
-        # Auto-proceed if ready
-        if self.checker.get_status()["ready"]:
-             # Small delay to let UI render if needed, or immediate
-             # Using a timer to avoid immediate transition before UI is seen if we want that,
-             # but user asked for "if dependencies are installed then show the Main processing screen"
-             # which implies immediate or near-immediate.
-             self.on_success()
+        # The check starts subprocesses on a cold cache: run it off the UI thread
+        self._start_check(refresh=False)
+
+    def _start_check(self, refresh: bool):
+        threading.Thread(target=self._check, args=(refresh,), daemon=True, name="dependency-check").start()
+
+    def _check(self, refresh: bool):
+        try:
+            status = self.checker.get_status(refresh=refresh)
+        except Exception as e:
+            # Cache I/O or a probe failing must not leave the spinner up forever
+            logger.exception(f"Dependency check failed: {e}")
+            self.body.content = self.build_error_card(e)
+            self.update()
+            return
+        # Auto-proceed if ready (only on the first check; Refresh stays on the screen)
+        if status["ready"] and not refresh:
+            self.on_success()
+            return
+        self.body.content = self.build_card(status)
+        self.update()
 
     def build(self):
         # We wrap everything in a Centered container
-        return ft.Container(
-            content=self.build_card(),
+        self.body = ft.Container(
+            content=self.build_loading(),
             alignment=ft.alignment.center,
             expand=True, # Important to fill page
             bgcolor=COLOR_BACKGROUND
         )
+        return self.body
 
-    def build_card(self):
-        status = self.checker.get_status()
-        
+    def build_loading(self):
+        return ft.Column([
+            ft.ProgressRing(width=32, height=32, stroke_width=3),
+            ft.Text("Checking Tesseract OCR...", **TEXT_BODY)
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, tight=True, spacing=16)
+
+    def build_card(self, status: dict):
+        version = status.get("tesseract_version")
         tess_row = ft.Row([
             get_status_icon(status["tesseract_found"]),
             ft.Text("Tesseract OCR", **TEXT_H2),
-            ft.Text("Installed" if status['tesseract_found'] else "Not Found", color=COLOR_SUCCESS if status['tesseract_found'] else ft.colors.RED)
+            ft.Text((f"Version {version}" if version else "Installed") if status['tesseract_found'] else "Not Found",
+                    color=COLOR_SUCCESS if status['tesseract_found'] else ft.colors.RED)
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
         
         lang_status = status["languages"]
@@ -58,6 +81,26 @@ class DependencyScreen(ft.UserControl):
             width=200
         )
         
+        return self._card([
+            tess_row,
+            eng_row,
+            tam_row,
+            ft.Container(height=40),
+            ft.Divider(),
+            ft.Row([action_btn], alignment=ft.MainAxisAlignment.CENTER)
+        ])
+
+    def build_error_card(self, error: Exception):
+        return self._card([
+            ft.Row([
+                get_status_icon(False),
+                ft.Text("The system check could not run", **TEXT_H2)
+            ]),
+            ft.Text(str(error) or type(error).__name__, color=ft.colors.RED, selectable=True),
+            ft.Text("Use Refresh to try again.", **TEXT_BODY)
+        ])
+
+    def _card(self, controls: list):
         refresh_btn = ft.IconButton(
             icon=ft.icons.REFRESH,
             tooltip="Refresh Checks",
@@ -73,12 +116,7 @@ class DependencyScreen(ft.UserControl):
                 ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                 ft.Divider(),
                 ft.Container(height=20),
-                tess_row,
-                eng_row,
-                tam_row,
-                ft.Container(height=40),
-                ft.Divider(),
-                ft.Row([action_btn], alignment=ft.MainAxisAlignment.CENTER)
+                *controls
             ],
             width=400,
             spacing=10
@@ -93,6 +131,7 @@ class DependencyScreen(ft.UserControl):
         )
 
     def refresh_custom(self, e):
-        # Trigger rebuild
-        self.controls = [self.build()]
+        # Probe again (the user may just have installed a language pack)
+        self.body.content = self.build_loading()
         self.update()
+        self._start_check(refresh=True)
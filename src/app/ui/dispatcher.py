@@ -0,0 +1,91 @@
+"""
+UI Update Dispatcher - Coalesces progress and log events from worker threads.
+
+Pipeline threads report every page; sending each report to Flet costs a
+round-trip, and with many files the UI falls behind. Events are collected
+here instead and applied at most `fps` times per second in one batch: only
+the latest state per progress key, and at most `log_lines` new log lines.
+Nothing in here imports Flet; the window supplies the apply function.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, List, Tuple
+from ..utils.logger import logger
+
+# key -> (value, message)
+ProgressUpdates = Dict[Hashable, Tuple[float, str]]
+
+
+class UpdateDispatcher:
+    def __init__(self, apply: Callable[[ProgressUpdates, List[str]], None], fps: float = 10.0,
+                 log_lines: int = 500):
+        """
+        Args:
+            apply: Called on the dispatcher thread with the pending progress
+                   updates and log lines; it changes the controls and sends
+                   them with a single update
+            fps: Most batches applied per second
+            log_lines: Size of the log view; older pending lines are dropped
+        """
+        self.apply = apply
+        self.interval = 1.0 / fps
+        self._lock = threading.Lock()
+        # Serializes flushes, so an older batch is never applied after a newer one
+        self._flush_lock = threading.Lock()
+        self._progress: ProgressUpdates = {}
+        self._logs: Deque[str] = deque(maxlen=log_lines)
+        self._dirty = False
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ui-dispatcher", daemon=True)
+        self._thread.start()
+
+    def progress(self, key: Hashable, value: float, message: str):
+        """Record the latest progress of key (e.g. a file); earlier pending states are replaced."""
+        with self._lock:
+            self._progress[key] = (value, message)
+        self._wake.set()
+
+    def log(self, line: str):
+        with self._lock:
+            self._logs.append(line)
+        self._wake.set()
+
+    def invalidate(self):
+        """Call apply in the next batch even with nothing pending (e.g. the queue grew)."""
+        with self._lock:
+            self._dirty = True
+        self._wake.set()
+
+    def flush(self):
+        """Apply everything pending now (also called by the dispatcher thread)."""
+        with self._flush_lock:
+            with self._lock:
+                progress, self._progress = self._progress, {}
+                lines = list(self._logs)
+                self._logs.clear()
+                dirty, self._dirty = self._dirty, False
+            if not progress and not lines and not dirty:
+                return
+            try:
+                self.apply(progress, lines)
+            except Exception as e:
+                logger.debug(f"UI update failed: {e}")
+
+    def _run(self):
+        # Sleeps until there is something to send, so an idle window costs nothing
+        while True:
+            self._wake.wait()
+            if self._closed:
+                break
+            self._wake.clear()
+            self.flush()
+            time.sleep(self.interval)
+        self.flush()
+
+    def close(self):
+        """Send what is pending and stop the dispatcher thread."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=2)
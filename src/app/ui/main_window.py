@@ -1,22 +1,32 @@
 import flet as ft
 from pathlib import Path
 import threading
-import concurrent.futures
-import os
-import time
 from .components import *
+from ..core.memory_budget import MB
 from ..core.pipeline import ProcessingPipeline
-from ..utils.logger import logger
+from ..core.preprocess import DEFAULT_PROFILE, PROFILES
+from ..core.scanner import output_folder, scan_pdfs
+from ..core.scheduler import BatchScheduler
+from ..utils.logger import add_file_handler, logger
+from .dispatcher import UpdateDispatcher
+from .queue_model import ACTIVE, DONE, FAILED, QueueModel, visible_range
+
+# Lines kept in the log view; the full log is in the log file
+LOG_VIEW_LINES = 500
+# Fixed card height and spacing: the queue view computes its visible rows from them
+CARD_HEIGHT = 96
+CARD_SPACING = 10
 
 class FileProgressCard(ft.UserControl):
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, value: float = 0.0, msg: str = "Waiting..."):
         super().__init__()
         self.filename = filename
-        self.progress_bar = ft.ProgressBar(value=0.0, color=COLOR_PRIMARY, bgcolor=ft.colors.GREY_200)
-        self.status_text = ft.Text("Waiting...", size=12, color=COLOR_TEXT_SECONDARY)
+        self.progress_bar = ft.ProgressBar(value=value, color=COLOR_PRIMARY, bgcolor=ft.colors.GREY_200)
+        self.status_text = ft.Text(msg, size=12, color=COLOR_TEXT_SECONDARY)
         
     def build(self):
         return ft.Container(
+            height=CARD_HEIGHT,
             content=ft.Column([
                 ft.Row([
                     ft.Icon(ft.icons.INSERT_DRIVE_FILE, size=20, color=COLOR_TEXT_SECONDARY),
@@ -31,16 +41,98 @@ class FileProgressCard(ft.UserControl):
             shadow=ft.BoxShadow(spread_radius=1, blur_radius=3, color=ft.colors.BLACK12)
         )
 
+    def set_progress(self, value: float, msg: str):
+        """Change the controls only; they are sent with the dispatcher's next page update."""
+        self.progress_bar.value = value
+        self.status_text.value = msg
+
     def update_progress(self, value: float, msg: str):
         try:
-            self.progress_bar.value = value
-            self.status_text.value = msg
+            self.set_progress(value, msg)
             # Force update - this will work from any thread in Flet
             self.progress_bar.update()
             self.status_text.update()
         except Exception:
             pass  # Ignore if control is not mounted
 
+class QueueView(ft.UserControl):
+    """
+    Virtualized processing queue. Cards exist only for the rows in the
+    viewport and for the pinned files (active and recently finished); the
+    rest of the list is spacers sized from CARD_HEIGHT.
+    """
+    def __init__(self, model: QueueModel):
+        super().__init__(expand=True)
+        self.model = model
+        self.root: Path = None
+        self.offset = 0.0
+        self.viewport = 600.0
+        self.window = (0, 0)
+        self.row_cards = {}     # key -> card in the scrolled list
+        self.pinned_cards = {}  # key -> card in the pinned strip
+        self._lock = threading.RLock()
+        self.pinned_column = ft.Column(spacing=CARD_SPACING)
+        self.top_spacer = ft.Container(height=0)
+        self.rows = ft.Column(spacing=CARD_SPACING)
+        self.bottom_spacer = ft.Container(height=0)
+        self.list_column = ft.Column(
+            [self.top_spacer, self.rows, self.bottom_spacer],
+            spacing=0, scroll=ft.ScrollMode.AUTO, expand=True,
+            on_scroll=self._on_scroll, on_scroll_interval=50
+        )
+
+    def build(self):
+        return ft.Column([self.pinned_column, self.list_column], spacing=CARD_SPACING, expand=True)
+
+    def _name(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.root)) if self.root else path.name
+        except ValueError:
+            return path.name
+
+    def _card(self, cards: dict, entry) -> FileProgressCard:
+        card = cards.get(entry.key)
+        if card is None:
+            card = FileProgressCard(self._name(entry.path), entry.progress, entry.message)
+        else:
+            card.set_progress(entry.progress, entry.message)
+        return card
+
+    def clear(self):
+        with self._lock:
+            self.offset = 0.0
+            self.window = (0, 0)
+            self.row_cards.clear()
+            self.pinned_cards.clear()
+            self.pinned_column.controls.clear()
+            self.rows.controls.clear()
+            self.top_spacer.height = self.bottom_spacer.height = 0
+
+    def refresh(self):
+        """Rebuild pinned cards and visible rows from the model; does not send (caller updates the page)."""
+        with self._lock:
+            pinned = self.model.pinned()
+            self.pinned_cards = {e.key: self._card(self.pinned_cards, e) for e in pinned}
+            self.pinned_column.controls = list(self.pinned_cards.values())
+
+            count = len(self.model)
+            pitch = CARD_HEIGHT + CARD_SPACING
+            start, stop = visible_range(count, self.offset, self.viewport, pitch)
+            self.row_cards = {e.key: self._card(self.row_cards, e) for e in self.model.window(start, stop)}
+            self.rows.controls = list(self.row_cards.values())
+            self.window = (start, stop)
+            self.top_spacer.height = start * pitch
+            self.bottom_spacer.height = (count - stop) * pitch
+
+    def _on_scroll(self, e: ft.OnScrollEvent):
+        with self._lock:
+            self.offset = e.pixels
+            self.viewport = e.viewport_dimension or self.viewport
+            if visible_range(len(self.model), self.offset, self.viewport, CARD_HEIGHT + CARD_SPACING) == self.window:
+                return
+            self.refresh()
+        self.update()
+
 class MainWindow(ft.UserControl):
     def __init__(self, page: ft.Page, pipeline: ProcessingPipeline = None):
         super().__init__()
@@ -48,8 +140,12 @@ class MainWindow(ft.UserControl):
         self.pipeline = pipeline if pipeline else ProcessingPipeline()
         self.selected_input_dir = None
         self.selected_output_dir = None
-        self.file_cards = {} 
-        self.executor = None # ThreadPool
+        # Compact state of every queued file; cards only for what is on screen
+        self.queue = QueueModel()
+        self.queue_view = QueueView(self.queue)
+        self.scanning = False
+        self._scan_id = 0
+        self._shown_version = -1
         
         self.stop_event = threading.Event()
         self.is_processing = False
@@ -58,10 +154,20 @@ class MainWindow(ft.UserControl):
         # Refs
         self.process_btn_ref = ft.Ref[ft.ElevatedButton]()
         self.log_view_ref = ft.Ref[ft.ListView]()
+        self.dpi_dropdown_ref = ft.Ref[ft.Dropdown]()
+        self.max_dpi_dropdown_ref = ft.Ref[ft.Dropdown]()
+        self.correct_checkbox_ref = ft.Ref[ft.Checkbox]()
+        self.preprocess_dropdown_ref = ft.Ref[ft.Dropdown]()
+        self.page_workers_dropdown_ref = ft.Ref[ft.Dropdown]()
         
         self.meta_total_files = ft.Text("Total Files: --", **TEXT_META)
         self.meta_last_mod = ft.Text("Status: Idle", **TEXT_META)
 
+        # Worker threads report through the dispatcher, which sends at most
+        # 10 page updates per second; the full log goes to a file
+        add_file_handler(logger)
+        self.dispatcher = UpdateDispatcher(self._apply_updates, fps=10, log_lines=LOG_VIEW_LINES)
+
     def build(self):
         # -- Sidebar (30%) --
         self.input_dir_text = ft.TextField(
@@ -142,6 +248,8 @@ class MainWindow(ft.UserControl):
                             content=ft.Column([
                                 ft.Checkbox(label="Skip Poor Quality", label_style=ft.TextStyle(color=COLOR_SIDEBAR_TEXT, size=12)),
                                 ft.Checkbox(label="Force OCR", label_style=ft.TextStyle(color=COLOR_SIDEBAR_TEXT, size=12)),
+                                ft.Checkbox(label="Correct OCR Words", ref=self.correct_checkbox_ref,
+                                            label_style=ft.TextStyle(color=COLOR_SIDEBAR_TEXT, size=12)),
                                 ft.Row([
                                     ft.Text("DPI:", color=COLOR_SIDEBAR_TEXT, size=12, weight=ft.FontWeight.BOLD),
                                     ft.Dropdown(
@@ -157,7 +265,66 @@ class MainWindow(ft.UserControl):
                                         border_color=ft.colors.GREY_400,
                                         height=35,
                                         width=80,
-                                        content_padding=5
+                                        content_padding=5,
+                                        tooltip="Starting OCR resolution",
+                                        ref=self.dpi_dropdown_ref
+                                    )
+                                ], spacing=10, alignment=ft.MainAxisAlignment.START, vertical_alignment=ft.CrossAxisAlignment.CENTER),
+                                ft.Row([
+                                    ft.Text("Max DPI:", color=COLOR_SIDEBAR_TEXT, size=12, weight=ft.FontWeight.BOLD),
+                                    ft.Dropdown(
+                                        options=[
+                                            ft.dropdown.Option("150"), 
+                                            ft.dropdown.Option("300"), 
+                                            ft.dropdown.Option("400"),
+                                            ft.dropdown.Option("600")
+                                        ],
+                                        value="300",
+                                        text_size=11,
+                                        color=ft.colors.BLACK,
+                                        bgcolor=ft.colors.WHITE,
+                                        border_color=ft.colors.GREY_400,
+                                        height=35,
+                                        width=80,
+                                        content_padding=5,
+                                        tooltip="Low-confidence pages are re-scanned at higher DPI up to this limit",
+                                        ref=self.max_dpi_dropdown_ref
+                                    )
+                                ], spacing=10, alignment=ft.MainAxisAlignment.START, vertical_alignment=ft.CrossAxisAlignment.CENTER),
+                                ft.Row([
+                                    ft.Text("Cleanup:", color=COLOR_SIDEBAR_TEXT, size=12, weight=ft.FontWeight.BOLD),
+                                    ft.Dropdown(
+                                        options=[ft.dropdown.Option(name) for name in PROFILES],
+                                        value=DEFAULT_PROFILE,
+                                        text_size=11,
+                                        color=ft.colors.BLACK,
+                                        bgcolor=ft.colors.WHITE,
+                                        border_color=ft.colors.GREY_400,
+                                        height=35,
+                                        width=80,
+                                        content_padding=5,
+                                        tooltip="Image cleanup before OCR: scan (binarize, deskew, crop), noisy (for uneven lighting), crop or off",
+                                        ref=self.preprocess_dropdown_ref
+                                    )
+                                ], spacing=10, alignment=ft.MainAxisAlignment.START, vertical_alignment=ft.CrossAxisAlignment.CENTER),
+                                ft.Row([
+                                    ft.Text("Page Processes:", color=COLOR_SIDEBAR_TEXT, size=12, weight=ft.FontWeight.BOLD),
+                                    ft.Dropdown(
+                                        options=[
+                                            ft.dropdown.Option("1"),
+                                            ft.dropdown.Option("2"),
+                                            ft.dropdown.Option("4")
+                                        ],
+                                        value="1",
+                                        text_size=11,
+                                        color=ft.colors.BLACK,
+                                        bgcolor=ft.colors.WHITE,
+                                        border_color=ft.colors.GREY_400,
+                                        height=35,
+                                        width=80,
+                                        content_padding=5,
+                                        tooltip="PDFs of 32 pages or more are split into page ranges extracted by this many processes at once",
+                                        ref=self.page_workers_dropdown_ref
                                     )
                                 ], spacing=10, alignment=ft.MainAxisAlignment.START, vertical_alignment=ft.CrossAxisAlignment.CENTER)
                             ], spacing=10),
@@ -180,8 +347,7 @@ class MainWindow(ft.UserControl):
         
         # -- Right Content (70%) --
         
-        # 1. Top List (80%)
-        self.files_list = ft.ListView(expand=True, spacing=10, padding=20)
+        # 1. Top List (80%): the virtualized queue, self.queue_view
         
         # 2. Bottom Logs (20%)
         self.log_view = ft.ListView(expand=True, spacing=2, padding=10, auto_scroll=True, ref=self.log_view_ref)
@@ -191,7 +357,7 @@ class MainWindow(ft.UserControl):
                 content=ft.Column([
                     ft.Text("Processing Queue", size=24, weight=ft.FontWeight.BOLD, color=COLOR_TEXT_PRIMARY),
                     ft.Divider(color=ft.colors.BLACK12),
-                    self.files_list
+                    self.queue_view
                 ]),
                 expand=8, # 80%
                 bgcolor=COLOR_BACKGROUND,
@@ -231,28 +397,69 @@ class MainWindow(ft.UserControl):
             self.update()
             
     def check_ready(self):
-        is_ready = bool(self.selected_input_dir and self.selected_output_dir)
+        is_ready = bool(self.selected_input_dir and self.selected_output_dir and not self.scanning
+                        and len(self.queue) and not self.is_processing)
         if self.process_btn_ref.current:
             self.process_btn_ref.current.disabled = not is_ready
             self.process_btn_ref.current.update()
 
     def _scan_files(self):
-        files = list(Path(self.selected_input_dir).glob("*.pdf"))
-        self.meta_total_files.value = f"Total Files: {len(files)}"
-        self.files_list.controls.clear()
-        self.file_cards.clear()
-        for f in files:
-            card = FileProgressCard(f.name)
-            self.files_list.controls.append(card)
-            self.file_cards[str(f)] = card # Key by full path
+        # Walks subfolders on a background thread; a newer scan cancels an older one
+        self._scan_id += 1
+        self.scanning = True
+        self.queue.clear()
+        self.queue_view.clear()
+        self.queue_view.root = Path(self.selected_input_dir)
+        self.meta_total_files.value = "Total Files: scanning..."
+        threading.Thread(target=self._scan_worker, args=(Path(self.selected_input_dir), self._scan_id),
+                         name="input-scan", daemon=True).start()
+
+    def _scan_worker(self, root: Path, scan_id: int):
+        cancelled = lambda: scan_id != self._scan_id
+        try:
+            for batch in scan_pdfs(root, recursive=True, should_stop=cancelled):
+                self.queue.add(batch)
+                self.dispatcher.invalidate()
+        except Exception as e:
+            self.log(f"Scanning {root} failed: {e}")
+        if cancelled():
+            return
+        self.scanning = False
+        self.log(f"Found {len(self.queue)} PDF files in {root}")
+        self.dispatcher.invalidate()
+        self.check_ready()
+
+    def _totals_text(self) -> str:
+        size_mb = self.queue.total_bytes / (1024 * 1024)
+        text = f"Total Files: {len(self.queue)} ({size_mb:,.0f} MB)"
+        if self.scanning:
+            return text + " scanning..."
+        counts = self.queue.counts()
+        if counts[DONE] or counts[FAILED]:
+            text += f"\nDone: {counts[DONE]}  Failed: {counts[FAILED]}"
+        return text
 
     def log(self, msg):
-        # Thread-safe logging to UI
-        if self.log_view_ref.current:
-            self.log_view_ref.current.controls.append(
-                ft.Text(f"> {msg}", font_family="Consolas", color=ft.colors.GREEN_400, size=12)
+        # Thread-safe logging to UI (shown with the next dispatcher batch)
+        logger.info(msg)
+        self.dispatcher.log(msg)
+
+    def _apply_updates(self, progress, lines):
+        """Runs on the dispatcher thread: latest state per card, new log lines, one page update."""
+        for key, (value, msg) in progress.items():
+            self.queue.set_progress(key, value, msg)
+        if self.queue.version != self._shown_version:
+            self._shown_version = self.queue.version
+            self.queue_view.refresh()
+            self.meta_total_files.value = self._totals_text()
+        if lines and self.log_view_ref.current:
+            controls = self.log_view_ref.current.controls
+            controls.extend(
+                ft.Text(f"> {line}", font_family="Consolas", color=ft.colors.GREEN_400, size=12) for line in lines
             )
-            self.log_view_ref.current.update()
+            # Ring buffer: drop the oldest lines
+            del controls[:-LOG_VIEW_LINES]
+        self.page.update()
 
     def on_reset_stop_click(self, e):
         if self.is_processing:
@@ -289,8 +496,10 @@ class MainWindow(ft.UserControl):
         self.selected_output_dir = None
         self.input_dir_text.value = ""
         self.output_dir_text.value = ""
-        self.files_list.controls.clear()
-        self.file_cards.clear()
+        self._scan_id += 1  # Cancels a running scan
+        self.scanning = False
+        self.queue.clear()
+        self.queue_view.clear()
         if self.log_view_ref.current:
             self.log_view_ref.current.controls.clear()
         self.meta_total_files.value = "Total Files: --"
@@ -318,6 +527,16 @@ class MainWindow(ft.UserControl):
         self.stop_event.clear()
         self._update_reset_stop_btn(True)
         
+        # OCR resolution settings from the drawer
+        self.pipeline.extractor.configure_ocr(
+            start_dpi=self.dpi_dropdown_ref.current.value if self.dpi_dropdown_ref.current else None,
+            max_dpi=self.max_dpi_dropdown_ref.current.value if self.max_dpi_dropdown_ref.current else None,
+            preprocess=self.preprocess_dropdown_ref.current.value if self.preprocess_dropdown_ref.current else None
+        )
+        self.pipeline.post_correction = bool(self.correct_checkbox_ref.current and self.correct_checkbox_ref.current.value)
+        if self.page_workers_dropdown_ref.current:
+            self.pipeline.page_workers = self.page_workers_dropdown_ref.current.value
+        
         self.meta_last_mod.value = "Status: Spawning Workers..."
         self.update()
         
@@ -325,28 +544,46 @@ class MainWindow(ft.UserControl):
         threading.Thread(target=self.run_parallel_pipeline, daemon=True).start()
 
     def run_parallel_pipeline(self):
-        files = list(Path(self.selected_input_dir).glob("*.pdf"))
-        # Use CPU count for workers
-        max_workers = os.cpu_count() or 2
-        self.log(f"Starting pipeline with {max_workers} workers.")
+        files = self.queue.paths()
+        input_dir, output_dir = Path(self.selected_input_dir), Path(self.selected_output_dir)
+        scheduler = BatchScheduler(self.pipeline)
+        self.log(f"Starting pipeline: {scheduler.text_workers} text workers, {scheduler.ocr_capacity} OCR slots.")
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self.process_single_file, f): f for f in files
-            }
-            
-            for future in concurrent.futures.as_completed(futures):
-                if self.stop_event.is_set():
-                    self.log("Processing Aborted.")
-                    break
-                    
-                f = futures[future]
-                try:
-                    success = future.result()
-                    self.log(f"Finished: {f.name} [{'Success' if success else 'Failed'}]")
-                except Exception as exc:
-                    self.log(f"Exception for {f.name}: {exc}")
+        def progress_cb(pdf_path, prog, msg):
+            self.dispatcher.progress(str(pdf_path), prog, msg)
+        
+        def on_file_start(pdf_path):
+            self.queue.set_status(str(pdf_path), ACTIVE)
+            self.log(f"Started: {pdf_path.name}")
+        
+        def on_file_done(pdf_path, success):
+            self.queue.set_status(str(pdf_path), DONE if success else FAILED)
+            self.dispatcher.invalidate()
+            if success:
+                self.dispatcher.progress(str(pdf_path), 1.0, "Completed")
+            elif not self.stop_event.is_set():
+                self.dispatcher.progress(str(pdf_path), 0.0, "Failed")
+            self.log(f"Finished: {pdf_path.name} [{'Success' if success else 'Failed'}]")
+        
+        try:
+            scheduler.run(
+                files,
+                # Subfolders of the input are mirrored in the output
+                lambda pdf_path: str(output_folder(pdf_path, input_dir, output_dir)),
+                progress_callback=progress_cb,
+                on_file_start=on_file_start,
+                on_file_done=on_file_done,
+                should_stop=self.stop_event.is_set
+            )
+        except Exception as exc:
+            self.log(f"Exception in batch: {exc}")
         
+        if self.stop_event.is_set():
+            self.log("Processing Aborted.")
+        memory = self.pipeline.extractor.memory_budget.stats()
+        self.log(f"Memory: peak {memory['peak_bytes'] // MB} MB of {memory['limit_bytes'] // MB} MB, "
+                 f"{memory['waits']} waits, {memory['lowered_dpi']} pages at a lower DPI.")
+        self.dispatcher.flush()
         self.meta_last_mod.value = "Status: " + ("Stopped" if self.stop_event.is_set() else "All Completed")
         self.update()
         
@@ -357,29 +594,3 @@ class MainWindow(ft.UserControl):
         if self.process_btn_ref.current:
             self.process_btn_ref.current.disabled = False
             self.process_btn_ref.current.update()
-
-    def process_single_file(self, pdf_path: Path):
-        # Double check stop logic inside worker if possible, 
-        # but ThreadPool futures are hard to cancel once running.
-        if self.stop_event.is_set():
-            return False
-            
-        card = self.file_cards.get(str(pdf_path))
-        
-        def progress_cb(prog, msg):
-             if card:
-                card.update_progress(prog, msg)
-        
-        self.log(f"Started: {pdf_path.name}")
-        success = self.pipeline.process_file(
-            str(pdf_path),
-            self.selected_output_dir,
-            progress_callback=progress_cb,
-            should_stop=lambda: self.stop_event.is_set()
-        )
-        
-        if card:
-            status = "Completed" if success else "Failed"
-            card.update_progress(1.0 if success else 0.0, status)
-            
-        return success
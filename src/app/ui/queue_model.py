@@ -0,0 +1,132 @@
+"""
+Processing Queue Model - Compact per-file state behind the virtualized queue view.
+
+Every scanned file is one small record; the view only builds cards for the
+rows in its viewport and for the files that are active or just finished.
+Thread-safe: the scanner and pipeline threads write, the UI reads.
+Nothing in here imports Flet.
+"""
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Tuple
+from ..core.scanner import ScannedFile
+
+WAITING = "waiting"
+ACTIVE = "active"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueEntry:
+    __slots__ = ("path", "size", "status", "progress", "message")
+
+    def __init__(self, path: Path, size: int):
+        self.path = path
+        self.size = size
+        self.status = WAITING
+        self.progress = 0.0
+        self.message = "Waiting..."
+
+    @property
+    def key(self) -> str:
+        return str(self.path)
+
+
+class QueueModel:
+    def __init__(self, recent: int = 10):
+        """
+        Args:
+            recent: Finished files kept pinned next to the active ones
+        """
+        self._lock = threading.Lock()
+        self._entries: List[QueueEntry] = []
+        self._index: Dict[str, int] = {}
+        self._active: Dict[str, None] = {}   # Ordered set, in start order
+        self._recent: Deque[str] = deque(maxlen=recent)
+        self._counts = dict.fromkeys((WAITING, ACTIVE, DONE, FAILED), 0)
+        self.total_bytes = 0
+        # Bumped on every change the view shows
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._active.clear()
+            self._recent.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+            self.total_bytes = 0
+            self.version += 1
+
+    def add(self, files: Iterable[ScannedFile]):
+        with self._lock:
+            for f in files:
+                key = str(f.path)
+                if key in self._index:
+                    continue
+                self._index[key] = len(self._entries)
+                self._entries.append(QueueEntry(f.path, f.size))
+                self.total_bytes += f.size
+                self._counts[WAITING] += 1
+            self.version += 1
+
+    def paths(self) -> List[Path]:
+        with self._lock:
+            return [entry.path for entry in self._entries]
+
+    def set_progress(self, key: str, value: float, message: str):
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None:
+                entry.progress, entry.message = value, message
+                self.version += 1
+
+    def set_status(self, key: str, status: str):
+        """Moves the file in or out of the pinned (active / recently finished) set."""
+        with self._lock:
+            entry = self._get(key)
+            if entry is None:
+                return
+            self._counts[entry.status] -= 1
+            self._counts[status] += 1
+            entry.status = status
+            self._active.pop(key, None)
+            if status == ACTIVE:
+                self._active[key] = None
+            elif status in (DONE, FAILED):
+                if key in self._recent:
+                    self._recent.remove(key)
+                self._recent.append(key)
+            self.version += 1
+
+    def pinned(self) -> List[QueueEntry]:
+        """Active files in start order, then the recently finished ones, newest first."""
+        with self._lock:
+            keys = list(self._active) + [k for k in reversed(self._recent) if k not in self._active]
+            return [self._entries[self._index[k]] for k in keys]
+
+    def window(self, start: int, stop: int) -> List[QueueEntry]:
+        with self._lock:
+            return self._entries[start:stop]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def _get(self, key: str):
+        i = self._index.get(key)
+        return None if i is None else self._entries[i]
+
+
+def visible_range(count: int, offset: float, viewport: float, row_height: float,
+                  overscan: int = 5) -> Tuple[int, int]:
+    """Rows [start, stop) that intersect the viewport, plus `overscan` rows either side."""
+    if count <= 0 or row_height <= 0:
+        return 0, 0
+    start = max(0, int(offset // row_height) - overscan)
+    stop = min(count, int((offset + viewport) // row_height) + 1 + overscan)
+    return min(start, stop), stop
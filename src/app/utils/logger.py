@@ -1,6 +1,10 @@
 import logging
+import logging.handlers
 import sys
 from pathlib import Path
+from typing import Optional
+
+DEFAULT_LOG_PATH = Path.home() / ".unitamil" / "unitamil.log"
 
 def setup_logger(name: str = "Unitamil") -> logging.Logger:
     logger = logging.getLogger(name)
@@ -13,9 +17,26 @@ def setup_logger(name: str = "Unitamil") -> logging.Logger:
         console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
         console_handler.setFormatter(console_formatter)
         logger.addHandler(console_handler)
-        
-        # File Handler (Optional, can be added later if needed for debugging)
     
     return logger
 
+def add_file_handler(logger: logging.Logger, path: Path = DEFAULT_LOG_PATH,
+                     max_bytes: int = 5 * 1024 * 1024, backups: int = 3) -> Optional[logging.Handler]:
+    """Keep the full log in a rotating file (the GUI only shows its tail)."""
+    path = Path(path)
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler) and Path(handler.baseFilename) == path.resolve():
+            return handler
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                       encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Cannot write log file {path}: {e}")
+        return None
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(threadName)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    return handler
+
 logger = setup_logger()
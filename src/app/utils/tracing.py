@@ -0,0 +1,174 @@
+"""
+Tracing - Named timing spans for per-page stage totals and Chrome traces.
+
+    with tracing.collect() as stages:       # per-page totals, {stage: ms}
+        with tracing.span("render"):
+            ...
+
+A span adds its duration to the stage totals collected on the current
+thread, and, while a trace is being recorded (enable()), also keeps a
+Chrome/Perfetto "complete" event with process and thread ids. With no
+collection active and no trace recording, span() returns a shared no-op.
+Stages nest (tesseract runs inside ocr), so totals of different stages
+overlap. Timestamps come from perf_counter_ns, a system-wide monotonic
+clock, so events from the shard and OCR worker processes line up.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+class _Local(threading.local):
+    # A class default: getattr() on a missing thread-local attribute raises internally, which is slow
+    stages: Optional[Dict[str, float]] = None
+
+
+_local = _Local()
+_lock = threading.Lock()
+_recording = False
+_events: List[Dict] = []
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "stages", "start")
+
+    def __init__(self, name: str, args: Dict, stages: Optional[Dict[str, float]]):
+        self.name = name
+        self.args = args
+        self.stages = stages
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if self.stages is not None:
+            self.stages[self.name] = self.stages.get(self.name, 0.0) + (end - self.start) / 1e6
+        if _recording:
+            _record(self.name, self.start, end - self.start, os.getpid(), threading.get_ident(), self.args)
+        return False
+
+
+def span(name: str, **args):
+    """Time a block as stage `name`; args end up in the trace event."""
+    stages = _local.stages
+    if stages is None and not _recording:
+        return _NOOP
+    return _Span(name, args, stages)
+
+
+@contextmanager
+def collect(stages: Dict[str, float] = None) -> Iterator[Dict[str, float]]:
+    """
+    Sum the spans of this thread into a {stage: ms} dict. Pass the dict of an
+    earlier collect() to continue a page's totals on another thread.
+    """
+    stages = {} if stages is None else stages
+    previous = _local.stages
+    _local.stages = stages
+    try:
+        yield stages
+    finally:
+        _local.stages = previous
+
+
+def add_stage(name: str, ms: float):
+    """Add a duration measured elsewhere (e.g. reported by a worker) to the current totals."""
+    stages = _local.stages
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + ms
+
+
+def rounded(stages: Dict[str, float]) -> Dict[str, float]:
+    return {name: round(ms, 2) for name, ms in stages.items()}
+
+
+def _record(name: str, start_ns: int, duration_ns: int, pid: int, tid: int, args: Dict = None):
+    event = {"name": name, "ph": "X", "ts": start_ns / 1000, "dur": duration_ns / 1000, "pid": pid, "tid": tid}
+    if args:
+        event["args"] = args
+    with _lock:
+        _events.append(event)
+
+
+def record_complete(name: str, start_ns: int, duration_ns: int, pid: int, tid: int = None, **args):
+    """Add an event timed outside this process (OCR worker), on the perf_counter_ns clock."""
+    if _recording:
+        _record(name, start_ns, duration_ns, pid, pid if tid is None else tid, args)
+
+
+def enable(process_name: str = None):
+    """Start recording trace events (stage totals do not need this)."""
+    global _recording
+    with _lock:
+        _recording = True
+        _events.clear()
+    if process_name:
+        name_process(process_name)
+    name_thread()
+
+
+def disable():
+    global _recording
+    _recording = False
+
+
+def is_enabled() -> bool:
+    return _recording
+
+
+def name_thread(name: str = None):
+    """Label the current thread (and process) in the trace."""
+    if not _recording:
+        return
+    pid, tid = os.getpid(), threading.get_ident()
+    with _lock:
+        _events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                        "args": {"name": name or threading.current_thread().name}})
+
+
+def name_process(name: str, pid: int = None):
+    """Label a process (this one by default) in the trace."""
+    if _recording:
+        with _lock:
+            _events.append({"name": "process_name", "ph": "M", "pid": pid or os.getpid(), "args": {"name": name}})
+
+
+def drain() -> List[Dict]:
+    """Take the events recorded so far (shard processes send them to the parent)."""
+    with _lock:
+        events = list(_events)
+        _events.clear()
+    return events
+
+
+def extend(events: List[Dict]):
+    if _recording and events:
+        with _lock:
+            _events.extend(events)
+
+
+def write_chrome_trace(path: str):
+    """Write the recorded events as Chrome trace JSON (chrome://tracing, ui.perfetto.dev)."""
+    with _lock:
+        events = list(_events)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
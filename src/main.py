@@ -1,8 +1,10 @@
-import flet as ft
-from app.ui.dependency_screen import DependencyScreen
-from app.ui.main_window import MainWindow
+def main(page):
+    # Flet is only needed for the GUI: OCR workers and --batch runs never import it
+    import flet as ft
+    from app.ui.dependency_screen import DependencyScreen
+    from app.ui.main_window import MainWindow
+    from app.core.pipeline import ProcessingPipeline
 
-def main(page: ft.Page):
     page.title = "UniTamil - PDF to Markdown Converter"
     page.window.width = 800
     page.window.height = 700
@@ -21,7 +23,9 @@ def main(page: ft.Page):
         page.clean()
         page.padding = 0
         page.spacing = 0
-        page.add(ft.Container(content=MainWindow(page), expand=True))
+        # Reuse the Tesseract the check found instead of looking it up again
+        pipeline = ProcessingPipeline(dep_screen.checker.tesseract_path)
+        page.add(ft.Container(content=MainWindow(page, pipeline), expand=True))
         page.update()
 
     # Initial Screen: Dependency Check
@@ -31,14 +35,21 @@ def main(page: ft.Page):
 
 if __name__ == "__main__":
     import sys
-    import multiprocessing
-    
-    # Check for worker flag
+
+    # Check for worker flag first: OCR workers import nothing but the worker module
     if len(sys.argv) > 1 and sys.argv[1] == "--ocr-worker":
         # We are in the subprocess! Run OCR worker logic.
         from app.core import ocr_worker
         ocr_worker.main()
         sys.exit(0)
 
+    import multiprocessing
     multiprocessing.freeze_support()
+
+    # Headless batch mode
+    if "--batch" in sys.argv[1:]:
+        from app import cli
+        sys.exit(cli.main(sys.argv[1:]))
+
+    import flet as ft
     ft.app(target=main)
@@ -12,3 +12,9 @@ def sample_pdf_path(tmp_path):
     p = tmp_path / "test.pdf"
     p.write_bytes(b"%PDF-1.4...")
     return str(p)
+
+@pytest.fixture(autouse=True)
+def isolated_ocr_cache(tmp_path, monkeypatch):
+    # Default pipelines and the CLI open the OCR cache in ~/.unitamil: keep tests out of it
+    from app.core import ocr_cache
+    monkeypatch.setattr(ocr_cache, "DEFAULT_CACHE_PATH", tmp_path / "ocr_cache.sqlite")
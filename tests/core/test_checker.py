@@ -15,3 +15,37 @@ def test_tesseract_not_found(mock_which):
     with patch("pathlib.Path.exists", return_value=False):
         checker = DependencyChecker()
         assert checker.check_tesseract() is False
+
+
+def test_probe_is_cached_until_tessdata_changes(tmp_path, monkeypatch):
+    tessdata = tmp_path / "tessdata"
+    tessdata.mkdir()
+    (tessdata / "eng.traineddata").write_bytes(b"")
+    calls = tmp_path / "calls"
+    tesseract = tmp_path / "tesseract"
+    tesseract.write_text(
+        "#!/bin/sh\n"
+        f'echo "$1" >> "{calls}"\n'
+        'if [ "$1" = "--version" ]; then printf "tesseract 5.3.0\\n Found AVX2\\n Found OpenMP 201511\\n"; exit 0; fi\n'
+        f'echo \'List of available languages in "{tessdata}/" (2):\'\n'
+        f'for f in "{tessdata}"/*.traineddata; do basename "$f" .traineddata; done\n'
+    )
+    tesseract.chmod(0o755)
+    monkeypatch.setenv("UNITAMIL_TESSERACT_CMD", str(tesseract))
+    cache = tmp_path / "dependencies.json"
+
+    status = DependencyChecker(cache_path=cache).get_status()
+    assert status["tesseract_version"] == "5.3.0"
+    assert status["capabilities"]["simd"] == ["AVX2"] and status["capabilities"]["openmp"]
+    assert status["languages"] == {"eng": True, "tam": False}
+    probes = len(calls.read_text().splitlines())
+
+    # Warm start: no subprocess
+    assert DependencyChecker(cache_path=cache).get_status() == status
+    assert len(calls.read_text().splitlines()) == probes
+
+    # A new language pack invalidates the cache
+    (tessdata / "tam.traineddata").write_bytes(b"")
+    status = DependencyChecker(cache_path=cache).get_status()
+    assert status["ready"] is True
+    assert len(calls.read_text().splitlines()) == 2 * probes
@@ -0,0 +1,90 @@
+import fitz
+from app.core.pipeline import ProcessingPipeline
+
+def make_pdf(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page number {i + 1} with a text layer long enough to be used.")
+    doc.save(str(path))
+    return path
+
+def interrupted_run(pipeline, pdf, out, pages):
+    writer = pipeline.open_document(str(pdf), str(out))
+    for page_data in pipeline.extractor.process_pdf(str(pdf), pages=range(pages)):
+        writer.add_page(page_data)
+    writer.abort()
+
+def spy_text_pass(pipeline):
+    seen = []
+    text_pass = pipeline.extractor.text_pass
+    def spy(page, fonts=None):
+        seen.append(page.number + 1)
+        return text_pass(page, fonts)
+    pipeline.extractor.text_pass = spy
+    return seen
+
+def test_resume_skips_finished_pages_before_extraction(tmp_path):
+    pdf = make_pdf(tmp_path / "book.pdf", 4)
+    out = tmp_path / "out"
+    pipeline = ProcessingPipeline()
+    pipeline.extractor.ocr_cache = None
+    interrupted_run(pipeline, pdf, out, 2)
+    assert (out / "book" / "extracted.md.tmp").exists()
+
+    seen = spy_text_pass(pipeline)
+    assert pipeline.process_file(str(pdf), str(out)) is True
+    assert seen == [3, 4]
+    combined = (out / "book" / "extracted.md").read_text(encoding="utf-8")
+    assert [line for line in combined.splitlines() if line.startswith("# Page")] == [f"# Page {i}" for i in range(1, 5)]
+    assert combined.count("with a text layer") == 4
+
+    # A finished document resumes completely
+    assert pipeline.process_file(str(pdf), str(out)) is True
+    assert seen == [3, 4]
+    assert (out / "book" / "extracted.md").read_text(encoding="utf-8") == combined
+
+def test_changed_settings_start_over(tmp_path):
+    pdf = make_pdf(tmp_path / "book.pdf", 3)
+    out = tmp_path / "out"
+    pipeline = ProcessingPipeline()
+    pipeline.extractor.ocr_cache = None
+    interrupted_run(pipeline, pdf, out, 2)
+    pipeline.extractor.configure_ocr(max_dpi=600)
+    seen = spy_text_pass(pipeline)
+    assert pipeline.process_file(str(pdf), str(out)) is True
+    assert seen == [1, 2, 3]
+
+def test_checkpoint_beyond_truncated_output_is_redone(tmp_path):
+    pdf = make_pdf(tmp_path / "book.pdf", 3)
+    out = tmp_path / "out"
+    pipeline = ProcessingPipeline()
+    pipeline.extractor.ocr_cache = None
+    interrupted_run(pipeline, pdf, out, 2)
+    tmp = out / "book" / "extracted.md.tmp"
+    tmp.write_bytes(tmp.read_bytes()[:-5])  # Page 2 did not reach the disk
+    seen = spy_text_pass(pipeline)
+    assert pipeline.process_file(str(pdf), str(out)) is True
+    assert seen == [2, 3]
+
+def test_pages_changed_on_disk_are_redone(tmp_path):
+    pdf = make_pdf(tmp_path / "book.pdf", 4)
+    pipeline = ProcessingPipeline()
+    pipeline.extractor.ocr_cache = None
+    seen = spy_text_pass(pipeline)
+
+    interrupted_run(pipeline, pdf, tmp_path / "edited", 3)
+    page_3 = tmp_path / "edited" / "book" / "pages" / "page_3.md"
+    page_3.write_text(page_3.read_text(encoding="utf-8").replace("Page number", "Page numbr"), encoding="utf-8")
+    seen.clear()
+    assert pipeline.process_file(str(pdf), str(tmp_path / "edited")) is True
+    assert seen == [3, 4]
+    assert "numbr" not in page_3.read_text(encoding="utf-8")
+
+    # Same size, different bytes: a torn write inside page 2's part of extracted.md
+    interrupted_run(pipeline, pdf, tmp_path / "torn", 3)
+    tmp = tmp_path / "torn" / "book" / "extracted.md.tmp"
+    tmp.write_bytes(tmp.read_bytes().replace(b"Page number 2", b"Page number X"))
+    seen.clear()
+    assert pipeline.process_file(str(pdf), str(tmp_path / "torn")) is True
+    assert seen == [2, 3, 4]
+    assert "number X" not in (tmp_path / "torn" / "book" / "extracted.md").read_text(encoding="utf-8")
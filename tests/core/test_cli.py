@@ -0,0 +1,49 @@
+import io
+import json
+import sys
+import fitz
+import pytest
+from app import cli
+
+def make_pdf(path, text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+
+def run(argv):
+    out = io.StringIO()
+    code = cli.main(argv, out=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_batch_writes_json_progress_and_mirrors_folders(tmp_path):
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    make_pdf(src / "a.pdf", "A text layer page with more than fifty characters on it.")
+    make_pdf(src / "sub" / "b.PDF", "Another text layer page with more than fifty characters.")
+    code, events = run(["--batch", str(src), str(tmp_path / "out"), "--recursive", "--workers", "1"])
+    assert code == cli.EXIT_OK
+    start = next(e for e in events if e["event"] == "batch_start")
+    assert start["files"] == 2
+    assert sorted(e["file"] for e in events if e["event"] == "file_done") == ["a.pdf", "sub/b.PDF"]
+    assert events[-1]["event"] == "batch_done" and events[-1]["failed"] == []
+    assert (tmp_path / "out" / "a" / "extracted.md").exists()
+    assert (tmp_path / "out" / "sub" / "b" / "extracted.md").exists()
+    assert "flet" not in sys.modules
+
+def test_batch_failure_exit_codes(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "broken.pdf").write_bytes(b"not a pdf")
+    code, events = run(["--batch", str(src), str(tmp_path / "out")])
+    assert code == cli.EXIT_FAILED
+    assert events[-1]["failed"] == ["broken.pdf"]
+    code, events = run(["--batch", str(tmp_path / "missing"), str(tmp_path / "out")])
+    assert code == cli.EXIT_USAGE and events[0]["event"] == "error"
+
+@pytest.mark.parametrize("flag, value", [("--dpi", "0"), ("--dpi", "-5"), ("--max-dpi", "50"), ("--workers", "0"),
+                                         ("--memory-budget", "0"), ("--memory-budget", "-64"),
+                                         ("--memory-budget", "nan"), ("--memory-budget", "inf")])
+def test_out_of_range_numbers_are_usage_errors(tmp_path, flag, value):
+    with pytest.raises(SystemExit) as exc:
+        run(["--batch", str(tmp_path), str(tmp_path / "out"), flag, value])
+    assert exc.value.code == cli.EXIT_USAGE
@@ -0,0 +1,29 @@
+import pytest
+from app.core.converter import LegacyConverter
+
+UNICODE_TEXT = "தமிழ் கொழும்பு வணக்கம் யாழ்ப்பாணம் பௌத்தம் சொல்லோவியம் தேர்தல் பூமி ஷோபா கைகள்"
+
+GOLDEN = {
+    "bamini": "jkpo; nfhOk;G tzf;fk; aho;g;ghzk; ngsj;jk; nrhy;Nyhtpak; Nju;jy; G+kp N\\hgh iffs;",
+    "tscii": "¾Á¢ú ¦¸¡ØõÒ Å½ì¸õ Â¡úôÀ¡½õ ¦Àªò¾õ ¦º¡ø§Ä¡Å¢Âõ §¾÷¾ø âÁ¢ §„¡À¡ ¨¸¸û",
+    "tab": "îñ¤ö¢ ªè£¿ñ¢¹ õíè¢èñ¢ ò£ö¢ð¢ð£íñ¢ ªð÷î¢îñ¢ ªê£ô¢«ô£õ¤òñ¢ «îó¢îô¢ Ìñ¤ «û£ð£ ¬èè÷¢",
+    "tam": "îI› ªè£¿‹¹ õí‚è‹ ò£›Šð£í‹ ªð÷ˆî‹ ªê£™«ô£Mò‹ «î˜î™ ÌI «û£ð£ ¬èèœ",
+    "vanavil": "jäœ bfhG«ò tz¡f« ahœ¥ghz« bgs¤j« brhšnyhéa« nj®jš óä nõhgh iffŸ",
+}
+
+@pytest.mark.parametrize("encoding", sorted(GOLDEN))
+def test_golden_conversion(encoding):
+    converter = LegacyConverter()
+    assert converter.convert(GOLDEN[encoding], encoding) == UNICODE_TEXT
+    assert converter.detect_encoding(GOLDEN[encoding]) == encoding
+    assert converter.convert(GOLDEN[encoding]) == UNICODE_TEXT
+
+def test_unlisted_prefix_sign_is_reordered():
+    # TSCII ெ + க்ஷ + ா has no table entry of its own
+    assert LegacyConverter().convert("¦‡¡", "tscii") == "க்ஷொ"
+
+def test_unicode_and_english_pass_through():
+    converter = LegacyConverter()
+    for text in (UNICODE_TEXT, "The quick; brown fox, 1990.", ""):
+        assert converter.detect_encoding(text) == "unicode"
+        assert converter.convert(text) == text
@@ -0,0 +1,26 @@
+from app.core.corrector import PostCorrector
+from app.core.lexicon import Lexicon, compile_lexicon
+
+WORDS = ["தமிழ்", "மக்கள்", "புத்தகம்", "பள்ளிக்கூடம்", "கடல்", "கடன்"]
+
+
+def make_lexicon(tmp_path):
+    return Lexicon(compile_lexicon(WORDS + ["தமிழ்"], tmp_path / "words.bin"))
+
+
+def test_lexicon_lookup(tmp_path):
+    lexicon = make_lexicon(tmp_path)
+    assert len(lexicon) == len(WORDS)
+    assert all(word in lexicon for word in WORDS)
+    assert "தமிள்" not in lexicon
+    assert "" not in lexicon and "zzz" not in lexicon
+    lexicon.close()
+
+
+def test_corrects_confusions_and_counts(tmp_path):
+    corrector = PostCorrector(make_lexicon(tmp_path))
+    text, count = corrector.correct("தமிள் மக்கள் பள்ளிக்கூடம abc")
+    assert text == "தமிழ் மக்கள் பள்ளிக்கூடம் abc"
+    assert count == 2
+    # Unknown words with no candidate, or several (கடல் / கடன்), are kept
+    assert corrector.correct("கொழும்பு கடள்") == ("கொழும்பு கடள்", 0)
@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock
+import fitz
+from app.core.extractor import PDFExtractor
+from app.core.ocr_worker import OCRResponse
+from app.core.regions import _merge_overlapping
+
+def fake_pix(dpi):
+    pix = MagicMock()
+    pix.xres = dpi
+    return pix
+
+def test_low_confidence_escalates_dpi():
+    extractor = PDFExtractor(use_ocr_cache=False)
+    extractor.configure_ocr(start_dpi=96, max_dpi=300, min_confidence=80)
+    confidences = {96: 40.0, 150: 60.0, 200: 90.0}
+    extractor._run_ocr_subprocess = lambda pix, should_stop=None: OCRResponse(
+        1, 0, f"text@{pix.xres}", 1, 1, confidences[pix.xres]
+    )
+    rendered = []
+    def rerender(dpi):
+        rendered.append(dpi)
+        return fake_pix(dpi)
+
+    result = extractor.ocr_pass(1, fake_pix(96), rerender=rerender)
+    assert rendered == [150, 200]
+    assert result["dpi"] == 200 and result["text"] == "text@200"
+
+def test_confident_page_is_not_rendered_again():
+    extractor = PDFExtractor(use_ocr_cache=False)
+    extractor.configure_ocr(start_dpi=150, max_dpi=600)
+    extractor._run_ocr_subprocess = lambda pix, should_stop=None: OCRResponse(1, 0, "ok", 1, 1, 95.0)
+    rerender = MagicMock()
+    result = extractor.ocr_pass(1, fake_pix(150), rerender=rerender)
+    rerender.assert_not_called()
+    assert result["dpi"] == 150
+
+def test_dpi_ladder_respects_cap():
+    extractor = PDFExtractor(use_ocr_cache=False)
+    extractor.configure_ocr(start_dpi=300, max_dpi=150)
+    assert extractor.dpi_ladder() == [300]
+
+def make_mixed_pdf(path):
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    page.insert_text((50, 80), "Heading above the clipping " * 2, fontsize=11)
+    clipping = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 200, 100), False)
+    clipping.set_rect(clipping.irect, (200,))
+    page.insert_image(fitz.Rect(50, 120, 350, 270), pixmap=clipping)
+    page.insert_text((50, 320), "Paragraph below the clipping " * 2, fontsize=11)
+    # A logo too small to OCR
+    page.insert_image(fitz.Rect(500, 20, 520, 40), pixmap=clipping)
+    doc.save(str(path))
+    return str(path)
+
+def test_mixed_page_ocrs_only_its_image_region(tmp_path):
+    extractor = PDFExtractor(use_ocr_cache=False)
+    rendered = []
+    def fake_ocr(pix, should_stop=None):
+        rendered.append((pix.width, pix.height))
+        return OCRResponse(1, 0, "clipping text\n", 1, 1, 90.0)
+    extractor._run_ocr_subprocess = fake_ocr
+
+    page = next(extractor.process_pdf(make_mixed_pdf(tmp_path / "mixed.pdf")))
+    assert page["method"] == "mixed" and page["ocr_regions"] == 1
+    text = page["text"]
+    assert text.index("Heading") < text.index("clipping text") < text.index("Paragraph")
+    # One 300x150 pt region at 150 DPI, not the 595x842 pt page
+    assert len(rendered) == 1 and abs(rendered[0][0] - 625) <= 1 and abs(rendered[0][1] - 313) <= 1
+
+    extractor.configure_ocr(region_ocr=False)
+    page = next(extractor.process_pdf(str(tmp_path / "mixed.pdf")))
+    assert page["method"] == "text_extraction" and "clipping text" not in page["text"]
+
+def test_overlapping_regions_merge_through_chains():
+    # b joins a, and the grown rect then reaches c, which was kept apart until then
+    a, c, b = fitz.Rect(0, 0, 10, 10), fitz.Rect(20, 0, 30, 10), fitz.Rect(8, 5, 22, 15)
+    assert _merge_overlapping([a, c, b]) == [fitz.Rect(0, 0, 30, 15)]
+    apart = fitz.Rect(0, 100, 10, 110)
+    assert _merge_overlapping([apart, a]) == [a, apart]
@@ -0,0 +1,56 @@
+import fitz
+from app.core.extractor import PDFExtractor
+from app.core.font_index import BROKEN, FontIndex, classify_font_name, font_basename
+from app.core.text_classifier import LEGACY, TEXT, TextLayerClassifier
+
+BAMINI_LINE = "jkpo; nfhOk;G tzf;fk; aho;g;ghzk; ngsj;jk; nrhy;Nyhtpak;"
+TAMIL_LINE = "தமிழ் கொழும்பு வணக்கம் யாழ்ப்பாணம் பௌத்தம் சொல்லோவியம்"
+
+def test_font_names():
+    assert font_basename("ABCDEF+Bamini") == "Bamini"
+    assert font_basename("Helvetica") == "Helvetica"
+    assert classify_font_name("SunTommyy") == "bamini"
+    assert classify_font_name("TSC_Avarangal") == "tscii"
+    assert classify_font_name("TSCu_Paranar") == "unicode"
+    assert classify_font_name("TAB-Anna") == "tab"
+    assert classify_font_name("Helvetica") is None
+
+def legacy_doc():
+    doc = fitz.open()
+    for _ in range(2):
+        page = doc.new_page()
+        page.insert_text((72, 72), BAMINI_LINE, fontname="helv")
+        page.insert_text((72, 100), "Chapter one, a heading in English set in a Latin font", fontname="Times-Roman")
+    return doc
+
+def test_legacy_font_learned_once_and_converted_per_span():
+    doc = legacy_doc()
+    classifier = TextLayerClassifier()
+    index = FontIndex(doc, classifier=classifier)
+    for page in doc:
+        layer = index.decode(page, classifier.classify(page))
+        assert layer.kind == LEGACY
+        assert layer.encodings == ("bamini",)
+        assert layer.text == TAMIL_LINE + "\nChapter one, a heading in English set in a Latin font\n"
+    assert sorted(info.font_class for info in index.fonts.values()) == ["bamini", "unicode"]
+
+def test_extractor_marks_decoded_pages_as_unicode(tmp_path):
+    path = tmp_path / "legacy.pdf"
+    legacy_doc().save(str(path))
+    pages = list(PDFExtractor(use_ocr_cache=False).process_pdf(str(path)))
+    assert [p["text_layer"] for p in pages] == [LEGACY, LEGACY]
+    assert pages[0]["encoding"] == "unicode"
+    assert pages[0]["legacy_encodings"] == ["bamini"]
+    assert pages[0]["text"].startswith(TAMIL_LINE)
+
+def test_glyph_id_font_without_tounicode_is_broken():
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_font(fontname="F0", fontbuffer=fitz.Font("cjk").buffer)
+    page.insert_text((72, 72), "Hello", fontname="F0")
+    font_xref = next(f[0] for f in page.get_fonts() if f[4] == "F0")
+    doc.xref_set_key(font_xref, "ToUnicode", "null")
+    index = FontIndex(doc)
+    assert [info.font_class for info in index.page_fonts(page).values()] == [BROKEN]
+    page.insert_text((72, 100), "x" * 60, fontname="helv")
+    assert index.decode(page, TextLayerClassifier().classify(page)).kind == TEXT
@@ -0,0 +1,64 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+import fitz
+from app.core.extractor import MIN_OCR_DPI, PDFExtractor, render_size
+from app.core.memory_budget import MemoryBudget
+from app.core.pipeline import ProcessingPipeline
+from app.core.scheduler import BatchScheduler
+
+def test_renders_wait_for_memory_to_be_released():
+    budget = MemoryBudget(limit=100)
+    budget.acquire(80)
+    admitted = threading.Event()
+    waiter = threading.Thread(target=lambda: (budget.acquire(50), admitted.set()))
+    waiter.start()
+    time.sleep(0.05)
+    assert not admitted.is_set() and budget.stats()["queued_bytes"] == 50
+    budget.acquire(30, wait=False)  # Work under way is charged at once
+    budget.release(80)
+    budget.release(30)
+    waiter.join(timeout=2)
+    stats = budget.stats()
+    assert admitted.is_set() and stats["used_bytes"] == 50
+    assert stats["peak_bytes"] == 110 and stats["peak_queued_bytes"] == 50 and stats["waits"] == 1
+
+def test_oversize_page_is_rendered_at_a_lower_dpi_and_released_when_freed():
+    budget = MemoryBudget(limit=256 * 2**20)
+    extractor = PDFExtractor(use_ocr_cache=False, memory_budget=budget)
+    page = fitz.open().new_page(width=2384, height=3370)  # A0
+    assert render_size(page, 300) == (9934, 14042)
+    pix = extractor.render_page(page, 300)
+    assert MIN_OCR_DPI < pix.xres < 300 and budget.lowered_dpi == 1
+    assert extractor.page_bytes(pix.width * pix.height) <= budget.limit
+    assert budget.used == extractor.page_bytes(pix.width * pix.height)
+    del pix
+    assert budget.used == 0
+    # A retry never waits: it renders at what the memory free now allows
+    budget.acquire(128 * 2**20)
+    retry = extractor.retry_render(page, 300)
+    assert MIN_OCR_DPI < retry.xres < 200 and budget.used <= budget.limit
+    assert budget.lowered_dpi == 1  # A capped retry is not a lowered page
+
+def test_document_metadata_has_only_its_own_memory_figures(tmp_path):
+    big, small = tmp_path / "big.pdf", tmp_path / "small.pdf"
+    doc = fitz.open()
+    doc.new_page(width=2384, height=3370)  # A0, blank: OCR'd, too big for the budget at 300 DPI
+    doc.save(big)
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "A text layer page with more than fifty characters on it.")
+    doc.save(small)
+
+    pipeline = ProcessingPipeline()
+    pipeline.extractor.memory_budget = MemoryBudget(limit=256 * 2**20)
+    pipeline.extractor._ocr_pool = MagicMock(size=1)
+    pipeline.extractor.ocr_pass = lambda page_num, pix, *args: {"text": "ocr text", "method": "ocr"}
+    pipeline.extractor.configure_ocr(start_dpi=300)
+    for pdf in (big, small):
+        assert BatchScheduler(pipeline).run([pdf], str(tmp_path / "out")) == {pdf: True}
+
+    memory = {pdf.stem: json.loads((tmp_path / "out" / pdf.stem / "metadata.json").read_text(encoding="utf-8"))["memory"]
+              for pdf in (big, small)}
+    assert memory["big"]["lowered_dpi"] == 1 and memory["big"]["peak_bytes"] > 0
+    assert memory["small"]["lowered_dpi"] == 0 and memory["small"]["peak_bytes"] == 0
@@ -15,3 +15,22 @@ def test_normalizer_nfc():
     composed = "\u00C9" 
     decomposed = "\u0045\u0301"
     assert norm.normalize(decomposed) == composed
+
+def test_tamil_repairs():
+    norm = Normalizer()
+    # Split vowel sign: ka + e + aa -> ko
+    assert norm.normalize("\u0B95\u0BC6\u0BBE") == "\u0B95\u0BCA"
+    # Doubled pulli
+    assert norm.normalize("\u0B95\u0BCD\u0BCD") == "\u0B95\u0BCD"
+    # ZWJ / ZWNJ noise next to Tamil letters
+    assert norm.normalize("\u0B95\u200D\u0BB7\u200C") == "\u0B95\u0BB7"
+    # Prefix sign typed before its consonant: e + ka + aa -> ko
+    assert norm.normalize(" \u0BC6\u0B95\u0BBE") == " \u0B95\u0BCA"
+    # ZWJ outside Tamil is kept
+    assert norm.normalize("a\u200Db") == "a\u200Db"
+
+def test_clean_text_is_returned_as_is():
+    norm = Normalizer()
+    text = "தமிழ் கொழும்பு பௌத்தம் சொல்லோவியம் \u00C9"
+    assert norm.normalize(text) is text
+    assert norm.normalize(text + "\u0045\u0301") == text + "\u00C9"
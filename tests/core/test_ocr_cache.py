@@ -0,0 +1,31 @@
+import fitz
+from app.core.extractor import page_fingerprint
+from app.core.ocr_cache import OCRCache, cache_key
+
+def test_cache_hit_and_miss(tmp_path):
+    cache = OCRCache(tmp_path / "cache.sqlite")
+    key = cache_key("digest", "tam+eng", "150-300@70", "tesseract-5")
+    assert cache.get(key) is None
+    cache.put(key, "தமிழ்", 300)
+    assert cache.get(key) == ("தமிழ்", 300)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get(cache_key("digest", "tam+eng", "300-300@70", "tesseract-5")) is None
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = OCRCache(tmp_path / "cache.sqlite", max_bytes=400)
+    keys = [cache_key(str(i), "eng", "300-300@70", "v") for i in range(3)]
+    cache.put(keys[0], "a" * 100)
+    cache.put(keys[1], "b" * 100)
+    cache.get(keys[0])  # keys[1] is now the oldest
+    cache.put(keys[2], "c" * 100)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+def test_page_fingerprint_ignores_file_identity(tmp_path):
+    for name in ("a.pdf", "b.pdf"):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "same page")
+        doc.save(tmp_path / name)
+    a, b = fitz.open(tmp_path / "a.pdf"), fitz.open(tmp_path / "b.pdf")
+    assert page_fingerprint(a[0]) == page_fingerprint(b[0])
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+import pytest
+from app.core import ocr_worker as w
+from app.core.extractor import PDFExtractor
+from app.core.ocr_engine import (ENGINES, LibTesseractEngine, OCREngine, PytesseractEngine, create_engine,
+                                 parse_tsv, words_to_text)
+
+
+def test_parse_tsv_matches_image_to_data_columns():
+    tsv = ("level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+           "1\t1\t0\t0\t0\t0\t0\t0\t100\t50\t-1\t\n"
+           "5\t1\t1\t1\t1\t1\t10\t10\t40\t20\t91.5\tதமிழ்\n"
+           "5\t1\t1\t1\t2\t1\t10\t40\t40\t20\t88.5\ttext\n")
+    data = parse_tsv(tsv)
+    assert data["text"] == ["", "தமிழ்", "text"]
+    assert data["conf"] == [-1.0, 91.5, 88.5]
+    assert words_to_text(data) == ("தமிழ்\ntext\n", 90.0)
+
+
+def test_stub_engine_through_worker_is_deterministic():
+    payload = bytes(range(6))
+    request = w.OCRRequest(1, w.FORMAT_RAW_GRAY, 3, 2, 300, "tam", payload, "stub")
+    first, second = w.handle_request(request), w.handle_request(request._replace(request_id=2))
+    assert first.status == w.STATUS_OK and first.confidence == 90.0
+    assert first.text == second.text and "3x2" in first.text
+    assert w.handle_request(request._replace(payload=bytes(6))).text != first.text
+
+
+def test_engine_errors_are_typed(monkeypatch):
+    monkeypatch.setenv("UNITAMIL_LIBTESSERACT", "/nonexistent/libtesseract.so")
+    monkeypatch.setattr(w, "_engines", {})
+    request = w.OCRRequest(1, w.FORMAT_RAW_GRAY, 1, 1, 300, "tam", b"\x00", "libtesseract")
+    assert w.handle_request(request).status == w.STATUS_ENGINE_ERROR
+    assert w.handle_request(request._replace(engine="nope")).status == w.STATUS_ENGINE_ERROR
+    with pytest.raises(ValueError):
+        create_engine("nope")
+    assert set(ENGINES) == {"pytesseract", "libtesseract", "stub"}
+
+
+def test_engine_without_recognize_fails_when_created():
+    class Incomplete(OCREngine):
+        name = "incomplete"
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_cache_key_uses_the_engines_own_version(monkeypatch):
+    fake_lib = SimpleNamespace(TessVersion=lambda: b"5.3.4")
+    monkeypatch.setattr(LibTesseractEngine, "_load", staticmethod(lambda tesseract_cmd=None, library=None: fake_lib))
+    monkeypatch.setattr(PytesseractEngine, "installed_version", classmethod(lambda cls, tesseract_cmd=None: "4.1.1"))
+    extractor = PDFExtractor(use_ocr_cache=False)
+    extractor.configure_ocr(engine="libtesseract")
+    assert extractor.engine_version == "libtesseract-5.3.4"
+    extractor.configure_ocr(engine="pytesseract")
+    assert extractor.engine_version == "tesseract-4.1.1"
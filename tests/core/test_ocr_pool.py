@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+import time
+import pytest
+from app.core.ocr_pool import OCRWorkerPool
+from app.core.ocr_worker import OCREngineError, WorkerCrashedError
+
+# Minimal worker speaking the pool protocol: echoes the payload back as text,
+# crashes on "crash" (after a line on stderr), hangs on "hang" and reports an engine error on "fail".
+FAKE_WORKER = r'''
+import sys, time
+sys.path.insert(0, sys.argv[1])
+from app.core import ocr_worker as w
+while True:
+    req = w.read_request(sys.stdin.buffer)
+    if req is None:
+        break
+    if req.payload == b"crash":
+        sys.exit("Traceback: worker blew up")
+    if req.payload == b"hang":
+        time.sleep(60)
+    status = w.STATUS_ENGINE_ERROR if req.payload == b"fail" else w.STATUS_OK
+    w.write_response(sys.stdout.buffer, w.OCRResponse(req.request_id, status, req.payload.decode(), 1, 2))
+'''
+
+def make_pool(size=1):
+    return OCRWorkerPool(size=size, cmd=[sys.executable, "-c", FAKE_WORKER, os.path.abspath("src")])
+
+def test_pool_reuses_worker():
+    pool = make_pool()
+    try:
+        assert pool.run(b"one").text == "one"
+        pid = pool._idle.queue[0].process.pid
+        assert pool.run(b"two").text == "two"
+        assert pool._idle.queue[0].process.pid == pid
+    finally:
+        pool.close()
+
+def test_pool_restarts_crashed_worker():
+    pool = make_pool()
+    try:
+        with pytest.raises(WorkerCrashedError, match="worker blew up"):
+            pool.run(b"crash")
+        assert pool.run(b"after").text == "after"
+    finally:
+        pool.close()
+
+def test_pool_raises_typed_errors():
+    pool = make_pool()
+    try:
+        with pytest.raises(OCREngineError):
+            pool.run(b"fail")
+    finally:
+        pool.close()
+
+def test_pool_kills_on_stop():
+    pool = make_pool()
+    try:
+        deadline = time.monotonic() + 0.3
+        start = time.monotonic()
+        assert pool.run(b"hang", should_stop=lambda: time.monotonic() > deadline) is None
+        assert time.monotonic() - start < 5
+        assert pool.run(b"next").text == "next"
+    finally:
+        pool.close()
+
+def test_stop_while_waiting_for_a_busy_worker():
+    pool = make_pool()
+    stop = threading.Event()
+    try:
+        busy = threading.Thread(target=pool.run, args=(b"hang",), kwargs={"should_stop": stop.is_set})
+        busy.start()
+        time.sleep(0.3)  # The only worker is now hanging
+        deadline = time.monotonic() + 0.3
+        start = time.monotonic()
+        assert pool.run(b"queued", should_stop=lambda: time.monotonic() > deadline) is None
+        assert time.monotonic() - start < 2
+    finally:
+        stop.set()
+        busy.join(timeout=5)
+        pool.close()
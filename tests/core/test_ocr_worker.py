@@ -0,0 +1,48 @@
+import io
+from app.core import ocr_worker as w
+
+def test_request_roundtrip():
+    buf = io.BytesIO()
+    req = w.OCRRequest(7, w.FORMAT_PNG, 10, 20, 300, "tam+eng", b"\x00\x01payload", "stub")
+    w.write_request(buf, req)
+    buf.seek(0)
+    assert w.read_request(buf) == req
+    assert w.read_request(buf) is None
+
+def test_response_roundtrip_utf8():
+    buf = io.BytesIO()
+    resp = w.OCRResponse(7, w.STATUS_OK, "தமிழ் text", 12, 15)
+    w.write_response(buf, resp)
+    buf.seek(0)
+    assert w.read_response(buf) == resp
+
+def test_bad_image_is_typed_error():
+    req = w.OCRRequest(1, w.FORMAT_PNG, 0, 0, 300, "eng", b"not a png")
+    resp = w.handle_request(req)
+    assert resp.status == w.STATUS_BAD_IMAGE
+    assert isinstance(w.error_for_status(resp.status, resp.text), w.ImageDecodeError)
+
+def test_raw_gray_wraps_payload():
+    payload = bytes(range(6))
+    buf = io.BytesIO()
+    w.write_request(buf, w.OCRRequest(2, w.FORMAT_RAW_GRAY, 3, 2, 300, "eng", memoryview(payload)))
+    buf.seek(0)
+    image = w.decode_image(w.read_request(buf))
+    assert image.size == (3, 2) and image.mode == "L"
+    assert image.getpixel((2, 1)) == 5
+
+def test_raw_size_mismatch_is_typed_error():
+    req = w.OCRRequest(3, w.FORMAT_RAW_GRAY, 10, 10, 300, "eng", b"\x00" * 5)
+    assert w.handle_request(req).status == w.STATUS_BAD_IMAGE
+
+def test_words_to_text_rebuilds_lines_and_confidence():
+    data = {
+        "text": ["", "தமிழ்", "text", "next", "", "para"],
+        "conf": [-1, 90, 70, 80, -1, 60],
+        "block_num": [1, 1, 1, 1, 1, 1],
+        "par_num": [1, 1, 1, 1, 2, 2],
+        "line_num": [1, 1, 1, 2, 1, 1],
+    }
+    text, conf = w.words_to_text(data)
+    assert text == "தமிழ் text\nnext\n\npara\n"
+    assert conf == 75.0
@@ -1,5 +1,7 @@
+import json
 from unittest.mock import MagicMock, patch
-from app.core.pipeline import ProcessingPipeline
+from app.core.memory_budget import MemoryBudget
+from app.core.pipeline import CombinedMarkdownWriter, ProcessingPipeline
 
 path_str = "app.core.pipeline"
 
@@ -9,6 +11,7 @@ path_str = "app.core.pipeline"
 def test_pipeline_process(MockNorm, MockConv, MockExt, tmp_path):
     # Setup mocks
     mock_extractor = MockExt.return_value
+    mock_extractor.memory_budget = MemoryBudget(limit=2**20)
     mock_extractor.process_pdf.return_value = [
         {"page_num": 1, "text": "Page 1 Text", "method": "text"}
     ]
@@ -28,4 +31,26 @@ def test_pipeline_process(MockNorm, MockConv, MockExt, tmp_path):
     success = pipeline.process_file(str(input_pdf), str(output_dir))
     
     assert success is True
-    assert (output_dir / "input" / "metadata.json").exists()
+    metadata = json.loads((output_dir / "input" / "metadata.json").read_text(encoding="utf-8"))
+    assert metadata["memory"]["limit_bytes"] == 2**20
+
+def test_combined_markdown_streams_in_page_order(tmp_path):
+    path = tmp_path / "extracted.md"
+    path.write_text("previous run", encoding="utf-8")
+    writer = CombinedMarkdownWriter(path)
+    writer.add(3, "three")
+    writer.add(2, None)  # skipped page
+    writer.add(1, "one")
+    assert path.read_text(encoding="utf-8") == "previous run"
+    writer.finish()
+    assert path.read_text(encoding="utf-8") == "# Page 1\n\none\n\n---\n\n# Page 3\n\nthree\n\n---\n\n"
+    assert not writer.tmp_path.exists()
+
+def test_combined_markdown_abort_keeps_old_file(tmp_path):
+    path = tmp_path / "extracted.md"
+    path.write_text("previous run", encoding="utf-8")
+    writer = CombinedMarkdownWriter(path)
+    writer.add(1, "one")
+    writer.abort()
+    assert path.read_text(encoding="utf-8") == "previous run"
+    assert not writer.tmp_path.exists()
@@ -0,0 +1,47 @@
+import fitz
+import numpy as np
+import pytest
+from app.core.extractor import PDFExtractor
+from app.core.preprocess import PROFILES, estimate_skew, otsu_threshold, pixmap_gray, preprocess
+
+def scanned_page(angle=0.0, border=0):
+    """A text page rendered at 100 DPI, rotated by angle degrees, inside a dark border."""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    for i in range(20):
+        page.insert_text((60, 100 + i * 28), "The quick brown fox jumps over the lazy dog", fontsize=12)
+    pix = page.get_pixmap(matrix=fitz.Matrix(100 / 72, 100 / 72).prerotate(angle), colorspace=fitz.csGRAY)
+    gray = pixmap_gray(pix.samples_mv, pix.width, pix.height, pix.n, pix.stride).copy()
+    if border:
+        gray[:border, :] = gray[-border:, :] = gray[:, :border] = gray[:, -border:] = 20
+    return gray
+
+@pytest.mark.parametrize("angle", [0.0, 1.5, -3.0])
+def test_skew_is_measured_and_removed(angle):
+    gray = scanned_page(angle)
+    assert estimate_skew(gray < otsu_threshold(gray)) == pytest.approx(angle, abs=0.2)
+    out = preprocess(gray, PROFILES["scan"], dpi=100)
+    assert set(np.unique(out)) <= {0, 255}
+    assert abs(estimate_skew(out == 0)) <= 0.2
+
+def test_crop_removes_border_and_margins():
+    gray = scanned_page(border=15)
+    out = preprocess(gray, PROFILES["crop"], dpi=100)
+    # Text spans roughly 60..340 x 90..640 pt: far less than the page
+    assert out.shape[0] < gray.shape[0] * 0.85 and out.shape[1] < gray.shape[1] * 0.7
+    assert out.dtype == np.uint8 and out.flags.c_contiguous
+    assert out[:3].min() > 200  # no border left at the top
+    assert preprocess(gray, PROFILES["off"]) is gray
+
+def test_extractor_sends_preprocessed_pixels():
+    extractor = PDFExtractor(use_ocr_cache=False)
+    with pytest.raises(ValueError):
+        extractor.configure_ocr(preprocess="sharpen")
+    doc = fitz.open()
+    doc.new_page(width=595, height=842).insert_text((60, 100), "Only one line", fontsize=12)
+    pix = doc[0].get_pixmap(dpi=100, colorspace=fitz.csRGB)
+    payload, width, height = extractor.prepare_image(pix)
+    assert len(payload) == width * height and height < 100 < width < pix.width
+    extractor.configure_ocr(preprocess="off")
+    gray = doc[0].get_pixmap(dpi=100, colorspace=fitz.csGRAY)
+    assert extractor.prepare_image(gray) == (gray.samples_mv, gray.width, gray.height)
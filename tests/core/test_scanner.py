@@ -0,0 +1,26 @@
+from app.core.scanner import find_pdfs, output_folder, scan_pdfs
+
+def make_tree(root):
+    for rel in ["b.pdf", "a.PDF", "notes.txt", "sub/c.pdf", "sub/deeper/d.pdf", "z/e.pdf"]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"%PDF-1.4 " + rel.encode())
+    return root
+
+def test_scan_walks_subfolders_in_batches(tmp_path):
+    root = make_tree(tmp_path / "in")
+    batches = list(scan_pdfs(root, batch_size=2))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    names = [f.path.relative_to(root).as_posix() for b in batches for f in b]
+    assert names == ["a.PDF", "b.pdf", "sub/c.pdf", "sub/deeper/d.pdf", "z/e.pdf"]
+    assert all(f.size == f.path.stat().st_size for b in batches for f in b)
+
+def test_find_pdfs_top_level_and_output_folder(tmp_path):
+    root = make_tree(tmp_path / "in")
+    assert [p.name for p in find_pdfs(root)] == ["a.PDF", "b.pdf"]
+    assert len(find_pdfs(root, recursive=True)) == 5
+    assert output_folder(root / "sub" / "c.pdf", root, tmp_path / "out") == tmp_path / "out" / "sub"
+
+def test_scan_stops_when_asked(tmp_path):
+    root = make_tree(tmp_path / "in")
+    assert list(scan_pdfs(root, should_stop=lambda: True)) == []
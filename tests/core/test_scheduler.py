@@ -0,0 +1,89 @@
+import json
+from unittest.mock import MagicMock
+import fitz
+from app.core.ocr_cache import OCRCache
+from app.core.pipeline import ProcessingPipeline
+from app.core.scheduler import BatchScheduler
+
+def make_pdf(path, pages):
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    doc.save(path)
+    return path
+
+def test_batch_routes_pages_through_both_lanes(tmp_path):
+    long_text = "Text layer page with more than fifty characters on it."
+    a = make_pdf(tmp_path / "a.pdf", [long_text, "", long_text])
+    b = make_pdf(tmp_path / "b.pdf", [long_text])
+
+    pipeline = ProcessingPipeline()
+    pipeline.extractor._ocr_pool = MagicMock(size=2)
+    pipeline.extractor.ocr_cache = OCRCache(tmp_path / "cache.sqlite")
+    ocr_calls = []
+    def fake_ocr(page_num, pix, should_stop=None, cache_key=None, rerender=None):
+        ocr_calls.append(page_num)
+        return {"text": f"ocr text {page_num}", "method": "ocr"}
+    pipeline.extractor.ocr_pass = fake_ocr
+
+    done = []
+    results = BatchScheduler(pipeline, text_workers=2).run(
+        [a, b], str(tmp_path / "out"), on_file_done=lambda f, ok: done.append(f.name)
+    )
+
+    assert results == {a: True, b: True}
+    assert sorted(done) == ["a.pdf", "b.pdf"]
+    assert ocr_calls == [2]
+    combined = (tmp_path / "out" / "a" / "extracted.md").read_text(encoding="utf-8")
+    assert combined.index("Text layer") < combined.index("ocr text 2")
+    assert (tmp_path / "out" / "a" / "pages" / "page_2.md").exists()
+
+def test_batch_stop_marks_files_failed(tmp_path):
+    a = make_pdf(tmp_path / "a.pdf", ["x" * 60])
+    pipeline = ProcessingPipeline()
+    pipeline.extractor._ocr_pool = MagicMock(size=1)
+    results = BatchScheduler(pipeline).run([a], str(tmp_path / "out"), should_stop=lambda: True)
+    assert results == {a: False}
+
+def test_batch_shards_large_documents(tmp_path):
+    pdf = make_pdf(tmp_path / "big.pdf", [f"Page marker {i + 1} " * 5 for i in range(12)])
+    pipeline = ProcessingPipeline(page_workers=2)
+    pipeline.extractor._ocr_pool = MagicMock(size=1)
+    pipeline.sharded_extractor.min_pages_to_shard = 8
+    shard_calls = []
+    process_pdf = pipeline.sharded_extractor.process_pdf
+    pipeline.sharded_extractor.process_pdf = lambda *a, **kw: shard_calls.append(a) or process_pdf(*a, **kw)
+
+    results = BatchScheduler(pipeline).run([pdf], str(tmp_path / "out"))
+    assert results == {pdf: True} and len(shard_calls) == 1
+    combined = (tmp_path / "out" / "big" / "extracted.md").read_text(encoding="utf-8")
+    assert combined.index("Page marker 11") < combined.index("Page marker 12")
+    assert (tmp_path / "out" / "big" / "pages" / "page_12.md").exists()
+    # Memory figures come from the shard processes that ran, each with half the budget
+    metadata = json.loads((tmp_path / "out" / "big" / "metadata.json").read_text(encoding="utf-8"))
+    half = pipeline.extractor.memory_budget.limit // 2
+    assert metadata["memory"]["limit_bytes"] in (half, 2 * half)
+
+def test_text_lane_failure_aborts_the_writer(tmp_path):
+    long_text = "Text layer page with more than fifty characters on it."
+    pdf = make_pdf(tmp_path / "a.pdf", [long_text, "", long_text])
+    pipeline = ProcessingPipeline()
+    pipeline.extractor._ocr_pool = MagicMock(size=1)
+    pipeline.extractor.render_page = MagicMock(side_effect=RuntimeError("render failed"))
+    writers = []
+    open_document = pipeline.open_document
+    def spy(*args):
+        writer = open_document(*args)
+        writer.abort = MagicMock(wraps=writer.abort)
+        writers.append(writer)
+        return writer
+    pipeline.open_document = spy
+
+    results = BatchScheduler(pipeline).run([pdf], str(tmp_path / "out"))
+    assert results == {pdf: False}
+    writers[0].abort.assert_called_once()
+    assert writers[0].combined._file.closed
+    pages = tmp_path / "out" / "a" / "pages"
+    assert (pages / "page_1.md").exists() and not (pages / "page_3.md").exists()
@@ -0,0 +1,21 @@
+import fitz
+from app.core.extractor import PDFExtractor
+from app.core.sharding import ShardedExtractor, plan_shards
+
+def test_plan_shards_covers_all_pages_in_order():
+    shards = plan_shards(103, workers=4)
+    pages = [p for r in shards for p in r]
+    assert pages == list(range(103))
+    assert len(shards) > 4
+
+def test_sharded_extraction_keeps_page_order(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    for i in range(12):
+        doc.new_page().insert_text((72, 72), f"Page marker {i + 1} " * 5)
+    doc.save(pdf)
+
+    sharded = ShardedExtractor(PDFExtractor(), workers=2, min_pages_to_shard=1)
+    pages = list(sharded.process_pdf(str(pdf)))
+    assert [p["page_num"] for p in pages] == list(range(1, 13))
+    assert all(f"Page marker {p['page_num']} " in p["text"] for p in pages)
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+MAIN = os.path.abspath(os.path.join("src", "main.py"))
+
+# Pulled in by the GUI, the PDF stack or the OCR engine: an idle worker needs none of them
+HEAVY = ("flet", "fitz", "pymupdf", "PIL", "pytesseract", "numpy", "pandas", "multiprocessing",
+         "app.ui", "app.core.pipeline", "app.core.extractor", "app.core.ocr_pool")
+
+
+def imported_modules(*args):
+    """Module name -> cumulative import microseconds, from python -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True, timeout=60)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and not line.rstrip().endswith("package"):
+            _, cumulative, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_ocr_worker_starts_without_heavy_imports():
+    modules = imported_modules(MAIN, "--ocr-worker")
+    assert "app.core.ocr_worker" in modules
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY or m.startswith(HEAVY))
+    assert heavy == []
+    # Standard library only; grows past this when an import at module level sneaks back in
+    assert len(modules) < 100
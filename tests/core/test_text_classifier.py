@@ -0,0 +1,40 @@
+import fitz
+from app.core.text_classifier import LEGACY, OCR, TEXT, TextLayerClassifier
+
+def new_page():
+    return fitz.open().new_page(width=595, height=842)
+
+def add_scan_image(page):
+    pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 100, 140), False)
+    pix.clear_with(200)
+    page.insert_image(page.rect, pixmap=pix)
+
+def test_clean_text_page():
+    page = new_page()
+    page.insert_text((72, 72), "A proper text layer with plenty of characters on the page.")
+    layer = TextLayerClassifier().classify(page)
+    assert layer.kind == TEXT
+    assert "proper text layer" in layer.text
+
+def test_short_caption_without_images_is_text():
+    page = new_page()
+    page.insert_text((72, 72), "Chapter 3")
+    assert TextLayerClassifier().classify(page).kind == TEXT
+
+def test_blank_and_scanned_pages_need_ocr():
+    classifier = TextLayerClassifier()
+    assert classifier.classify(new_page()).kind == OCR
+    page = new_page()
+    add_scan_image(page)
+    page.insert_text((72, 800), "p. 12")
+    assert classifier.classify(page).kind == OCR
+
+def test_bamini_like_text_is_legacy():
+    page = new_page()
+    page.insert_text((72, 72), "jkpo; nkhop vd;gJ xU mofhd nkhopahFk;")
+    assert TextLayerClassifier().classify(page).kind == LEGACY
+
+def test_broken_characters_need_ocr():
+    scores = {"chars": 200, "broken_ratio": 0.3, "image_coverage": 0.0, "glyph_coverage": 0.2,
+              "tamil_ratio": 0.0, "latin1_ratio": 0.0, "in_word_semicolon_ratio": 0.0}
+    assert TextLayerClassifier().decide(scores) == OCR
@@ -0,0 +1,43 @@
+import json
+import fitz
+from app.core.pipeline import ProcessingPipeline
+from app.utils import tracing
+
+def test_span_is_noop_without_collection_or_trace():
+    assert not tracing.is_enabled()
+    assert tracing.span("render") is tracing.span("normalize")
+
+def test_collect_sums_spans_and_continues_on_another_dict():
+    with tracing.collect() as stages:
+        with tracing.span("render"):
+            pass
+        with tracing.span("render"):
+            pass
+    with tracing.collect(stages):
+        tracing.add_stage("tesseract", 12.5)
+    assert set(stages) == {"render", "tesseract"}
+    assert stages["tesseract"] == 12.5
+
+def test_chrome_trace_and_stage_totals_in_metadata(tmp_path):
+    pdf = tmp_path / "book.pdf"
+    doc = fitz.open()
+    for i in range(2):
+        doc.new_page().insert_text((72, 72), f"Page number {i + 1} with a text layer long enough to be used.")
+    doc.save(str(pdf))
+    pipeline = ProcessingPipeline()
+    pipeline.extractor.ocr_cache = None
+
+    tracing.enable()
+    try:
+        assert pipeline.process_file(str(pdf), str(tmp_path / "out")) is True
+    finally:
+        tracing.disable()
+    tracing.write_chrome_trace(str(tmp_path / "trace.json"))
+
+    metadata = json.loads((tmp_path / "out" / "book" / "metadata.json").read_text(encoding="utf-8"))
+    assert {"text_layer", "normalize", "write_page"} <= set(metadata["pages"][0]["stages"])
+    assert metadata["stages"]["load_page"] >= 0
+    events = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert {"open_pdf", "text_layer", "normalize"} <= {e["name"] for e in spans}
+    assert all("pid" in e and "tid" in e and e["dur"] >= 0 for e in spans)
@@ -0,0 +1,37 @@
+import threading
+import time
+from app.ui.dispatcher import UpdateDispatcher
+
+def test_only_latest_progress_per_key_and_bounded_log():
+    batches = []
+    applied = threading.Event()
+    def apply(progress, lines):
+        batches.append((progress, lines))
+        applied.set()
+    dispatcher = UpdateDispatcher(apply, fps=5, log_lines=3)
+    # Hold the dispatcher out of flush while the events pile up
+    with dispatcher._flush_lock:
+        for page in range(1, 101):
+            dispatcher.progress("a.pdf", page / 100, f"Page {page}")
+            dispatcher.log(f"line {page}")
+        dispatcher.progress("b.pdf", 0.5, "Half")
+    assert applied.wait(2)
+    dispatcher.close()
+    progress = {}
+    lines = []
+    for batch_progress, batch_lines in batches:
+        progress.update(batch_progress)
+        lines.extend(batch_lines)
+    assert progress == {"a.pdf": (1.0, "Page 100"), "b.pdf": (0.5, "Half")}
+    assert lines[-3:] == ["line 98", "line 99", "line 100"]
+    assert len(batches) <= 2
+
+def test_updates_are_rate_limited():
+    calls = []
+    dispatcher = UpdateDispatcher(lambda progress, lines: calls.append(time.perf_counter()), fps=20)
+    end = time.perf_counter() + 0.5
+    while time.perf_counter() < end:
+        dispatcher.progress("a.pdf", 0.5, "Working")
+        time.sleep(0.001)
+    dispatcher.close()
+    assert 2 <= len(calls) <= 13
@@ -0,0 +1,22 @@
+from pathlib import Path
+from app.core.scanner import ScannedFile
+from app.ui.queue_model import ACTIVE, DONE, FAILED, WAITING, QueueModel, visible_range
+
+def test_pinned_files_and_counts():
+    model = QueueModel(recent=2)
+    model.add(ScannedFile(Path(f"/in/{i}.pdf"), 10) for i in range(1000))
+    assert len(model) == 1000 and model.total_bytes == 10000
+    for i in range(4):
+        model.set_status(f"/in/{i}.pdf", ACTIVE)
+    for i, status in [(0, DONE), (1, FAILED), (2, DONE)]:
+        model.set_status(f"/in/{i}.pdf", status)
+    model.set_progress("/in/3.pdf", 0.5, "Page 5/10")
+    pinned = model.pinned()
+    assert [e.path.name for e in pinned] == ["3.pdf", "2.pdf", "1.pdf"]
+    assert pinned[0].message == "Page 5/10"
+    assert model.counts() == {WAITING: 996, ACTIVE: 1, DONE: 2, FAILED: 1}
+
+def test_visible_range():
+    assert visible_range(10000, offset=0, viewport=500, row_height=100, overscan=2) == (0, 8)
+    assert visible_range(10000, offset=5000, viewport=500, row_height=100, overscan=2) == (48, 58)
+    assert visible_range(3, offset=0, viewport=500, row_height=100) == (0, 3)